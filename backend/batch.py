@@ -0,0 +1,91 @@
+"""Several GET resources in one request (POST /batch).
+
+Each path is dispatched in-process to the app's router, concurrently, as
+if it were its own GET request: same routes, same cache, same single-flight.
+Sub-requests skip the HTTP middlewares (their phases are timed as part of
+the batch request) and carry no conditional headers, so they never answer
+304.
+
+Bodies are spliced into the combined response as they are: a cached
+EncodedPayload is not decoded and re-encoded.
+
+    {"results": [{"path": "/health", "status": 200, "body": {...}}, ...]}
+"""
+
+import asyncio
+import logging
+from typing import List, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from starlette.exceptions import HTTPException
+
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+async def dispatch(app, router, path: str) -> Tuple[int, bytes, bool]:
+    """GET path ("/race/2024/3?x=1") through router: (status, body, body is JSON)."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [],
+        "client": None,
+        "server": None,
+        # Avec "app" dans le scope, le routeur lève HTTPException (404, 405) au lieu de répondre
+        "app": app,
+    }
+    status, chunks, content_type = 500, [], b""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await router(scope, receive, send)
+    except HTTPException as e:
+        return e.status_code, json_codec.dumps({"detail": e.detail}), True
+    except RequestValidationError as e:
+        return 422, json_codec.dumps({"detail": jsonable_encoder(e.errors())}), True
+    except Exception:
+        logger.exception(f"Batch item {path} failed")
+        return 500, json_codec.dumps({"detail": "Internal Server Error"}), True
+    return status, b"".join(chunks), content_type.startswith(b"application/json")
+
+
+async def run_batch(app, router, paths: List[str]) -> bytes:
+    """Combined JSON body of the batch, results in the order of paths."""
+    unique = list(dict.fromkeys(paths))
+    responses = await asyncio.gather(*(
+        dispatch(app, router, path) if path.startswith("/") else _invalid(path) for path in unique
+    ))
+    by_path = dict(zip(unique, responses))
+    items = []
+    for path in paths:
+        status, body, is_json = by_path[path]
+        head = json_codec.dumps({"path": path, "status": status})
+        if not is_json:
+            body = json_codec.dumps(body.decode("utf-8", "replace") if body else None)
+        # {"path":..,"status":..} + ,"body":<octets tels quels>}
+        items.append(head[:-1] + b',"body":' + (body or b"null") + b"}")
+    return b'{"results":[' + b",".join(items) + b"]}"
+
+
+async def _invalid(path: str) -> Tuple[int, bytes, bool]:
+    return 400, json_codec.dumps({"detail": f"Chemin invalide : {path!r}"}), True
@@ -0,0 +1,89 @@
+"""Benchmark de CustomCache.set() selon la taille du cache.
+
+Compare le log append-only (write-behind) à l'ancienne réécriture complète
+du pickle à chaque set(). Le temps mesuré est celui vu par l'appelant de
+set(), flusher en arrière-plan actif.
+
+Usage:
+    cd backend
+    python benchmarks/bench_cache_set.py [--sizes 10,100,1000,10000,100000]
+"""
+
+import argparse
+import asyncio
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import CustomCache  # noqa: E402
+
+PAYLOAD = [{"position": str(i), "points": str(25 - i), "Driver": {"driverId": f"driver_{i}"}} for i in range(20)]
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def bench_log(size: int, samples: int) -> list:
+    with tempfile.TemporaryDirectory() as tmp:
+        # Budgets assez larges pour tout garder : même contenu que le pickle legacy
+        cache = CustomCache(cache_dir=tmp, persist=True, max_entries=size + samples, max_bytes=2**62)
+        await cache.start()
+        for i in range(size):
+            await cache.set(f"race:prefill:{i}", PAYLOAD, ttl=3600)
+        await cache.flush()
+        assert len(cache._cache) == size
+
+        timings = []
+        for i in range(samples):
+            start = time.perf_counter()
+            await cache.set(f"race:bench:{i}", PAYLOAD, ttl=3600)
+            timings.append(time.perf_counter() - start)
+            # Laisse tourner le flusher comme en production
+            await asyncio.sleep(0)
+        await cache.close()
+        return timings
+
+
+def bench_legacy(size: int, samples: int) -> list:
+    """Ancien comportement : pickle.dump de tout le dict à chaque set()."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache_data.pkl"
+        data = {f"race:prefill:{i}": (PAYLOAD, 0) for i in range(size)}
+        timings = []
+        for i in range(samples):
+            start = time.perf_counter()
+            data[f"race:bench:{i}"] = (PAYLOAD, 0)
+            with open(path, "wb") as f:
+                pickle.dump({"cache": data}, f)
+            timings.append(time.perf_counter() - start)
+        return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--legacy-samples", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} | {'log mean µs':>11} | {'log p99 µs':>10} | {'legacy mean µs':>14}")
+    print("-" * 54)
+    for size in (int(s) for s in args.sizes.split(",")):
+        log = asyncio.run(bench_log(size, args.samples))
+        legacy = bench_legacy(size, args.legacy_samples)
+        print(
+            f"{size:>8} | {statistics.mean(log) * 1e6:>11.1f} | {_percentile(log, 99) * 1e6:>10.1f} | "
+            f"{statistics.mean(legacy) * 1e6:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Benchmark des routes de l'API : latences p50/p95/p99, débit et appels Ergast.
+
+Toutes les routes de main.py sont appelées en process (httpx.ASGITransport),
+en mode live, avec le faux Ergast de ergast_stub.py (httpx.MockTransport)
+servi depuis l'historique synthétique de mock_data et une latence injectée
+par appel.
+
+Modes :
+- cold : cache vidé avant chaque requête, chaque requête paie l'amont
+- warm : cache prérempli, que des hits
+- live : cache vide au départ puis clients concurrents ; le cache et le
+         single-flight absorbent la charge (appels amont << requêtes)
+
+Les résultats peuvent être enregistrés (--save) dans un JSON de référence,
+puis comparés (--compare) : le script sort en erreur si le p50 et le p95
+d'une route se dégradent au-delà de --tolerance (et de plus de --min-delta ms). Sous
+MIN_COMPARE_REQUESTS requêtes par route, le p95 ne repose que sur quelques
+échantillons : la comparaison est refusée.
+
+En cold, les requêtes concurrentes sur une même clé partagent un seul appel
+(single-flight) : --concurrency 1 donne le coût d'un miss isolé.
+
+Usage:
+    cd backend
+    python benchmarks/bench_endpoints.py [--modes cold,warm,live] [--requests 100] [--concurrency 10]
+        [--latency 0.02] [--routes standings,race] [--save benchmarks/baseline_endpoints.json]
+        [--compare benchmarks/baseline_endpoints.json] [--tolerance 0.25] [--min-delta 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mode live, cache mémoire sans persistance, aucune tâche de fond
+os.environ.update(USE_MOCK_DATA="false", CACHE_BACKEND="memory", CACHE_PERSIST="false",
+                  CACHE_WARMER_ENABLED="false", RESULTS_DB_ENABLED="false", LOG_LEVEL="WARNING")
+
+import main  # noqa: E402
+from main import CustomCache, app  # noqa: E402
+from ergast_stub import ErgastStub, StubConfig  # noqa: E402
+from mock_data import SyntheticHistory  # noqa: E402
+
+MODES = ("cold", "warm", "live")
+# En dessous, le p95 d'une route tient à 5 requêtes ou moins : trop bruité pour --compare
+MIN_COMPARE_REQUESTS = 200
+
+
+def route_table(history: SyntheticHistory):
+    """(route, requêtes) : les routes paramétrées tournent sur plusieurs clés.
+
+    Une requête est un chemin (GET) ou un couple (chemin, corps JSON) envoyé en POST.
+    """
+    current = history.seasons[-1]
+    drivers = [d["driverId"] for d in history.lineup(current)]
+    rounds = range(1, history.rounds + 1)
+    seasons = history.seasons[-5:]
+    return [
+        ("/", ["/"]),
+        ("/health", ["/health"]),
+        ("/cache/stats", ["/cache/stats"]),
+        ("/metrics", ["/metrics"]),
+        ("/cache/warmer", ["/cache/warmer"]),
+        ("/cache/ttl", ["/cache/ttl"]),
+        ("/drivers/current", ["/drivers/current"]),
+        ("/constructors/current", ["/constructors/current"]),
+        ("/standings/drivers", ["/standings/drivers"]),
+        ("/standings/constructors", ["/standings/constructors"]),
+        ("/schedule/current", ["/schedule/current"]),
+        ("/race/last", ["/race/last"]),
+        ("/race/{season}/{round}", [f"/race/{current}/{r}" for r in rounds]),
+        ("/race/{season}/results", [f"/race/{s}/results?podium=true" for s in seasons]),
+        ("/drivers/stats", ["/drivers/stats"]),
+        ("/drivers/stats/{season}", [f"/drivers/stats/{s}" for s in seasons]),
+        ("/driver/{driver_id}/stats", [f"/driver/{d}/stats" for d in drivers]),
+        # Écran d'accueil du dashboard en un aller-retour
+        ("POST /batch", [("/batch", {"paths": [
+            "/standings/drivers", "/standings/constructors", "/race/last", "/schedule/current",
+            f"/race/{current}/{r}",
+        ]}) for r in rounds]),
+    ]
+
+
+def _send(client, request):
+    if isinstance(request, tuple):
+        path, body = request
+        return client.post(path, json=body)
+    return client.get(request)
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def bench_route(client, fake, mode, paths, requests, concurrency):
+    main.custom_cache = CustomCache(persist=False)
+    if mode == "warm":
+        for path in paths:
+            await _send(client, path)
+    calls_before = fake.calls
+    queue = iter(range(requests))
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            if mode == "cold":
+                await main.custom_cache.clear()
+            start = time.perf_counter()
+            response = await _send(client, paths[i % len(paths)])
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "p50_ms": round(_percentile(latencies, 50) * 1e3, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1e3, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1e3, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1e3, 3),
+        "rps": round(requests / elapsed, 1),
+        "upstream_calls": fake.calls - calls_before,
+        "errors": errors,
+    }
+
+
+async def run(args):
+    history = SyntheticHistory(seasons=args.seasons, rounds=args.rounds, seed=0)
+    fake = ErgastStub(history, StubConfig(latency=args.latency))
+    main._http_client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    main.ERGAST_BASE_URL = "http://ergast.test/api/f1"
+
+    wanted = [w for w in args.routes.split(",") if w]
+    routes = [(name, paths) for name, paths in route_table(history) if not wanted or any(w in name for w in wanted)]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode in args.modes.split(","):
+            results[mode] = {}
+            for name, paths in routes:
+                row = await bench_route(client, fake, mode, paths, args.requests, args.concurrency)
+                results[mode][name] = row
+                print(f"{mode:>5} | {name:<26} | {row['p50_ms']:>8.2f} | {row['p95_ms']:>8.2f} | "
+                      f"{row['p99_ms']:>8.2f} | {row['rps']:>8.1f} | {row['upstream_calls']:>8} | {row['errors']:>6}")
+    await main._http_client.aclose()
+    return results
+
+
+def _regressed(row, old, metric, tolerance, min_delta_ms):
+    return row[metric] > old[metric] * (1 + tolerance) and row[metric] - old[metric] > min_delta_ms
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Routes dont le p50 et le p95 dépassent ceux de la référence de plus de tolerance (et de min_delta_ms).
+
+    Le p95 seul bouge d'une exécution à l'autre (file d'attente des clients
+    concurrents, machine partagée) ; une vraie régression déplace aussi la médiane.
+    """
+    regressions, missing = [], []
+    for mode, routes in results.items():
+        for name, row in routes.items():
+            old = baseline.get("results", {}).get(mode, {}).get(name)
+            if old is None:
+                # Route absente de la référence : signalée, pas vérifiée (régénérer avec --save)
+                print(f"{mode:>5} | {name:<26} | p95 {'-':>8} -> {row['p95_ms']:>8.2f} ms (no baseline)")
+                missing.append((mode, name))
+                continue
+            ratio = row["p95_ms"] / old["p95_ms"] if old["p95_ms"] else 1.0
+            slower = all(_regressed(row, old, metric, tolerance, min_delta_ms) for metric in ("p50_ms", "p95_ms"))
+            flag = "REGRESSION" if slower else ""
+            print(f"{mode:>5} | {name:<26} | p50 {old['p50_ms']:>8.2f} -> {row['p50_ms']:>8.2f} ms | "
+                  f"p95 {old['p95_ms']:>8.2f} -> {row['p95_ms']:>8.2f} ms ({ratio:>5.2f}x) | "
+                  f"upstream {old['upstream_calls']} -> {row['upstream_calls']} {flag}")
+            if flag:
+                regressions.append((mode, name))
+    if missing:
+        names = sorted({name for _, name in missing})
+        print(f"{len(names)} route(s) without baseline: {', '.join(names)}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--routes", default="", help="filtre (sous-chaînes des routes, séparées par des virgules)")
+    parser.add_argument("--requests", type=int, default=MIN_COMPARE_REQUESTS, help="requêtes par route et par mode")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02, help="latence du faux Ergast, en secondes")
+    parser.add_argument("--seasons", type=int, default=10, help="saisons d'historique synthétique")
+    parser.add_argument("--rounds", type=int, default=22)
+    parser.add_argument("--save", help="écrit les résultats dans ce fichier JSON")
+    parser.add_argument("--compare", help="fichier JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dégradation tolérée du p50 et du p95 (0.25 = +25%%)")
+    parser.add_argument("--min-delta", type=float, default=5.0, help="écart de p95 ignoré sous ce seuil, en ms")
+    args = parser.parse_args()
+    if args.compare and args.requests < MIN_COMPARE_REQUESTS:
+        parser.error(f"--compare needs --requests >= {MIN_COMPARE_REQUESTS} (p95 too noisy below)")
+
+    print(f"{'mode':>5} | {'route':<26} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'req/s':>8} | "
+          f"{'upstream':>8} | {'errors':>6}")
+    print("-" * 100)
+    results = asyncio.run(run(args))
+
+    if args.save:
+        baseline = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "params": {k: getattr(args, k) for k in ("requests", "concurrency", "latency", "seasons", "rounds")},
+            "results": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nbaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("params", {}).get("requests", 0) < MIN_COMPARE_REQUESTS:
+            sys.exit(f"{args.compare} was saved with fewer than {MIN_COMPARE_REQUESTS} requests per route, "
+                     f"regenerate it with --save")
+        print(f"\ncompared with {args.compare} ({baseline.get('created')})")
+        regressions = compare(results, baseline, args.tolerance, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regression(s) above +{args.tolerance:.0%} p50 and p95")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,63 @@
+"""Mémoire par course : dicts Ergast vs modèle compact (race_model).
+
+Mesure, pour N courses de 20 classés (historique synthétique de mock_data) :
+- dict   : la course telle que décodée depuis le JSON Ergast (chaque ligne
+           a ses propres objets Driver/Constructor et des nombres en chaîne)
+- compact: CompactRace (colonnes typées), plus la part amortie du pool
+           d'entités partagé entre toutes les courses
+- json   : taille du corps JSON encodé (ce que le cache des routes garde)
+
+Usage:
+    cd backend
+    python benchmarks/bench_race_memory.py [--races 1,24,500]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_eviction import approx_size  # noqa: E402
+from mock_data import SyntheticHistory  # noqa: E402
+from race_model import CompactRace, EntityPool  # noqa: E402
+
+
+def decoded_races(count: int) -> list:
+    """count courses de l'historique synthétique, décodées depuis du JSON comme une réponse Ergast."""
+    history = SyntheticHistory(seasons=-(-count // 22), rounds=22, seed=7)
+    races = []
+    for race in history.races():
+        if len(races) == count:
+            break
+        races.append(json.loads(json.dumps(race)))
+    return races
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--races", default="1,24,500")
+    args = parser.parse_args()
+
+    print(f"{'races':>6} | {'dict B/race':>11} | {'compact B/race':>14} | {'json B/race':>11} | {'expand µs':>9}")
+    print("-" * 66)
+    for count in (int(n) for n in args.races.split(",")):
+        races = decoded_races(count)
+        pool = EntityPool()
+        compact = [CompactRace(race, pool) for race in races]
+        assert all(c.expand() == r for c, r in zip(compact, races))
+
+        dict_bytes = approx_size(races) / count
+        compact_bytes = approx_size(compact) / count  # pool inclus (référencé par chaque course)
+        json_bytes = sum(len(json.dumps(r, separators=(",", ":"))) for r in races) / count
+        start = time.perf_counter()
+        for c in compact:
+            c.expand()
+        expand_us = (time.perf_counter() - start) / count * 1e6
+        print(f"{count:>6} | {dict_bytes:>11.0f} | {compact_bytes:>14.0f} | {json_bytes:>11.0f} | {expand_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
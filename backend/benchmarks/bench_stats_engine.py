@@ -0,0 +1,85 @@
+"""Benchmark des agrégats de carrière : boucle par dict vs table en colonnes.
+
+Compare, pour tous les pilotes d'un historique synthétique :
+- la boucle d'origine, pilote par pilote, sur les dicts Ergast imbriqués
+  (`int(res["position"])` sur chaque ligne)
+- StatsEngine : construction de la table en colonnes, puis un group-by
+  vectorisé (numpy) pour tous les pilotes à la fois
+
+Usage:
+    cd backend
+    python benchmarks/bench_stats_engine.py [--seasons 10,30,75] [--drivers 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_data import SyntheticHistory  # noqa: E402
+from stats_engine import ENGINE, ResultsTable, StatsEngine, rows_from_races  # noqa: E402
+
+def synthetic_history(seasons: int, drivers: int, rounds: int = 20) -> dict:
+    """Listing de résultats par pilote (comme /drivers/{id}/results.json), depuis mock_data."""
+    per_driver = {}
+    for race in SyntheticHistory(seasons=seasons, rounds=rounds, drivers=drivers, seed=42).races():
+        for result in race["Results"]:
+            per_driver.setdefault(result["Driver"]["driverId"], []).append({**race, "Results": [result]})
+    return per_driver
+
+
+def dict_loop(per_driver: dict) -> dict:
+    """Boucle d'origine : un passage par pilote sur ses courses."""
+    stats = {}
+    for driver_id, all_races in per_driver.items():
+        wins = sum(1 for race in all_races for res in race["Results"] if int(res["position"]) == 1)
+        podiums = sum(1 for race in all_races for res in race["Results"] if int(res["position"]) <= 3)
+        points = sum(float(res["points"]) for race in all_races for res in race["Results"])
+        stats[driver_id] = {"races": len(all_races), "wins": wins, "podiums": podiums, "points": points}
+    return stats
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", default="10,30,75")
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"engine: {ENGINE}")
+    print(f"{'rows':>7} | {'dict loop ms':>12} | {'build ms':>8} | {'group-by ms':>11} | {'table KB':>8}")
+    print("-" * 60)
+    for seasons in (int(s) for s in args.seasons.split(",")):
+        per_driver = synthetic_history(seasons, args.drivers)
+        races = [race for history in per_driver.values() for race in history]
+        rows = rows_from_races(races)
+        table = ResultsTable.from_rows(rows)
+        engine = StatsEngine(table)
+
+        # Même résultat des deux côtés
+        expected = dict_loop(per_driver)
+        got = engine.career_stats()
+        assert all(got[d]["wins"] == expected[d]["wins"] and got[d]["podiums"] == expected[d]["podiums"]
+                   for d in expected)
+
+        loop_s = _time(lambda: dict_loop(per_driver), args.repeat)
+        build_s = _time(lambda: ResultsTable.from_rows(rows), args.repeat)
+        agg_s = _time(engine.career_stats, args.repeat)
+        print(f"{len(rows):>7} | {loop_s * 1e3:>12.2f} | {build_s * 1e3:>8.2f} | {agg_s * 1e3:>11.2f} | "
+              f"{table.nbytes() / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""Cache backends behind get_cached_data.
+
+`CacheBackend` is the interface used by the routes. It also owns what is
+shared by every backend: the per-key in-flight registry (single-flight)
+and the hit/miss counters.
+
+Implementations:
+- `CustomCache` (main.py): in-memory dict with optional on-disk log
+- `RedisCache` (here): shared by every replica, TTLs enforced by Redis
+
+A key whose upstream has no data (e.g. a round not raced yet) is stored as
+`NEGATIVE` with a short TTL, so repeated requests for it stay local.
+"""
+
+import asyncio
+import gzip
+import logging
+import struct
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+import json_codec
+from payloads import COMPRESS_THREAD_BYTES, EncodedPayload, compress_payload, compute_etag
+
+logger = logging.getLogger(__name__)
+
+
+class _Negative:
+    """Value of a negative cache entry: the upstream had no data for this key."""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "NEGATIVE"
+
+    def __reduce__(self):
+        # Le journal de persistance (pickle) garde le singleton
+        return "NEGATIVE"
+
+
+NEGATIVE = _Negative()
+
+
+class CacheBackend:
+    """Interface of a cache usable by get_cached_data."""
+
+    name = "base"
+
+    def __init__(self, compress: bool = False):
+        # Variantes gzip/br des payloads calculées à l'écriture (prepare)
+        self._compress = compress
+        self._reset_counters()
+        # One in-flight upstream fetch per key (single-flight)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _reset_counters(self):
+        """Zero the lookup counters (on creation and by clear())."""
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._stale_hits = 0
+        self._negative_hits = 0
+        self._refreshes = 0
+
+    # ── Storage ──────────────────────────────────────────────────────────────
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache if not expired."""
+        value, _ = await self.lookup(key)
+        return value
+
+    async def lookup(self, key: str, allow_stale: bool = False) -> Tuple[Optional[Any], bool]:
+        """Get (value, is_stale) from cache."""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: int, stale_ttl: int = 0):
+        """Set value in cache with TTL (and optional stale window) in seconds."""
+        raise NotImplementedError
+
+    async def peek(self, key: str) -> Optional[Any]:
+        """Fresh or stale value without touching statistics or eviction order."""
+        raise NotImplementedError
+
+    async def prepare(self, value: Any) -> Any:
+        """Value as it will be stored by set(): encoded payloads get their compressed variants.
+
+        No-op when compression is off or the variants are already there.
+        """
+        if not self._compress or not isinstance(value, EncodedPayload):
+            return value
+        if len(value.body) >= COMPRESS_THREAD_BYTES:
+            return await asyncio.to_thread(compress_payload, value)
+        return compress_payload(value)
+
+    async def set_many(self, items: Dict[str, Any], ttl: int, stale_ttl: int = 0):
+        """Set several values with the same TTL."""
+        for key, value in items.items():
+            await self.set(key, value, ttl, stale_ttl)
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+    async def start(self):
+        """Start background tasks (called from the app lifespan)."""
+
+    async def close(self):
+        """Stop background tasks and release resources."""
+
+    async def refresh_stats(self):
+        """Refresh statistics that need I/O before get_stats() is called."""
+
+    # ── Single-flight ────────────────────────────────────────────────────────
+    def get_inflight(self, key: str) -> Optional[asyncio.Future]:
+        """Return the pending fetch for key, if another request started one."""
+        return self._inflight.get(key)
+
+    def begin_fetch(self, key: str) -> asyncio.Future:
+        """Register the caller as the single fetcher for key."""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def end_fetch(self, key: str):
+        """Forget the in-flight fetch for key."""
+        self._inflight.pop(key, None)
+
+    def record_coalesced(self):
+        """Count a request that awaited another request's fetch."""
+        self._coalesced += 1
+
+    def record_refresh(self):
+        """Count a background refresh started for a stale entry."""
+        self._refreshes += 1
+
+    def record_negative_hit(self):
+        """Count a hit on a negative entry (answered "no data" without fetching)."""
+        self._negative_hits += 1
+
+    # ── Statistics ───────────────────────────────────────────────────────────
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        total = self._hits + self._misses
+        hit_rate = (self._hits / total * 100) if total > 0 else 0
+        return {
+            "backend": self.name,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": f"{hit_rate:.2f}%",
+            "coalesced": self._coalesced,
+            "inflight": len(self._inflight),
+            "stale_hits": self._stale_hits,
+            "negative_hits": self._negative_hits,
+            "background_refreshes": self._refreshes,
+            "compression": self._compress,
+        }
+
+
+# ── Redis ─────────────────────────────────────────────────────────────────────
+# Stored value: header (soft expiry as a unix timestamp, flags) + body.
+# Redis itself drops the key at the hard expiry (SET ... PX).
+_REDIS_HEADER = struct.Struct("!dB")
+FLAG_ZLIB = 0x01
+FLAG_PAYLOAD = 0x02   # body is an EncodedPayload's JSON bytes, stored as-is
+FLAG_HEADERS = 0x04   # payload body is preceded by its extra headers (length-prefixed JSON)
+FLAG_NEGATIVE = 0x08  # negative entry, empty body
+FLAG_VARIANTS = 0x10  # payload stored with its precompressed variants
+FLAG_ETAG = 0x20      # payload ETag stored after the header (length-prefixed)
+COMPRESS_MIN_BYTES = 1024
+_HEADERS_LEN = struct.Struct("!I")
+_VARIANT = struct.Struct("!BI")  # longueur du nom, longueur du corps
+
+
+def _pack_variants(variants) -> bytes:
+    parts = [bytes([len(variants)])]
+    for name, body in variants:
+        encoded = name.encode()
+        parts += [_VARIANT.pack(len(encoded), len(body)), encoded, body]
+    return b"".join(parts)
+
+
+def _unpack_variants(blob: bytes, start: int) -> Tuple[list, int]:
+    variants, pos = [], start + 1
+    for _ in range(blob[start]):
+        name_len, body_len = _VARIANT.unpack_from(blob, pos)
+        pos += _VARIANT.size
+        name = blob[pos:pos + name_len].decode()
+        pos += name_len
+        variants.append((name, blob[pos:pos + body_len]))
+        pos += body_len
+    return variants, pos
+
+
+def encode_redis_value(value: Any, soft_expiry: float) -> bytes:
+    """Serialize value as compact JSON, zlib-compressed when large.
+
+    A payload keeps its ETag, so a hit does not hash the body again. A
+    payload with compressed variants is stored with them and with its body
+    as-is (no zlib): a hit neither decompresses nor recompresses anything.
+    """
+    if value is NEGATIVE:
+        return _REDIS_HEADER.pack(soft_expiry, FLAG_NEGATIVE)
+    prefix = b""
+    if isinstance(value, EncodedPayload):
+        body, flags = value.body, FLAG_PAYLOAD | FLAG_ETAG
+        etag = value.etag.encode()
+        prefix = bytes([len(etag)]) + etag
+        if value.headers:
+            extra = json_codec.dumps(value.headers)
+            body, flags = _HEADERS_LEN.pack(len(extra)) + extra + body, flags | FLAG_HEADERS
+        if value.variants:
+            # ETag, variantes, puis headers éventuels et body en clair
+            return (_REDIS_HEADER.pack(soft_expiry, flags | FLAG_VARIANTS)
+                    + prefix + _pack_variants(value.variants) + body)
+    else:
+        body, flags = json_codec.dumps(value), 0
+    if len(body) >= COMPRESS_MIN_BYTES:
+        body = zlib.compress(body, 6)
+        flags |= FLAG_ZLIB
+    return _REDIS_HEADER.pack(soft_expiry, flags) + prefix + body
+
+
+def decode_redis_value(blob: bytes) -> Tuple[Any, float]:
+    """Inverse of encode_redis_value: returns (value, soft_expiry)."""
+    soft_expiry, flags = _REDIS_HEADER.unpack_from(blob)
+    if flags & FLAG_NEGATIVE:
+        return NEGATIVE, soft_expiry
+    pos, etag, variants = _REDIS_HEADER.size, None, ()
+    if flags & FLAG_ETAG:
+        etag = blob[pos + 1:pos + 1 + blob[pos]].decode()
+        pos += 1 + blob[pos]
+    if flags & FLAG_VARIANTS:
+        variants, pos = _unpack_variants(blob, pos)
+        variants = tuple(variants)
+    body = blob[pos:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    if flags & FLAG_PAYLOAD:
+        headers = ()
+        if flags & FLAG_HEADERS:
+            (length,) = _HEADERS_LEN.unpack_from(body)
+            start = _HEADERS_LEN.size
+            headers = tuple(tuple(h) for h in json_codec.loads(body[start:start + length]))
+            body = body[start + length:]
+        if variants and etag is None:
+            # Valeurs écrites avant FLAG_ETAG : le body n'était que la variante gzip
+            body = gzip.decompress(dict(variants)["gzip"])
+        return EncodedPayload(body, etag or compute_etag(body), headers, variants), soft_expiry
+    return json_codec.loads(body), soft_expiry
+
+
+class RedisCache(CacheBackend):
+    """Cache stored in Redis, shared by all backend replicas.
+
+    - Hard expiry is a server-side TTL (SET PX), soft expiry is kept in the
+      value header for stale-while-revalidate
+    - Values are compact JSON (orjson when available), zlib above 1 KB;
+      encoded payloads keep their ETag and gzip/brotli variants (see
+      prepare()), so a hit does no hashing or decompression
+    - Multi-key writes (set_many) and clear() use pipelines
+    - Eviction under memory pressure is Redis' job (maxmemory-policy)
+    """
+
+    name = "redis"
+    # Le comptage des clés parcourt tout le keyspace : résultat gardé 30 s
+    ENTRIES_REFRESH = 30.0
+
+    def __init__(self, client=None, host: str = "localhost", port: int = 6379, db: int = 0,
+                 prefix: str = "f1:", compress: bool = False):
+        super().__init__(compress=compress)
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError as e:
+                raise RuntimeError("The 'redis' package is required for CACHE_BACKEND=redis") from e
+            client = aioredis.Redis(host=host, port=port, db=db)
+        self._client = client
+        self._prefix = prefix
+        self._target = f"{host}:{port}/{db}"
+        self._entries: Optional[int] = None
+        self._entries_at = 0.0
+        self._errors = 0
+
+    def _k(self, key: str) -> str:
+        return self._prefix + key
+
+    def _unpack(self, key: str, blob: Optional[bytes], allow_stale: bool) -> Tuple[Optional[Any], bool]:
+        if blob is None:
+            self._misses += 1
+            return None, False
+        try:
+            value, soft_expiry = decode_redis_value(blob)
+        except Exception as e:
+            logger.warning(f"Unreadable Redis cache entry {key}: {e}")
+            self._misses += 1
+            return None, False
+        if time.time() < soft_expiry:
+            self._hits += 1
+            return value, False
+        if allow_stale:
+            self._stale_hits += 1
+            return value, True
+        self._misses += 1
+        return None, False
+
+    @staticmethod
+    def _px(ttl: int, stale_ttl: int) -> int:
+        return int((ttl + stale_ttl) * 1000)
+
+    async def lookup(self, key: str, allow_stale: bool = False) -> Tuple[Optional[Any], bool]:
+        try:
+            blob = await self._client.get(self._k(key))
+        except Exception as e:
+            # Redis indisponible : on se comporte comme un miss
+            self._errors += 1
+            logger.warning(f"Redis GET failed for {key}: {e}")
+            blob = None
+        return self._unpack(key, blob, allow_stale)
+
+    async def peek(self, key: str) -> Optional[Any]:
+        try:
+            blob = await self._client.get(self._k(key))
+            return decode_redis_value(blob)[0] if blob is not None else None
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis GET failed for {key}: {e}")
+            return None
+
+    async def set(self, key: str, value: Any, ttl: int, stale_ttl: int = 0):
+        px = self._px(ttl, stale_ttl)
+        if px <= 0:
+            return
+        blob = encode_redis_value(await self.prepare(value), time.time() + ttl)
+        try:
+            await self._client.set(self._k(key), blob, px=px)
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis SET failed for {key}: {e}")
+
+    async def set_many(self, items: Dict[str, Any], ttl: int, stale_ttl: int = 0):
+        px = self._px(ttl, stale_ttl)
+        if px <= 0 or not items:
+            return
+        soft_expiry = time.time() + ttl
+        items = {key: await self.prepare(value) for key, value in items.items()}
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(self._k(key), encode_redis_value(value, soft_expiry), px=px)
+                await pipe.execute()
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis pipeline SET failed: {e}")
+
+    async def delete(self, key: str):
+        try:
+            await self._client.delete(self._k(key))
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis DEL failed for {key}: {e}")
+
+    async def clear(self):
+        """Delete every key under the prefix (SCAN + pipelined DEL)."""
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                async for raw_key in self._client.scan_iter(match=self._prefix + "*", count=500):
+                    pipe.delete(raw_key)
+                await pipe.execute()
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis clear failed: {e}")
+        self._reset_counters()
+        self._entries = None
+        self._entries_at = 0.0
+
+    async def refresh_stats(self):
+        """Count the keys under the prefix (SCAN, at most every ENTRIES_REFRESH seconds).
+
+        DBSIZE would also count the keys of anything else sharing the database.
+        """
+        if self._entries is not None and time.monotonic() - self._entries_at < self.ENTRIES_REFRESH:
+            return
+        try:
+            count = 0
+            async for _ in self._client.scan_iter(match=self._prefix + "*", count=1000):
+                count += 1
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"Redis SCAN failed: {e}")
+            return
+        self._entries = count
+        self._entries_at = time.monotonic()
+
+    async def close(self):
+        try:
+            await self._client.aclose()
+        except AttributeError:  # redis < 5
+            await self._client.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": self._entries if self._entries is not None else 0,
+            **super().get_stats(),
+            "redis": self._target,
+            "redis_errors": self._errors,
+            "persistence": "redis",
+        }
@@ -0,0 +1,153 @@
+"""Eviction policies and payload size estimation for the custom cache.
+
+A policy only tracks key order/frequency; CustomCache owns the entries and
+asks the policy for a victim when it goes over its entry or byte budget.
+"""
+
+import logging
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_CONTAINER_TYPES = (dict, list, tuple, set, frozenset)
+
+
+def approx_size(value: Any) -> int:
+    """Approximate memory footprint of a payload in bytes.
+
+    Walks dicts, lists, tuples and sets (iteratively, each object counted
+    once) and adds sys.getsizeof of every node. Good enough for a budget,
+    much cheaper than serializing the payload.
+    """
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, _CONTAINER_TYPES):
+            stack.extend(obj)
+        elif hasattr(obj, "__slots__"):
+            for cls in type(obj).__mro__:
+                stack.extend(getattr(obj, name) for name in getattr(cls, "__slots__", ()) if hasattr(obj, name))
+    return total
+
+
+class EvictionPolicy:
+    """Interface: keeps track of keys and picks the next one to evict."""
+
+    name = "none"
+
+    def add(self, key: str):
+        raise NotImplementedError
+
+    def touch(self, key: str):
+        raise NotImplementedError
+
+    def remove(self, key: str):
+        raise NotImplementedError
+
+    def victim(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least recently used: evicts the key read or written the longest ago."""
+
+    name = "lru"
+
+    def __init__(self):
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, key: str):
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def touch(self, key: str):
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def remove(self, key: str):
+        self._order.pop(key, None)
+
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+
+    def clear(self):
+        self._order.clear()
+
+
+class LFUPolicy(EvictionPolicy):
+    """Least frequently used, LRU among equal counts. O(1) per operation."""
+
+    name = "lfu"
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_count = 0
+
+    def _unlink(self, key: str, count: int):
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+
+    def add(self, key: str):
+        if key in self._counts:
+            self.touch(key)
+            return
+        self._counts[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_count = 1
+
+    def touch(self, key: str):
+        count = self._counts.get(key)
+        if count is None:
+            return
+        self._unlink(key, count)
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+        if self._min_count == count and count not in self._buckets:
+            self._min_count = count + 1
+
+    def remove(self, key: str):
+        count = self._counts.pop(key, None)
+        if count is not None:
+            self._unlink(key, count)
+
+    def victim(self) -> Optional[str]:
+        if not self._counts:
+            return None
+        if self._min_count not in self._buckets:
+            self._min_count = min(self._buckets)
+        return next(iter(self._buckets[self._min_count]))
+
+    def clear(self):
+        self._counts.clear()
+        self._buckets.clear()
+        self._min_count = 0
+
+
+POLICIES = {policy.name: policy for policy in (LRUPolicy, LFUPolicy)}
+
+
+def make_policy(name: str) -> EvictionPolicy:
+    """Build a policy from its name ("lru" or "lfu"); unknown names fall back to LRU."""
+    policy = POLICIES.get(name.strip().lower())
+    if policy is None:
+        # Comme CACHE_BACKEND : une mauvaise valeur ne doit pas empêcher le démarrage
+        logger.warning(f"Unknown cache eviction policy '{name}' (expected one of {', '.join(POLICIES)}), using lru")
+        policy = LRUPolicy
+    return policy()
@@ -0,0 +1,275 @@
+"""Append-only persistence log for the custom cache.
+
+Writes are buffered in memory (write-behind) and appended to disk in
+batches by a background flusher, so `CustomCache.set()` never pickles the
+whole cache. The log is periodically compacted into a snapshot.
+
+Files in the cache directory:
+- cache_snapshot.pkl : full copy of the cache at the last compaction
+- cache_log.bin      : records appended since that snapshot
+
+Both files start with a generation number. A log is only replayed on top
+of the snapshot with the same generation, so a crash in the middle of a
+compaction never replays outdated records over a newer snapshot. Every
+record is framed with its length and a CRC32, and a torn record at the
+end of the log (crash during an append) is dropped on load.
+"""
+
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "cache_snapshot.pkl"
+LOG_FILE = "cache_log.bin"
+LEGACY_FILE = "cache_data.pkl"
+
+_HEADER = struct.Struct("!Q")      # generation
+_FRAME = struct.Struct("!II")      # payload length, crc32
+
+# Record types
+SET = "set"
+DELETE = "del"
+CLEAR = "clear"
+
+
+def _fsync_dir(directory: Path):
+    """Persist a rename in directory (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write data to path through a temp file + fsync + rename."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+
+
+class CacheLog:
+    """Write-behind, append-only persistence for a dict of cache entries.
+
+    record_*() only touch the in-memory buffer and are cheap. flush() and
+    compact() do the disk I/O and are meant to run in a worker thread,
+    one at a time.
+    """
+
+    def __init__(self, directory: Path, compact_ratio: float = 4.0, min_compact_records: int = 1000,
+                 fsync: bool = True):
+        self._dir = Path(directory)
+        self._compact_ratio = compact_ratio
+        self._min_compact_records = min_compact_records
+        self._fsync = fsync
+        self._buffer_lock = threading.Lock()
+        # Latest pending record per key (last write wins) and a pending clear
+        self._pending: Dict[str, tuple] = {}
+        self._pending_clear = False
+        self._generation = 0
+        self._log_records = 0
+        self._flushes = 0
+        self._compactions = 0
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self._dir / SNAPSHOT_FILE
+
+    @property
+    def log_path(self) -> Path:
+        return self._dir / LOG_FILE
+
+    # ── Loading ──────────────────────────────────────────────────────────────
+    def load(self) -> dict:
+        """Rebuild the cache dict from the snapshot and the log."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        entries: dict = {}
+
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "rb") as f:
+                (self._generation,) = _HEADER.unpack(f.read(_HEADER.size))
+                entries = pickle.load(f)
+        elif (self._dir / LEGACY_FILE).exists():
+            # Ancien format : tout le cache réécrit dans un seul pickle
+            with open(self._dir / LEGACY_FILE, "rb") as f:
+                entries = pickle.load(f).get("cache", {})
+            self.compact(entries)
+            (self._dir / LEGACY_FILE).unlink()
+            logger.info(f"Migrated {len(entries)} entries from legacy {LEGACY_FILE}")
+            return entries
+
+        self._replay_log(entries)
+        return entries
+
+    def _replay_log(self, entries: dict):
+        if not self.log_path.exists():
+            self._reset_log()
+            return
+
+        with open(self.log_path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or _HEADER.unpack(header)[0] != self._generation:
+                # Log d'une génération déjà incluse dans le snapshot
+                f.close()
+                self._reset_log()
+                return
+            valid_end = f.tell()
+            records = 0
+            while True:
+                frame = f.read(_FRAME.size)
+                if len(frame) < _FRAME.size:
+                    break
+                length, crc = _FRAME.unpack(frame)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    logger.warning("Dropping torn record at the end of the cache log")
+                    break
+                self._apply(entries, pickle.loads(payload))
+                records += 1
+                valid_end = f.tell()
+
+        # Tronquer une éventuelle fin corrompue pour que les appends restent lisibles
+        if valid_end != self.log_path.stat().st_size:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(valid_end)
+        self._log_records = records
+
+    @staticmethod
+    def _apply(entries: dict, record: tuple):
+        op = record[0]
+        if op == SET:
+            entries[record[1]] = record[2]
+        elif op == DELETE:
+            entries.pop(record[1], None)
+        elif op == CLEAR:
+            entries.clear()
+
+    def _reset_log(self):
+        _atomic_write(self.log_path, _HEADER.pack(self._generation))
+        self._log_records = 0
+
+    # ── Buffering (called from the event loop) ───────────────────────────────
+    def record_set(self, key: str, entry):
+        with self._buffer_lock:
+            self._pending[key] = (SET, key, entry)
+
+    def record_delete(self, key: str):
+        with self._buffer_lock:
+            self._pending[key] = (DELETE, key)
+
+    def record_clear(self):
+        with self._buffer_lock:
+            self._pending.clear()
+            self._pending_clear = True
+
+    def take_pending(self) -> list:
+        """Remove and return the buffered records, a pending clear first.
+
+        If they cannot be written, give them back with requeue().
+        """
+        with self._buffer_lock:
+            records = list(self._pending.values())
+            if self._pending_clear:
+                records.insert(0, (CLEAR,))
+            self._pending = {}
+            self._pending_clear = False
+        return records
+
+    def requeue(self, records: list):
+        """Put back records whose write failed; records buffered since then win."""
+        with self._buffer_lock:
+            if self._pending_clear:
+                # Un clear enregistré depuis les remplace tous
+                return
+            restored = {}
+            for record in records:
+                if record[0] == CLEAR:
+                    self._pending_clear = True
+                else:
+                    restored[record[1]] = record
+            restored.update(self._pending)
+            self._pending = restored
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending) + int(self._pending_clear)
+
+    def needs_compaction(self, live_entries: int) -> bool:
+        threshold = max(self._min_compact_records, self._compact_ratio * live_entries)
+        return self._log_records + self.pending > threshold
+
+    # ── Disk I/O (worker thread) ─────────────────────────────────────────────
+    def flush(self) -> int:
+        """Append buffered records to the log. Returns the number written.
+
+        If the write fails (e.g. disk full) the records are put back in the
+        buffer and the log is truncated to its previous end; a record that
+        cannot be pickled is dropped on its own.
+        """
+        records = self.take_pending()
+        if not records:
+            return 0
+
+        chunks, written = [], 0
+        for record in records:
+            try:
+                payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.warning(f"Dropping unpicklable cache record for {record[1] if len(record) > 1 else '?'}: {e}")
+                continue
+            chunks.append(_FRAME.pack(len(payload), zlib.crc32(payload)))
+            chunks.append(payload)
+            written += 1
+        try:
+            with open(self.log_path, "ab") as f:
+                end = f.tell()
+                try:
+                    f.write(b"".join(chunks))
+                    f.flush()
+                    if self._fsync:
+                        os.fsync(f.fileno())
+                except BaseException:
+                    # Pas de moitié de batch dans le log : le prochain flush réécrit tout
+                    f.truncate(end)
+                    raise
+        except BaseException:
+            self.requeue(records)
+            raise
+        self._log_records += written
+        self._flushes += 1
+        return written
+
+    def compact(self, entries: dict):
+        """Replace snapshot + log by a snapshot of entries (a consistent copy)."""
+        generation = self._generation + 1
+        data = _HEADER.pack(generation) + pickle.dumps(entries, protocol=pickle.HIGHEST_PROTOCOL)
+        _atomic_write(self.snapshot_path, data)
+        self._generation = generation
+        self._reset_log()
+        self._compactions += 1
+
+    def get_stats(self) -> dict:
+        size: Optional[int] = self.log_path.stat().st_size if self.log_path.exists() else 0
+        return {
+            "pending_writes": self.pending,
+            "log_records": self._log_records,
+            "log_bytes": size,
+            "flushes": self._flushes,
+            "compactions": self._compactions,
+        }
@@ -0,0 +1,182 @@
+"""Background cache warmer.
+
+Refreshes known cache keys before they expire, so the first visitor after
+an expiry does not pay the Ergast latency. Race-dependent keys (standings,
+last race) follow the season calendar: every few minutes during a race
+weekend, right when the results of the next race are due, and only as
+often as their TTL requires in between. Driver stats, a fan-out over the
+whole grid, skip the weekend loop: they are refreshed when the results are
+due, then at the pace of their TTL (the policy's poll TTL while results
+are awaited).
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from season_calendar import SeasonCalendar, results_available
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class WarmJob:
+    """One cache key kept warm, and the state of its last refresh."""
+    key: str
+    ttl: int
+    race_sensitive: bool = False
+    # Rafraîchie toutes les race_interval secondes pendant un week-end (sinon : à la publication des résultats)
+    weekend_poll: bool = True
+    last_run: Optional[datetime] = None
+    last_error: Optional[str] = None
+    refreshes: int = 0
+
+
+class CacheWarmer:
+    """Periodically refreshes the keys returned by discover().
+
+    - refresh(key) fetches a key and stores it in the cache
+    - discover() lists the jobs to keep warm (re-read on every pass, so
+      per-driver keys follow the current drivers list)
+    - load_calendar() returns the season calendar, or None if unknown
+    """
+
+    def __init__(self, refresh: Callable[[str], Awaitable],
+                 discover: Callable[[], Awaitable[List[WarmJob]]],
+                 load_calendar: Callable[[], Awaitable[Optional[SeasonCalendar]]],
+                 lead: float = 0.8, race_interval: float = 600, retry_interval: float = 300,
+                 concurrency: int = 2, max_sleep: float = 300):
+        self._refresh = refresh
+        self._discover = discover
+        self._load_calendar = load_calendar
+        self._lead = lead
+        self._race_interval = timedelta(seconds=race_interval)
+        self._retry_interval = timedelta(seconds=retry_interval)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._max_sleep = max_sleep
+        self._jobs: Dict[str, WarmJob] = {}
+        self._calendar: Optional[SeasonCalendar] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ── Planning ─────────────────────────────────────────────────────────────
+    def next_run(self, job: WarmJob, now: datetime) -> Tuple[datetime, str]:
+        """When job should run next, and why."""
+        if job.last_run is None:
+            return now, "initial warm-up"
+        if job.last_error is not None:
+            return job.last_run + self._retry_interval, "retry after error"
+        planned = job.last_run + timedelta(seconds=job.ttl * self._lead), "before expiry"
+        if not job.race_sensitive or self._calendar is None:
+            return planned
+        weekend = self._calendar.current_weekend(now)
+        if weekend is not None and job.weekend_poll:
+            return min(planned, (job.last_run + self._race_interval, f"race weekend: {weekend.get('raceName')}"))
+        race = weekend or self._calendar.next_race(now)
+        if race is not None:
+            # Résultats attendus avant la prochaine échéance : on les récupère dès leur publication
+            ready = results_available(race)
+            if job.last_run < ready < planned[0]:
+                return ready, f"results of {race.get('raceName')}"
+        return planned
+
+    def plan(self, now: Optional[datetime] = None) -> List[dict]:
+        """Next run of every job, soonest first."""
+        now = now or datetime.now(timezone.utc)
+        rows = []
+        for job in self._jobs.values():
+            when, reason = self.next_run(job, now)
+            rows.append({
+                "key": job.key,
+                "next_run": when.isoformat(),
+                "reason": reason,
+                "race_sensitive": job.race_sensitive,
+                "last_run": job.last_run.isoformat() if job.last_run else None,
+                "last_error": job.last_error,
+                "refreshes": job.refreshes,
+            })
+        rows.sort(key=lambda row: row["next_run"])
+        return rows
+
+    # ── Running ──────────────────────────────────────────────────────────────
+    async def _sync(self):
+        """Reload the calendar and the job list (keeping the state of known jobs)."""
+        try:
+            self._calendar = await self._load_calendar()
+        except Exception as e:
+            logger.warning(f"Cache warmer could not load the season calendar: {e}")
+        jobs = {}
+        for job in await self._discover():
+            known = self._jobs.get(job.key)
+            if known is not None:
+                known.ttl, known.race_sensitive, known.weekend_poll = job.ttl, job.race_sensitive, job.weekend_poll
+                job = known
+            jobs[job.key] = job
+        self._jobs = jobs
+
+    async def _run_job(self, job: WarmJob, now: datetime):
+        async with self._semaphore:
+            try:
+                await self._refresh(job.key)
+                job.last_error = None
+                job.refreshes += 1
+            except Exception as e:
+                job.last_error = str(e) or type(e).__name__
+                logger.warning(f"Cache warmer failed to refresh {job.key}: {job.last_error}")
+            job.last_run = now
+
+    async def run_once(self, now: Optional[datetime] = None) -> float:
+        """Refresh every due job. Returns the delay in seconds until the next due job."""
+        await self._sync()
+        now = now or datetime.now(timezone.utc)
+        due = [job for job in self._jobs.values() if self.next_run(job, now)[0] <= now]
+        await asyncio.gather(*(self._run_job(job, now) for job in due))
+
+        # Le calendrier a pu changer (premier remplissage de schedule:current)
+        if any(job.key == "schedule:current" for job in due):
+            await self._sync()
+        upcoming = [self.next_run(job, now)[0] for job in self._jobs.values()]
+        if not upcoming:
+            return self._max_sleep
+        delay = (min(upcoming) - datetime.now(timezone.utc)).total_seconds()
+        return min(max(delay, 1.0), self._max_sleep)
+
+    async def _loop(self):
+        while True:
+            try:
+                delay = await self.run_once()
+            except Exception as e:
+                logger.warning(f"Cache warmer pass failed: {e}")
+                delay = self._max_sleep
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def get_stats(self, now: Optional[datetime] = None) -> dict:
+        now = now or datetime.now(timezone.utc)
+        weekend = self._calendar.current_weekend(now) if self._calendar else None
+        race = self._calendar.next_race(now) if self._calendar else None
+        return {
+            "running": self.running,
+            "jobs": len(self._jobs),
+            "race_weekend": weekend.get("raceName") if weekend else None,
+            "next_race": {"raceName": race.get("raceName"), "date": race.get("date")} if race else None,
+            "plan": self.plan(now),
+        }
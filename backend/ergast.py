@@ -0,0 +1,189 @@
+"""Paged access to Ergast result listings.
+
+Ergast paginates every listing with `limit`/`offset` and reports the
+number of rows in `MRData.total`. Instead of one `limit=1000` request
+(truncated past 1000 rows, and fully materialized in memory), listings are
+read page by page and folded into running aggregates, so only one page is
+held in memory at a time.
+"""
+
+import hashlib
+import os
+import re
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+import json_codec
+from stats_engine import is_finish
+from timing import phase
+
+ERGAST_PAGE_SIZE = int(os.getenv("ERGAST_PAGE_SIZE", "100"))
+
+# Identifiants d'URL remplacés par des gabarits (cardinalité bornée des métriques)
+_URL_TEMPLATES = [
+    (re.compile(r"/drivers/[^/]+/"), "/drivers/{driver_id}/"),
+    (re.compile(r"/\d{4}/\d+/"), "/{season}/{round}/"),
+    (re.compile(r"/\d{4}(?=[/.])"), "/{season}"),
+]
+
+
+def url_template(path: str, base_path: str = "") -> str:
+    """"/api/f1/2024/3/results.json" -> "/{season}/{round}/results.json" (with base_path "/api/f1")."""
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    for pattern, template in _URL_TEMPLATES:
+        path = pattern.sub(template, path)
+    return path
+
+
+async def get_mrdata(client: httpx.AsyncClient, url: str, params: Optional[dict] = None) -> dict:
+    """GET an Ergast URL and return its `MRData`, timing the call and the parsing."""
+    with phase("upstream"):
+        r = await client.get(url, params=params)
+        r.raise_for_status()
+    with phase("parse"):
+        return json_codec.loads(r.content)["MRData"]
+
+
+async def iter_pages(client: httpx.AsyncClient, url: str, page_size: int = ERGAST_PAGE_SIZE,
+                     offset: int = 0) -> AsyncIterator[List[dict]]:
+    """Yield the `Races` of each page of an Ergast listing, following MRData.total.
+
+    Offsets count result rows, not races: in a season-wide listing a race
+    may be split across two pages (merging is up to the caller).
+    """
+    while True:
+        mrdata = await get_mrdata(client, url, {"limit": page_size, "offset": offset})
+        yield mrdata["RaceTable"]["Races"]
+        # Le serveur peut plafonner limit : on avance de la taille de page réellement servie
+        offset += int(mrdata.get("limit") or page_size)
+        if offset >= int(mrdata["total"]):
+            return
+
+
+async def fetch_races(client: httpx.AsyncClient, url: str, rows_key: str = "Results") -> List[dict]:
+    """Every race of a listing, read page by page.
+
+    A race split across two pages is merged back into one.
+    """
+    races: List[dict] = []
+    async for page in iter_pages(client, url):
+        for race in page:
+            last = races[-1] if races else None
+            if last is not None and (last["season"], last["round"]) == (race["season"], race["round"]):
+                last[rows_key].extend(race.get(rows_key, []))
+            else:
+                races.append(race)
+    return races
+
+
+async def fetch_total(client: httpx.AsyncClient, url: str) -> int:
+    """Number of rows in a listing, without downloading it (limit=1)."""
+    mrdata = await get_mrdata(client, url, {"limit": 1})
+    return int(mrdata["total"])
+
+
+def race_digest(race: dict) -> str:
+    """Short hash of the rows of a race that career totals depend on (position, points, grid, status)."""
+    rows = [(r.get("position"), r.get("points"), r.get("grid"), r.get("status")) for r in race.get("Results", [])]
+    return hashlib.blake2b(json_codec.dumps(rows), digest_size=8).hexdigest()
+
+
+class CareerAggregate:
+    """Running career totals of one driver, updated page by page."""
+
+    __slots__ = ("races", "wins", "podiums", "points", "finishes", "finish_sum",
+                 "last_season", "last_round", "last_digest")
+
+    def __init__(self):
+        self.races = 0
+        self.wins = 0
+        self.podiums = 0
+        self.points = 0.0
+        self.finishes = 0
+        self.finish_sum = 0
+        self.last_season: Optional[int] = None
+        self.last_round: Optional[int] = None
+        self.last_digest: Optional[str] = None
+
+    def add_races(self, races: List[dict]):
+        """Fold a page of a driver's results listing into the totals."""
+        for race in races:
+            self.races += 1
+            for result in race["Results"]:
+                position = int(result["position"])
+                if position == 1:
+                    self.wins += 1
+                if position <= 3:
+                    self.podiums += 1
+                self.points += float(result.get("points") or 0)
+                if is_finish(result.get("status")):
+                    self.finishes += 1
+                    self.finish_sum += position
+            self.last_season = int(race["season"])
+            self.last_round = int(race["round"])
+            self.last_digest = race_digest(race)
+
+    def totals(self) -> dict:
+        return {"total_wins": self.wins, "total_podiums": self.podiums, "total_races": self.races}
+
+    def details(self) -> dict:
+        """Points, DNFs and average finish, as computed by StatsEngine.career_stats."""
+        return {
+            "total_points": round(self.points, 2),
+            "total_dnfs": self.races - self.finishes,
+            "avg_finish": round(self.finish_sum / self.finishes, 2) if self.finishes else None,
+        }
+
+    def to_dict(self) -> dict:
+        """Checkpoint: the totals and the last race they cover."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CareerAggregate":
+        aggregate = cls()
+        for name in cls.__slots__:
+            # Checkpoints antérieurs au digest : None, reconstruits au prochain passage
+            setattr(aggregate, name, data.get(name))
+        if aggregate.finishes is None:
+            # Checkpoint sans points ni arrivées : on repart de zéro
+            return cls()
+        return aggregate
+
+    def covers(self, race: dict) -> bool:
+        """True if race is the last race folded into this aggregate, with the same results."""
+        return ((int(race["season"]), int(race["round"])) == (self.last_season, self.last_round)
+                and race_digest(race) == self.last_digest)
+
+
+async def update_career(client: httpx.AsyncClient, url: str, aggregate: CareerAggregate) -> CareerAggregate:
+    """Bring a career aggregate up to date, fetching only the races it does not cover.
+
+    A driver's results listing is chronological, so the races after the
+    checkpoint start at offset `aggregate.races`. The last covered race is
+    re-read (offset - 1) to check the listing still lines up and its
+    result (position, points, grid, status) is unchanged; if not (e.g. a penalty
+    applied after the race), the career is rebuilt from scratch. Only the
+    last covered race is checked: a correction to an older race is picked
+    up when the checkpoint expires (CAREER_CHECKPOINT_TTL).
+    """
+    if aggregate.races == 0:
+        aggregate = CareerAggregate()
+        async for races in iter_pages(client, url):
+            aggregate.add_races(races)
+        return aggregate
+
+    pages = iter_pages(client, url, offset=aggregate.races - 1)
+    first = True
+    try:
+        async for races in pages:
+            if first:
+                first = False
+                if not races or not aggregate.covers(races[0]):
+                    return await update_career(client, url, CareerAggregate())
+                races = races[1:]
+            aggregate.add_races(races)
+    finally:
+        await pages.aclose()
+    return aggregate
@@ -0,0 +1,297 @@
+"""Local Ergast stand-in for offline live-mode work.
+
+Serves Ergast-compatible JSON for the URL shapes the app requests
+(`/current/drivers.json`, `/{season}/{round}/results.json`, paged season
+and career listings, ...) from mock_data: either its hand-written season
+or a `SyntheticHistory`. Latency (global or per route), random 503s,
+429 rate limiting and the page size cap are configurable, so live-mode
+performance work can be reproduced without ergast.com.
+
+In process, `ErgastStub.handler` plugs into `httpx.MockTransport`. As a
+server:
+
+    cd backend
+    python ergast_stub.py --port 8001 --seasons 10 --latency 0.05 --rate-limit 4
+    ERGAST_BASE_URL=http://localhost:8001/api/f1 USE_MOCK_DATA=false uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+import json_codec
+from mock_data import (
+    MOCK_CONSTRUCTORS,
+    SyntheticHistory,
+    get_constructor_standings,
+    get_driver_standings,
+    get_drivers_current,
+    get_last_race,
+    get_race_results,
+    get_schedule_current,
+)
+
+# Nom de route -> forme d'URL (chemin sans le préfixe /api/f1)
+ROUTES = [
+    ("drivers", re.compile(r"/current/drivers\.json")),
+    ("constructors", re.compile(r"/current/constructors\.json")),
+    ("driverStandings", re.compile(r"/current/driverStandings\.json")),
+    ("constructorStandings", re.compile(r"/current/constructorStandings\.json")),
+    ("schedule", re.compile(r"/current\.json")),
+    ("last", re.compile(r"/current/last/results\.json")),
+    ("race", re.compile(r"/(\d+)/(\d+)/results\.json")),
+    ("season", re.compile(r"/(\d+)/(results|qualifying)\.json")),
+    ("career", re.compile(r"/drivers/([^/]+)/results\.json")),
+    ("poles", re.compile(r"/drivers/([^/]+)/qualifying/1\.json")),
+]
+
+
+class MockDataSource:
+    """The hand-written season of mock_data, with the interface of SyntheticHistory."""
+
+    def __init__(self):
+        self.seasons = [int(get_schedule_current()[0]["season"])]
+        self.rounds = len(get_schedule_current())
+        self.constructors = MOCK_CONSTRUCTORS
+
+    def lineup(self, season: int) -> List[dict]:
+        return get_drivers_current()
+
+    def driver_standings(self, season: int, round_num: Optional[int] = None) -> List[dict]:
+        return get_driver_standings()
+
+    def constructor_standings(self, season: int, round_num: Optional[int] = None) -> List[dict]:
+        return get_constructor_standings()
+
+    def schedule(self, season: int) -> List[dict]:
+        return get_schedule_current()
+
+    def races(self, listing: str = "results", seasons=None) -> Iterator[dict]:
+        if listing != "results" or (seasons and self.seasons[0] not in seasons):
+            return iter(())
+        return iter(sorted(get_race_results() + [get_last_race()], key=lambda r: int(r["round"])))
+
+    def race_result(self, season, round_num) -> Optional[dict]:
+        return next((r for r in self.races(seasons=[int(season)]) if r["round"] == str(round_num)), None)
+
+
+@dataclass(slots=True)
+class StubConfig:
+    latency: float = 0.0                                    # secondes, toutes routes
+    route_latency: Dict[str, float] = field(default_factory=dict)  # par nom de route (ROUTES)
+    jitter: float = 0.0                                     # ± aléatoire ajouté à la latence
+    error_rate: float = 0.0                                 # part de réponses 503
+    rate_limit: float = 0.0                                 # requêtes/s, 0 : illimité (Ergast : 4)
+    burst: int = 4
+    default_limit: int = 30                                 # comme Ergast
+    max_limit: int = 1000
+    seed: int = 0
+
+
+class ErgastStub:
+    """Answers Ergast requests from a data source, with injected latency and failures."""
+
+    def __init__(self, source=None, config: Optional[StubConfig] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.source = source if source is not None else MockDataSource()
+        self.config = config or StubConfig()
+        self.current = self.source.seasons[-1]
+        self._rng = random.Random(self.config.seed)
+        self._clock = clock
+        self._tokens = float(self.config.burst)
+        self._refilled_at = clock()
+        self._careers: Optional[Dict[str, Tuple[List[dict], int]]] = None
+        self.calls = 0
+        self.by_route: Dict[str, int] = {}
+        self.errors = 0
+        self.throttled = 0
+
+    # ── Data ─────────────────────────────────────────────────────────────────
+    def _career_index(self) -> Dict[str, Tuple[List[dict], int]]:
+        """driverId -> (races with only their result, pole count)."""
+        if self._careers is None:
+            races: Dict[str, List[dict]] = {}
+            poles: Dict[str, int] = {}
+            for race in self.source.races():
+                for result in race["Results"]:
+                    races.setdefault(result["Driver"]["driverId"], []).append({**race, "Results": [result]})
+            for race in self.source.races("qualifying"):
+                pole = race["QualifyingResults"][0]["Driver"]["driverId"]
+                poles[pole] = poles.get(pole, 0) + 1
+            self._careers = {d: (r, poles.get(d, 0)) for d, r in races.items()}
+        return self._careers
+
+    @staticmethod
+    def _page(races: List[dict], rows_key: str, limit: int, offset: int) -> Tuple[List[dict], int]:
+        """Ergast paging: limit and offset count result rows, a race may span two pages."""
+        rows = [(race, row) for race in races for row in race[rows_key]]
+        page: List[dict] = []
+        for race, row in rows[offset:offset + limit]:
+            if page and page[-1]["season"] == race["season"] and page[-1]["round"] == race["round"]:
+                page[-1][rows_key].append(row)
+            else:
+                page.append({**race, rows_key: [row]})
+        return page, len(rows)
+
+    @staticmethod
+    def _mrdata(table: str, content: dict, limit: int, offset: int, total: int) -> dict:
+        return {"MRData": {"limit": str(limit), "offset": str(offset), "total": str(total), table: content}}
+
+    def route_of(self, path: str) -> Tuple[Optional[str], Optional[re.Match]]:
+        for name, pattern in ROUTES:
+            match = pattern.fullmatch(path)
+            if match:
+                return name, match
+        return None, None
+
+    def body(self, name: str, match: re.Match, limit: int, offset: int) -> dict:
+        """Ergast JSON of a route."""
+        source, current = self.source, self.current
+        if name == "drivers":
+            drivers = [{k: v for k, v in d.items() if k != "constructorId"} for d in source.lineup(current)]
+            return self._mrdata("DriverTable", {"Drivers": drivers}, limit, offset, len(drivers))
+        if name == "constructors":
+            constructors = source.constructors
+            return self._mrdata("ConstructorTable", {"Constructors": constructors}, limit, offset, len(constructors))
+        if name in ("driverStandings", "constructorStandings"):
+            drivers = name == "driverStandings"
+            rows = source.driver_standings(current) if drivers else source.constructor_standings(current)
+            lists = [{"season": str(current), "round": str(source.rounds),
+                      "DriverStandings" if drivers else "ConstructorStandings": rows}]
+            return self._mrdata("StandingsTable", {"StandingsLists": lists}, limit, offset, len(rows))
+        if name == "schedule":
+            races = source.schedule(current)
+            return self._mrdata("RaceTable", {"season": str(current), "Races": races}, limit, offset, len(races))
+        if name in ("last", "race"):
+            if name == "last":
+                races = list(source.races(seasons=[current]))
+                race = races[-1] if races else None
+            else:
+                race = source.race_result(*match.groups())
+            total = len(race["Results"]) if race else 0
+            return self._mrdata("RaceTable", {"Races": [race] if race else []}, limit, offset, total)
+        if name == "season":
+            season, listing = int(match.group(1)), match.group(2)
+            rows_key = "Results" if listing == "results" else "QualifyingResults"
+            races = list(source.races(listing, [season])) if season in source.seasons else []
+            page, total = self._page(races, rows_key, limit, offset)
+            return self._mrdata("RaceTable", {"season": str(season), "Races": page}, limit, offset, total)
+        races, poles = self._career_index().get(match.group(1), ([], 0))
+        if name == "poles":
+            # Seul le total est lu (limit=1) : pas de courses dans la réponse
+            return self._mrdata("RaceTable", {"Races": []}, limit, offset, poles)
+        return self._mrdata("RaceTable", {"Races": races[offset:offset + limit]}, limit, offset, len(races))
+
+    # ── Failure injection ────────────────────────────────────────────────────
+    def _take_token(self) -> bool:
+        """Token bucket: rate_limit requests per second, bursts of `burst`."""
+        if self.config.rate_limit <= 0:
+            return True
+        now = self._clock()
+        self._tokens = min(float(self.config.burst), self._tokens + (now - self._refilled_at) * self.config.rate_limit)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _latency(self, name: Optional[str]) -> float:
+        latency = self.config.route_latency.get(name, self.config.latency)
+        if self.config.jitter:
+            latency += self._rng.uniform(-self.config.jitter, self.config.jitter)
+        return max(0.0, latency)
+
+    async def handle(self, path: str, params) -> Tuple[int, Optional[dict], Dict[str, str]]:
+        """(status, JSON body, headers) of a request on path (without the /api/f1 prefix)."""
+        name, match = self.route_of(path)
+        self.calls += 1
+        self.by_route[name or "unknown"] = self.by_route.get(name or "unknown", 0) + 1
+        if not self._take_token():
+            self.throttled += 1
+            retry_after = max(1, round(1 / self.config.rate_limit))
+            return 429, None, {"Retry-After": str(retry_after)}
+        latency = self._latency(name)
+        if latency:
+            await asyncio.sleep(latency)
+        if self.config.error_rate and self._rng.random() < self.config.error_rate:
+            self.errors += 1
+            return 503, None, {}
+        if name is None:
+            return 404, None, {}
+        limit = min(int(params.get("limit", self.config.default_limit)), self.config.max_limit)
+        offset = int(params.get("offset", 0))
+        return 200, self.body(name, match, limit, offset), {}
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        """httpx.MockTransport handler."""
+        path = request.url.path
+        if path.startswith("/api/f1"):
+            path = path[len("/api/f1"):]
+        status, body, headers = await self.handle(path, request.url.params)
+        content = json_codec.dumps(body) if body is not None else b""
+        return httpx.Response(status, content=content, headers={"Content-Type": "application/json", **headers})
+
+    def get_stats(self) -> dict:
+        return {"calls": self.calls, "by_route": dict(self.by_route), "errors": self.errors,
+                "throttled": self.throttled, "current_season": self.current}
+
+
+def create_app(stub: ErgastStub):
+    """ASGI app serving the stub under /api/f1."""
+    from fastapi import FastAPI, Request, Response
+
+    app = FastAPI(title="Ergast stub")
+
+    @app.get("/_stub/stats")
+    async def stub_stats():
+        return stub.get_stats()
+
+    @app.get("/api/f1/{path:path}")
+    async def ergast(path: str, request: Request):
+        status, body, headers = await stub.handle("/" + path, request.query_params)
+        content = json_codec.dumps(body) if body is not None else b""
+        return Response(content, status_code=status, media_type="application/json", headers=headers)
+
+    return app
+
+
+def _route_latency(value: str) -> Dict[str, float]:
+    """"career=0.2,race=0.05" -> {"career": 0.2, "race": 0.05}"""
+    pairs = (item.split("=", 1) for item in value.split(",") if item)
+    return {name.strip(): float(seconds) for name, seconds in pairs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--seasons", type=int, default=0, help="saisons synthétiques (0 : saison mockée de mock_data)")
+    parser.add_argument("--rounds", type=int, default=22)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--route-latency", type=_route_latency, default={},
+                        help=f"par route, ex. career=0.2,race=0.05 ({', '.join(n for n, _ in ROUTES)})")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requêtes/s avant des 429 (0 : illimité)")
+    parser.add_argument("--burst", type=int, default=4)
+    parser.add_argument("--max-limit", type=int, default=1000, help="taille de page maximale")
+    args = parser.parse_args()
+
+    source = SyntheticHistory(args.seasons, args.rounds, seed=args.seed) if args.seasons else MockDataSource()
+    config = StubConfig(latency=args.latency, route_latency=args.route_latency, jitter=args.jitter,
+                        error_rate=args.error_rate, rate_limit=args.rate_limit, burst=args.burst,
+                        max_limit=args.max_limit, seed=args.seed)
+
+    import uvicorn
+    uvicorn.run(create_app(ErgastStub(source, config)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Fast JSON encoding with an optional dependency on orjson.
+
+orjson is several times faster than the standard library and produces
+compact UTF-8 bytes directly. Without it, the stdlib encoder is used with
+the same compact output.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """Encode value as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Decode JSON bytes (or str)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+ENCODER = "orjson" if orjson is not None else "json"
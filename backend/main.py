@@ -1,15 +1,47 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import httpx
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
-from typing import Optional, Dict, Tuple
+import re
+from typing import Any, Callable, Optional, Dict, List, Set, Tuple, Union
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 import asyncio
+import atexit
 import logging
-import pickle
+import time
+import weakref
 from pathlib import Path
 
+from batch import run_batch
+from cache_backends import NEGATIVE, CacheBackend, RedisCache
+from cache_eviction import approx_size, make_policy
+from cache_persistence import CacheLog
+from cache_warmer import CacheWarmer, WarmJob
+from ergast import CareerAggregate, fetch_races, fetch_total, get_mrdata, iter_pages, update_career, url_template
+from metrics import (
+    CACHE_COALESCED,
+    CACHE_EVICTIONS,
+    CACHE_LOOKUPS,
+    FANOUT_DURATION,
+    FANOUT_FAILED,
+    REGISTRY,
+    Gauge,
+    InstrumentedTransport,
+    MetricsMiddleware,
+    key_prefix,
+)
+from payloads import EncodedPayload, encode_payload, payload_response
+from projection import project_payload
+from results_store import ResultsIngester, ResultsStore
+from season_calendar import SeasonCalendar
+from stats_engine import ENGINE, ResultsTable, StatsEngine
+from timing import ServerTimingMiddleware, locked, phase, record as record_phase
+from ttl_policy import DEFAULT_TTLS, TTLDecision, TTLPolicy, key_kind
+
 # Import mock data en alias pour éviter tout écrasement
 from mock_data import (
     get_constructor_standings as mock_get_constructor_standings,
@@ -19,10 +51,10 @@ from mock_data import (
     get_constructors_current as mock_get_constructors_current,
     get_drivers_current as mock_get_drivers_current,
     get_race_result as mock_get_race_result,
+    get_race_results as mock_get_race_results,
+    SyntheticHistory,
 )
 
-app = FastAPI(title="F1 Dashboard API", version="1.0.0")
-
 # ── Logging ────────────────────────────────────────────────────────────────────
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
@@ -31,6 +63,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ── App ───────────────────────────────────────────────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared HTTP client on startup and close it on shutdown."""
+    await open_http_client()
+    await custom_cache.start()
+    if RESULTS_DB_ENABLED and not USE_MOCK_DATA:
+        # Ouverture SQLite et état du rattrapage : hors de la boucle
+        (await asyncio.to_thread(open_results_store)).start()
+    if CACHE_WARMER_ENABLED and not USE_MOCK_DATA:
+        cache_warmer.start()
+    yield
+    await cache_warmer.stop()
+    await close_results_store()
+    await custom_cache.close()
+    await close_http_client()
+
+app = FastAPI(title="F1 Dashboard API", version="1.0.0", lifespan=lifespan)
+
 # ── CORS ───────────────────────────────────────────────────────────────────────
 # En prod, préfère définir FRONTEND_ORIGIN pour éviter le "*"
 FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN", "*")
@@ -42,141 +93,1098 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ── Metrics ───────────────────────────────────────────────────────────────────
+# Latence et statut par route, exposés sur /metrics
+app.add_middleware(MetricsMiddleware)
+
+# ── Server-Timing ─────────────────────────────────────────────────────────────
+# Durée des phases (cache, verrou, amont, parsing, encodage) dans le header
+# Server-Timing ; log JSON d'un échantillon de requêtes et des requêtes lentes
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+TIMING_LOG_SAMPLE_RATE = float(os.getenv("TIMING_LOG_SAMPLE_RATE", "0"))
+TIMING_LOG_SLOW_MS = float(os.getenv("TIMING_LOG_SLOW_MS", "0"))
+app.add_middleware(
+    ServerTimingMiddleware,
+    header=SERVER_TIMING_ENABLED,
+    sample_rate=TIMING_LOG_SAMPLE_RATE,
+    slow_ms=TIMING_LOG_SLOW_MS,
+    allow_origin=FRONTEND_ORIGIN,
+)
+
 # ── Mode mock/live ────────────────────────────────────────────────────────────
 USE_MOCK_DATA = os.getenv("USE_MOCK_DATA", "true").strip().lower() in {"1", "true", "yes", "on"}
+# Historique synthétique en mode mock (0 = désactivé) : N saisons × M manches jusqu'à 2024
+MOCK_HISTORY_SEASONS = int(os.getenv("MOCK_HISTORY_SEASONS", "0"))
+MOCK_HISTORY_ROUNDS = int(os.getenv("MOCK_HISTORY_ROUNDS", "22"))
+MOCK_HISTORY_SEED = int(os.getenv("MOCK_HISTORY_SEED", "0"))
+# Nombre max de ressources par requête POST /batch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "20"))
 
 # ── Cache configuration ───────────────────────────────────────────────────────
 CACHE_DIR = os.getenv("CACHE_DIR", "/tmp/f1_cache")
 CACHE_PERSIST = os.getenv("CACHE_PERSIST", "true").strip().lower() in {"1", "true", "yes", "on"}
+CACHE_FLUSH_INTERVAL = float(os.getenv("CACHE_FLUSH_INTERVAL", "1"))
+CACHE_FLUSH_BATCH = int(os.getenv("CACHE_FLUSH_BATCH", "256"))
+CACHE_COMPACT_RATIO = float(os.getenv("CACHE_COMPACT_RATIO", "4"))
+CACHE_FSYNC = os.getenv("CACHE_FSYNC", "true").strip().lower() in {"1", "true", "yes", "on"}
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_EVICTION_POLICY = os.getenv("CACHE_EVICTION_POLICY", "lru")
+CACHE_SWEEP_INTERVAL = float(os.getenv("CACHE_SWEEP_INTERVAL", "300"))
+# Variantes gzip/brotli des réponses, calculées une fois à l'écriture en cache
+CACHE_COMPRESS = os.getenv("CACHE_COMPRESS", "true").strip().lower() in {"1", "true", "yes", "on"}
+# "memory" (CustomCache, par réplica) ou "redis" (partagé entre réplicas)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+REDIS_PREFIX = os.getenv("REDIS_PREFIX", "f1:")
+# Préchauffage : rafraîchit les clés avant expiration (mode live uniquement)
+CACHE_WARMER_ENABLED = os.getenv("CACHE_WARMER_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+CACHE_WARMER_LEAD = float(os.getenv("CACHE_WARMER_LEAD", "0.8"))
+CACHE_WARMER_RACE_INTERVAL = float(os.getenv("CACHE_WARMER_RACE_INTERVAL", "600"))
+CACHE_WARMER_CONCURRENCY = int(os.getenv("CACHE_WARMER_CONCURRENCY", "2"))
+
+# Base de résultats locale (SQLite) alimentée depuis Ergast, mode live uniquement
+RESULTS_DB_ENABLED = os.getenv("RESULTS_DB_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"}
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", os.path.join(CACHE_DIR, "results.sqlite3"))
+RESULTS_DB_FIRST_SEASON = int(os.getenv("RESULTS_DB_FIRST_SEASON", "1950"))
+RESULTS_DB_REFRESH_INTERVAL = float(os.getenv("RESULTS_DB_REFRESH_INTERVAL", "600"))
+RESULTS_DB_SEASON_PAUSE = float(os.getenv("RESULTS_DB_SEASON_PAUSE", "1"))
+RESULTS_DB_MAX_RETRIES = int(os.getenv("RESULTS_DB_MAX_RETRIES", "5"))
+RESULTS_DB_RECHECK_WINDOW = float(os.getenv("RESULTS_DB_RECHECK_WINDOW", str(7 * 86400)))
 
 # ── Ergast API ────────────────────────────────────────────────────────────────
-ERGAST_BASE_URL = "https://ergast.com/api/f1"
+# Surchargeable pour viser un Ergast local (ergast_stub.py) ou un miroir
+ERGAST_BASE_URL = os.getenv("ERGAST_BASE_URL", "https://ergast.com/api/f1").rstrip("/")
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "20"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"}
+# /drivers/stats : nombre de pilotes récupérés en parallèle et délai max par pilote
+DRIVER_STATS_CONCURRENCY = int(os.getenv("DRIVER_STATS_CONCURRENCY", "6"))
+DRIVER_STATS_TIMEOUT = float(os.getenv("DRIVER_STATS_TIMEOUT", "15"))
+# TTL court pour une réponse partielle (certains pilotes en échec)
+PARTIAL_RESULT_TTL = int(os.getenv("PARTIAL_RESULT_TTL", "300"))
+# Bornes des TTL calculés depuis le calendrier, et TTL de sondage après une course
+TTL_MIN = int(os.getenv("TTL_MIN", "60"))
+TTL_MAX = int(os.getenv("TTL_MAX", str(7 * 86400)))
+TTL_POLL = int(os.getenv("TTL_POLL", "300"))
+# Entrée négative (pas de données en amont) hors calendrier ; une manche du calendrier
+# pas encore courue est gardée jusqu'à l'heure de ses résultats
+TTL_NEGATIVE = int(os.getenv("TTL_NEGATIVE", "3600"))
+# Durée de conservation des agrégats de carrière (point de reprise des mises à jour incrémentales)
+CAREER_CHECKPOINT_TTL = int(os.getenv("CAREER_CHECKPOINT_TTL", str(90 * 86400)))
+
+# ── Shared HTTP client ────────────────────────────────────────────────────────
+# Un seul client httpx pour toute l'app : les connexions vers Ergast restent
+# ouvertes (keep-alive) et sont réutilisées d'une requête à l'autre.
+_http_client: Optional[httpx.AsyncClient] = None
+# Transport instrumenté du client partagé : connexions ouvertes / réutilisées
+_http_transport: Optional[InstrumentedTransport] = None
+_http_requests = 0
+_http_errors = 0
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+async def _count_request(request: httpx.Request):
+    global _http_requests
+    _http_requests += 1
+
+async def _count_response(response: httpx.Response):
+    global _http_errors
+    if response.status_code >= 400:
+        _http_errors += 1
+
+def _create_http_client() -> httpx.AsyncClient:
+    http2 = HTTP2_ENABLED and _http2_available()
+    if HTTP2_ENABLED and not http2:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is missing, falling back to HTTP/1.1")
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    # Transport instrumenté : latence, statut et erreurs par gabarit d'URL Ergast
+    global _http_transport
+    base_path = httpx.URL(ERGAST_BASE_URL).path
+    transport = _http_transport = InstrumentedTransport(
+        httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+        lambda path: url_template(path, base_path),
+    )
+    return httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT,
+        transport=transport,
+        headers={"User-Agent": "f1-dashboard/1.0"},
+        event_hooks={"request": [_count_request], "response": [_count_response]},
+    )
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Create the shared client (called from the app lifespan)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _create_http_client()
+        logger.info(
+            f"HTTP client opened (max_connections={HTTP_MAX_CONNECTIONS}, "
+            f"max_keepalive={HTTP_MAX_KEEPALIVE}, keepalive_expiry={HTTP_KEEPALIVE_EXPIRY}s)"
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily when the lifespan did not run."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _create_http_client()
+    return _http_client
+
+def get_http_stats() -> dict:
+    """Connection pool usage of the shared client."""
+    stats = {
+        "open": _http_client is not None and not _http_client.is_closed,
+        "requests": _http_requests,
+        "errors": _http_errors,
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "max_keepalive": HTTP_MAX_KEEPALIVE,
+        "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+        "http2": HTTP2_ENABLED and _http2_available(),
+        "connections": 0,
+        "connections_opened": 0,
+        "connections_reused": 0,
+        "active": None,
+        "idle": None,
+    }
+    transport = _http_transport
+    if stats["open"] and transport is not None:
+        stats.update(connections=transport.open_connections, connections_opened=transport.connections_opened,
+                     connections_reused=transport.connections_reused)
+        stats.update(_pool_usage(transport.wrapped))
+    return stats
+
+def _pool_usage(transport) -> dict:
+    """Active/idle connections from httpcore's pool, if its private attributes are still there.
+
+    httpcore has no public API for the pool state: any missing attribute
+    leaves active/idle at None instead of failing /cache/stats.
+    """
+    try:
+        connections = list(transport._pool.connections)
+        idle = sum(1 for c in connections if c.is_idle())
+    except Exception:
+        return {}
+    return {"active": len(connections) - idle, "idle": idle}
 
 # ── Custom Cache Implementation ───────────────────────────────────────────────
-class CustomCache:
+@dataclass(slots=True)
+class CacheEntry:
+    """A cached value with a soft and a hard expiry.
+
+    Until `expiry` the value is fresh. Between `expiry` and `stale_until` it
+    may still be served (stale-while-revalidate) while a refresh runs.
+    """
+    value: Any
+    expiry: datetime
+    stale_until: datetime
+    size: int = 0
+
+class CustomCache(CacheBackend):
     """Custom cache with TTL support and optional file-based persistence.
     
     Features:
     - In-memory caching with automatic TTL expiration
-    - Optional file-based persistence for cache durability across restarts
+    - Optional persistence through an append-only log written in the
+      background (write-behind), compacted periodically
     - Thread-safe operations using asyncio locks
     - Statistics tracking (hits, misses, hit rate)
+    - Optional stale window per entry (stale-while-revalidate)
+    - Bounded size (entry count and approximate bytes) with LRU/LFU
+      eviction and a periodic sweep of expired entries
+    - Encoded payloads are stored with their gzip/brotli variants, so hits
+      are served compressed without compressing again
     """
     
-    def __init__(self, cache_dir: str = CACHE_DIR, persist: bool = CACHE_PERSIST):
-        self._cache: Dict[str, Tuple[any, datetime]] = {}
+    def __init__(self, cache_dir: str = CACHE_DIR, persist: bool = CACHE_PERSIST,
+                 max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES,
+                 eviction_policy: str = CACHE_EVICTION_POLICY, compress: bool = CACHE_COMPRESS):
+        super().__init__(compress=compress)
+        self._cache: Dict[str, CacheEntry] = {}
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._policy = make_policy(eviction_policy)
+        self._bytes = 0
+        self._evictions = 0
+        self._expired_swept = 0
+        self._sweeper: Optional[asyncio.Task] = None
         self._lock = asyncio.Lock()
-        self._hits = 0
-        self._misses = 0
         self._persist = persist
         self._cache_dir = Path(cache_dir)
+        self._log: Optional[CacheLog] = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._atexit_hook: Optional[Callable[[], None]] = None
         
         # Create cache directory if persistence is enabled
         if self._persist:
-            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            self._log = CacheLog(self._cache_dir, compact_ratio=CACHE_COMPACT_RATIO, fsync=CACHE_FSYNC)
             self._load_cache()
+            # Dernier flush si l'app s'arrête sans passer par close() ; référence faible :
+            # les instances jetables (tests, benchmarks) restent libérables
+            ref = weakref.ref(self)
+
+            def flush_at_exit():
+                cache = ref()
+                if cache is not None:
+                    cache._flush_sync()
+
+            self._atexit_hook = flush_at_exit
+            atexit.register(flush_at_exit)
             logger.info(f"Custom cache initialized with persistence at {self._cache_dir}")
         else:
             logger.info("Custom cache initialized (in-memory only)")
     
-    def _get_cache_file_path(self) -> Path:
-        """Get the path to the cache persistence file."""
-        return self._cache_dir / "cache_data.pkl"
-    
     def _load_cache(self):
         """Load cache from disk if persistence is enabled."""
         if not self._persist:
             return
         
-        cache_file = self._get_cache_file_path()
-        if cache_file.exists():
+        try:
+            loaded = self._log.load()
+            self._cache = {
+                # Older cache files stored (value, expiry) tuples
+                k: CacheEntry(v[0], v[1], v[1]) if isinstance(v, tuple) else v
+                for k, v in loaded.items()
+            }
+            # Clean expired entries on load
+            now = datetime.now()
+            expired_keys = [k for k, entry in self._cache.items() if now >= entry.stale_until]
+            for key in expired_keys:
+                del self._cache[key]
+                self._log.record_delete(key)
+            # Rebuild size accounting and eviction order, oldest expiry first
+            for key, entry in sorted(self._cache.items(), key=lambda item: item[1].expiry):
+                entry.size = approx_size(entry.value)
+                self._bytes += entry.size
+                self._policy.add(key)
+            self._evict()
+            logger.info(f"Loaded {len(self._cache)} cache entries from disk (removed {len(expired_keys)} expired)")
+        except Exception as e:
+            logger.warning(f"Failed to load cache from disk: {e}")
+            self._cache = {}
+            self._bytes = 0
+            self._policy.clear()
+
+    def _record(self, op: str, key: Optional[str] = None, entry: Optional[CacheEntry] = None):
+        """Buffer a change for the persistence log (no disk I/O here)."""
+        if self._log is None:
+            return
+        if op == "set":
+            self._log.record_set(key, entry)
+        elif op == "del":
+            self._log.record_delete(key)
+        else:
+            self._log.record_clear()
+        if self._flush_event is not None and self._log.pending >= CACHE_FLUSH_BATCH:
+            self._flush_event.set()
+
+    async def start(self):
+        """Start the background tasks: expired-entry sweeper and persistence flusher."""
+        if self._sweeper is None and CACHE_SWEEP_INTERVAL > 0:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+        if self._log is None or self._flusher is not None:
+            return
+        self._flush_event = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the background tasks and write what is still buffered."""
+        for task in (self._sweeper, self._flusher):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._sweeper = None
+        self._flusher = None
+        self._flush_event = None
+        await self.flush()
+        if self._atexit_hook is not None:
+            atexit.unregister(self._atexit_hook)
+            self._atexit_hook = None
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(CACHE_SWEEP_INTERVAL)
+            removed = await self.sweep_expired()
+            if removed:
+                logger.debug(f"Swept {removed} expired cache entries")
+
+    async def sweep_expired(self) -> int:
+        """Remove every entry past its hard expiry. Returns the number removed."""
+        async with self._lock:
+            now = datetime.now()
+            expired_keys = [k for k, entry in self._cache.items() if now >= entry.stale_until]
+            for key in expired_keys:
+                self._remove(key)
+            self._expired_swept += len(expired_keys)
+            return len(expired_keys)
+
+    def _remove(self, key: str):
+        """Drop key from the dict, the size accounting and the policy (lock held)."""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        self._policy.remove(key)
+        self._record("del", key)
+
+    def _evict(self, keep: Optional[str] = None):
+        """Evict entries until the cache fits its budgets (lock held).
+
+        keep is the key just written: it is only evicted if it alone is over budget.
+        """
+        while len(self._cache) > self._max_entries or self._bytes > self._max_bytes:
+            victim = self._policy.victim()
+            if victim is None:
+                break
+            if victim == keep and len(self._cache) > 1:
+                # Le plus ancien est celui qu'on vient d'écrire : on le repasse en tête
+                self._policy.touch(victim)
+                victim = self._policy.victim()
+                if victim == keep:
+                    break
+            self._remove(victim)
+            self._evictions += 1
+            CACHE_EVICTIONS.inc(key_prefix(victim))
+
+    async def _flush_loop(self):
+        while True:
             try:
-                with open(cache_file, 'rb') as f:
-                    data = pickle.load(f)
-                    self._cache = data.get('cache', {})
-                    # Clean expired entries on load
-                    now = datetime.now()
-                    expired_keys = [k for k, (_, expiry) in self._cache.items() if now >= expiry]
-                    for key in expired_keys:
-                        del self._cache[key]
-                    logger.info(f"Loaded {len(self._cache)} cache entries from disk (removed {len(expired_keys)} expired)")
-            except Exception as e:
-                logger.warning(f"Failed to load cache from disk: {e}")
-                self._cache = {}
-    
-    def _save_cache(self):
-        """Save cache to disk if persistence is enabled."""
-        if not self._persist:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=CACHE_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write buffered changes to disk in a worker thread, compacting when the log is too long."""
+        if self._log is None:
             return
-        
+        async with self._flush_lock:
+            try:
+                if self._log.needs_compaction(len(self._cache)):
+                    # Copie et retrait du buffer sans await entre les deux : le
+                    # snapshot contient exactement les écritures retirées
+                    snapshot = dict(self._cache)
+                    taken = self._log.take_pending()
+                    try:
+                        await asyncio.to_thread(self._log.compact, snapshot)
+                    except BaseException:
+                        # Compaction ratée : ces écritures iront au prochain flush
+                        self._log.requeue(taken)
+                        raise
+                elif self._log.pending:
+                    await asyncio.to_thread(self._log.flush)
+            except Exception as e:
+                logger.warning(f"Failed to save cache to disk: {e}")
+
+    def _flush_sync(self):
         try:
-            cache_file = self._get_cache_file_path()
-            with open(cache_file, 'wb') as f:
-                pickle.dump({'cache': self._cache}, f)
+            self._log.flush()
         except Exception as e:
             logger.warning(f"Failed to save cache to disk: {e}")
     
-    async def get(self, key: str) -> Optional[any]:
-        """Get value from cache if not expired."""
-        async with self._lock:
-            if key in self._cache:
-                value, expiry = self._cache[key]
-                if datetime.now() < expiry:
+    async def lookup(self, key: str, allow_stale: bool = False) -> Tuple[Optional[any], bool]:
+        """Get (value, is_stale) from cache.
+
+        With allow_stale, an entry past its soft expiry but inside its stale
+        window is returned with is_stale=True instead of counting as a miss.
+        """
+        async with locked(self._lock):
+            entry = self._cache.get(key)
+            if entry is not None:
+                now = datetime.now()
+                if now < entry.expiry:
                     self._hits += 1
-                    return value
+                    self._policy.touch(key)
+                    return entry.value, False
+                if now < entry.stale_until:
+                    if allow_stale:
+                        self._stale_hits += 1
+                        self._policy.touch(key)
+                        return entry.value, True
                 else:
                     # Expired, remove it
-                    del self._cache[key]
-                    self._save_cache()
+                    self._remove(key)
             self._misses += 1
-            return None
-    
-    async def set(self, key: str, value: any, ttl: int):
-        """Set value in cache with TTL in seconds."""
+            return None, False
+
+    async def peek(self, key: str) -> Optional[any]:
+        """Fresh or stale value without touching statistics or eviction order."""
         async with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or datetime.now() >= entry.stale_until:
+                return None
+            return entry.value
+
+    async def set(self, key: str, value: any, ttl: int, stale_ttl: int = 0):
+        """Set value in cache with TTL in seconds.
+
+        stale_ttl extends the entry's lifetime past ttl: during that window it
+        is only returned by lookup(..., allow_stale=True).
+        """
+        value = await self.prepare(value)
+        # Estimation de taille hors du verrou
+        size = approx_size(value)
+        async with locked(self._lock):
             expiry = datetime.now() + timedelta(seconds=ttl)
-            self._cache[key] = (value, expiry)
-            self._save_cache()
-    
+            entry = CacheEntry(value, expiry, expiry + timedelta(seconds=stale_ttl), size)
+            previous = self._cache.get(key)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._cache[key] = entry
+            self._bytes += size
+            self._policy.add(key)
+            self._record("set", key, entry)
+            self._evict(keep=key)
+
+    async def delete(self, key: str):
+        """Remove key from the cache."""
+        async with self._lock:
+            self._remove(key)
+
     async def clear(self):
         """Clear all cache entries."""
         async with self._lock:
             self._cache.clear()
-            self._hits = 0
-            self._misses = 0
-            self._save_cache()
+            self._policy.clear()
+            self._bytes = 0
+            self._reset_counters()
+            self._record("clear")
     
     def get_stats(self) -> dict:
         """Get cache statistics."""
-        total = self._hits + self._misses
-        hit_rate = (self._hits / total * 100) if total > 0 else 0
         return {
             "entries": len(self._cache),
-            "hits": self._hits,
-            "misses": self._misses,
-            "hit_rate": f"{hit_rate:.2f}%",
-            "persistence": "enabled" if self._persist else "disabled"
+            **super().get_stats(),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "max_entries": self._max_entries,
+            "evictions": self._evictions,
+            "expired_swept": self._expired_swept,
+            "eviction_policy": self._policy.name,
+            "persistence": "enabled" if self._persist else "disabled",
+            **({"persistence_log": self._log.get_stats()} if self._log is not None else {}),
         }
 
-# Initialize the custom cache
-custom_cache = CustomCache()
+def create_cache() -> CacheBackend:
+    """Build the cache backend selected by CACHE_BACKEND."""
+    if CACHE_BACKEND == "redis":
+        try:
+            cache = RedisCache(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, prefix=REDIS_PREFIX,
+                               compress=CACHE_COMPRESS)
+            logger.info(f"Redis cache backend at {REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}")
+            return cache
+        except RuntimeError as e:
+            logger.warning(f"{e}, falling back to the in-memory cache")
+    elif CACHE_BACKEND != "memory":
+        logger.warning(f"Unknown CACHE_BACKEND '{CACHE_BACKEND}', using the in-memory cache")
+    return CustomCache()
+
+# Initialize the cache backend
+custom_cache: CacheBackend = create_cache()
+
+# Lus au moment du scrape de /metrics
+Gauge("cache_entries", "Entries in the cache backend.", collect=lambda: custom_cache.get_stats().get("entries", 0))
+Gauge("cache_bytes", "Approximate bytes held by the in-memory cache.",
+      collect=lambda: custom_cache.get_stats().get("bytes", 0))
+Gauge("cache_fetches_in_flight", "Upstream fetches in flight (one per key).",
+      collect=lambda: custom_cache.get_stats().get("inflight", 0))
+
+# Background refresh tasks (kept referenced until they finish)
+_refresh_tasks: Set[asyncio.Task] = set()
 
-async def get_cached_data(key: str, fetch_function, ttl: int = 3600):
-    """Récupère les données depuis le cache custom, sinon via fetch_function(), puis met en cache."""
+# None : TTL calculé par la politique de TTL (calendrier de la saison)
+TTL = Union[None, int, Callable[[Any], Optional[int]]]
+
+# ── TTL policy ────────────────────────────────────────────────────────────────
+ttl_policy = TTLPolicy(min_ttl=TTL_MIN, max_ttl=TTL_MAX, poll_ttl=TTL_POLL, negative_ttl=TTL_NEGATIVE)
+# Calendrier décodé, réutilisé tant que le payload de schedule:current ne change pas
+_calendar: Tuple[Optional[str], Optional[SeasonCalendar]] = (None, None)
+
+async def load_season_calendar() -> Optional[SeasonCalendar]:
+    """Season calendar from the cached schedule:current (None if not cached)."""
+    global _calendar
+    value = await custom_cache.peek("schedule:current")
+    if not isinstance(value, EncodedPayload):
+        return SeasonCalendar(value) if value else None
+    if _calendar[0] != value.etag:
+        _calendar = (value.etag, SeasonCalendar(value.decode()))
+    return _calendar[1]
+
+async def decide_ttl(key: str, data: Any, ttl: TTL = None) -> int:
+    """TTL for data fetched for key: the caller's (int or callable), else the policy's."""
+    now = datetime.now(timezone.utc)
+    if callable(ttl):
+        ttl = ttl(data)
+    if ttl is not None:
+        ttl_policy.record(TTLDecision(key, ttl, "set by caller", now))
+        return ttl
+    decision = ttl_policy.decide(key, now, await load_season_calendar(), data)
+    logger.debug(f"TTL {key}: {decision.ttl}s ({decision.reason})")
+    return decision.ttl
+
+async def decide_negative_ttl(key: str) -> int:
+    """TTL of the negative entry stored when key has no data upstream."""
+    decision = ttl_policy.decide_negative(key, datetime.now(timezone.utc), await load_season_calendar())
+    logger.debug(f"Negative TTL {key}: {decision.ttl}s ({decision.reason})")
+    return decision.ttl
+
+async def _fetch_and_store(key: str, fetch_function, ttl: TTL, stale_ttl: int,
+                           future: Optional[asyncio.Future] = None):
+    """Run fetch_function() as the single in-flight fetch for key and cache its result.
+
+    ttl may be a callable computing the TTL from the fetched data, or None
+    to let the TTL policy decide. A None result is cached as a negative
+    entry, with the policy's negative TTL.
+    """
+    if future is None:
+        future = custom_cache.begin_fetch(key)
+    try:
+        with phase("fetch"):
+            data = await fetch_function()
+        if data is not None:
+            # Valeur telle que stockée (variantes compressées) : la réponse au miss en profite aussi
+            data = await custom_cache.prepare(data)
+            ttl = await decide_ttl(key, data, ttl)
+            with phase("cache"):
+                await custom_cache.set(key, data, ttl, stale_ttl)
+        else:
+            ttl = await decide_negative_ttl(key)
+            with phase("cache"):
+                await custom_cache.set(key, NEGATIVE, ttl)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Marks the exception as retrieved when nobody else was waiting
+        future.exception()
+        raise
+    else:
+        future.set_result(data)
+    finally:
+        custom_cache.end_fetch(key)
+    return data
+
+async def _refresh_in_background(key: str, fetch_function, ttl: TTL, stale_ttl: int, future: asyncio.Future):
+    try:
+        await _fetch_and_store(key, fetch_function, ttl, stale_ttl, future)
+    except Exception as e:
+        logger.warning(f"Background refresh failed for {key}: {e}")
+
+def _schedule_refresh(key: str, fetch_function, ttl: TTL, stale_ttl: int):
+    """Start one background refresh for a stale key unless a fetch is already running."""
+    if custom_cache.get_inflight(key) is not None:
+        return
+    custom_cache.record_refresh()
+    # Registered right away so concurrent stale readers don't start their own refresh
+    future = custom_cache.begin_fetch(key)
+    task = asyncio.create_task(_refresh_in_background(key, fetch_function, ttl, stale_ttl, future))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+async def get_cached_data(key: str, fetch_function, ttl: TTL = None, stale_ttl: int = 0):
+    """Récupère les données depuis le cache custom, sinon via fetch_function(), puis met en cache.
+
+    Les requêtes concurrentes qui ratent le cache sur la même clé attendent
+    le même fetch en cours (single-flight) : un seul appel Ergast par clé.
+
+    Avec stale_ttl > 0 (stale-while-revalidate), une entrée expirée depuis
+    moins de stale_ttl secondes est renvoyée immédiatement et un seul
+    rafraîchissement est lancé en arrière-plan.
+    """
     # Try custom cache
-    cached = await custom_cache.get(key)
+    prefix = key_prefix(key)
+    with phase("cache"):
+        cached, is_stale = await custom_cache.lookup(key, allow_stale=stale_ttl > 0)
+    if cached is NEGATIVE:
+        # Pas de données en amont, déjà constaté : None (404) sans refaire l'appel
+        custom_cache.record_negative_hit()
+        CACHE_LOOKUPS.inc(prefix, "negative")
+        return None
     if cached is not None:
+        CACHE_LOOKUPS.inc(prefix, "stale" if is_stale else "hit")
+        if is_stale:
+            _schedule_refresh(key, fetch_function, ttl, stale_ttl)
         return cached
+    CACHE_LOOKUPS.inc(prefix, "miss")
 
-    # Fetch fresh data
-    data = await fetch_function()
-    
-    # Store in cache
-    if data is not None:
-        await custom_cache.set(key, data, ttl)
+    # Another request is already fetching this key: share its result (or error)
+    inflight = custom_cache.get_inflight(key)
+    if inflight is not None:
+        custom_cache.record_coalesced()
+        CACHE_COALESCED.inc(prefix)
+        try:
+            with phase("coalesced"):
+                return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            # Annulé nous-mêmes : on propage. Leader annulé (client parti, arrêt du
+            # warmer) : ce n'est pas notre échec, on relance la lecture et un nouveau leader est élu
+            if not inflight.cancelled() or asyncio.current_task().cancelling():
+                raise
+            logger.debug(f"Fetch leader for {key} was cancelled, retrying")
+            return await get_cached_data(key, fetch_function, ttl, stale_ttl)
 
-    return data
+    return await _fetch_and_store(key, fetch_function, ttl, stale_ttl)
+
+async def get_cached_payload(key: str, fetch_function, ttl: TTL = None, stale_ttl: int = 0) -> Optional[EncodedPayload]:
+    """Comme get_cached_data, mais met en cache le JSON déjà encodé (+ ETag).
+
+    Un hit renvoie directement les octets de la réponse : pas de ré-encodage.
+    fetch_function peut renvoyer un EncodedPayload déjà construit (avec ses headers).
+    """
+    return await get_cached_data(key, _encoded(fetch_function), ttl, stale_ttl)
+
+def _encoded(fetch_function):
+    async def fetch_encoded():
+        data = await fetch_function()
+        if data is None or isinstance(data, EncodedPayload):
+            return data
+        return encode_payload(data)
+    return fetch_encoded
+
+async def fetch_driver_career(client: httpx.AsyncClient, driver_id: str, with_poles: bool = True) -> dict:
+    """Career totals of a driver from Ergast.
+
+    Totals are kept in a checkpoint (`driver:{id}:career`) together with the
+    last race they cover: a refresh only downloads the races since then.
+    Poles only need the total of the pole positions listing. With with_poles
+    (the /drivers/stats row), points, DNFs and average finish are added too,
+    same fields as the results store path.
+    """
+    async def results():
+        key = f"driver:{driver_id}:career"
+        checkpoint = await custom_cache.peek(key)
+        aggregate = CareerAggregate.from_dict(checkpoint) if checkpoint else CareerAggregate()
+        covered = aggregate.races
+        aggregate = await update_career(client, f"{ERGAST_BASE_URL}/drivers/{driver_id}/results.json", aggregate)
+        logger.debug(f"Career {driver_id}: {aggregate.races - covered:+d} races since checkpoint")
+        await custom_cache.set(key, aggregate.to_dict(), ttl=CAREER_CHECKPOINT_TTL)
+        return aggregate
+
+    if not with_poles:
+        return (await results()).totals()
+    aggregate, poles = await asyncio.gather(
+        results(),
+        fetch_total(client, f"{ERGAST_BASE_URL}/drivers/{driver_id}/qualifying/1.json"),
+    )
+    return {**aggregate.totals(), "total_poles": poles, **aggregate.details()}
+
+# ── Results store ─────────────────────────────────────────────────────────────
+# Une fois l'historique ingéré, les stats de carrière et les résultats de course
+# sont lus en SQL local au lieu d'interroger Ergast.
+results_ingester: Optional[ResultsIngester] = None
+
+def open_results_store() -> ResultsIngester:
+    global results_ingester
+    if results_ingester is None:
+        results_ingester = ResultsIngester(
+            ResultsStore(RESULTS_DB_PATH),
+            get_http_client,
+            ERGAST_BASE_URL,
+            first_season=RESULTS_DB_FIRST_SEASON,
+            current_season=lambda: datetime.now(timezone.utc).year,
+            refresh_interval=RESULTS_DB_REFRESH_INTERVAL,
+            season_pause=RESULTS_DB_SEASON_PAUSE,
+            max_retries=RESULTS_DB_MAX_RETRIES,
+            recheck_window=RESULTS_DB_RECHECK_WINDOW,
+        )
+    return results_ingester
+
+async def close_results_store():
+    global results_ingester
+    if results_ingester is not None:
+        await results_ingester.stop()
+        results_ingester.store.close()
+        results_ingester = None
+
+def get_results_store() -> Optional[ResultsStore]:
+    """The results store, once its backfill is complete (None otherwise)."""
+    if results_ingester is not None and results_ingester.ready:
+        return results_ingester.store
+    return None
+
+# Tables en colonnes construites depuis la base, reconstruites après chaque ingestion
+_stats_engine: Tuple[Optional[ResultsStore], int, Optional[StatsEngine]] = (None, -1, None)
+
+async def get_stats_engine(store: ResultsStore) -> StatsEngine:
+    global _stats_engine
+    if _stats_engine[0] is not store or _stats_engine[1] != store.version:
+        version = store.version
+        with phase("db"):
+            results, qualifying = await asyncio.gather(
+                asyncio.to_thread(lambda: ResultsTable.from_rows(store.result_rows())),
+                asyncio.to_thread(lambda: ResultsTable.from_rows(store.qualifying_rows())),
+            )
+        _stats_engine = (store, version, StatsEngine(results, qualifying))
+    return _stats_engine[2]
+
+# ── Mock history ──────────────────────────────────────────────────────────────
+# Historique synthétique du mode mock (MOCK_HISTORY_SEASONS > 0) : courses passées
+# et stats de saison sur plusieurs décennies, générées à la demande.
+mock_history: Optional[SyntheticHistory] = None
+_mock_history_engine: Optional[StatsEngine] = None
+
+def get_mock_history() -> Optional[SyntheticHistory]:
+    global mock_history
+    if mock_history is None and MOCK_HISTORY_SEASONS > 0:
+        mock_history = SyntheticHistory(MOCK_HISTORY_SEASONS, MOCK_HISTORY_ROUNDS, seed=MOCK_HISTORY_SEED)
+    return mock_history
+
+async def get_mock_history_engine(history: SyntheticHistory) -> StatsEngine:
+    global _mock_history_engine
+    if _mock_history_engine is None:
+        results, qualifying = await asyncio.gather(
+            asyncio.to_thread(lambda: ResultsTable.from_races(history.races())),
+            asyncio.to_thread(lambda: ResultsTable.from_races(history.races("qualifying"), "QualifyingResults")),
+        )
+        _mock_history_engine = StatsEngine(results, qualifying)
+    return _mock_history_engine
+
+# ── Upstream fetchers ─────────────────────────────────────────────────────────
+# Utilisés par les routes (au premier miss) et par le préchauffage du cache.
+
+async def fetch_current_drivers():
+    """Pilotes de la saison en cours."""
+    try:
+        mrdata = await get_mrdata(get_http_client(), f"{ERGAST_BASE_URL}/current/drivers.json")
+        return mrdata["DriverTable"]["Drivers"]
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (drivers): {e}")
+
+async def fetch_current_constructors():
+    """Écuries de la saison en cours."""
+    try:
+        mrdata = await get_mrdata(get_http_client(), f"{ERGAST_BASE_URL}/current/constructors.json")
+        return mrdata["ConstructorTable"]["Constructors"]
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (constructors): {e}")
+
+async def fetch_driver_standings():
+    """Classement pilotes de la saison en cours."""
+    try:
+        mrdata = await get_mrdata(get_http_client(), f"{ERGAST_BASE_URL}/current/driverStandings.json")
+        lists = mrdata["StandingsTable"]["StandingsLists"]
+        return lists[0]["DriverStandings"] if lists else []
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (driverStandings): {e}")
+
+async def fetch_constructor_standings():
+    """Classement constructeurs de la saison en cours."""
+    try:
+        mrdata = await get_mrdata(get_http_client(), f"{ERGAST_BASE_URL}/current/constructorStandings.json")
+        lists = mrdata["StandingsTable"]["StandingsLists"]
+        return lists[0]["ConstructorStandings"] if lists else []
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (constructorStandings): {e}")
+
+async def fetch_schedule():
+    """Calendrier de la saison en cours."""
+    try:
+        mrdata = await get_mrdata(get_http_client(), f"{ERGAST_BASE_URL}/current.json")
+        return mrdata["RaceTable"]["Races"]
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (schedule): {e}")
+
+async def fetch_last_race():
+    """Résultats de la dernière course (None si aucune)."""
+    try:
+        mrdata = await get_mrdata(get_http_client(), f"{ERGAST_BASE_URL}/current/last/results.json")
+        races = mrdata["RaceTable"]["Races"]
+        return races[0] if races else None
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (last race): {e}")
+
+async def fetch_race_result(season: str, round: str):
+    """Résultats d'une course (None si indisponibles)."""
+    store = get_results_store()
+    if store is not None and season.isdigit() and round.isdigit():
+        with phase("db"):
+            race = await asyncio.to_thread(store.race_result, int(season), int(round))
+        if race is not None:
+            return race
+    try:
+        mrdata = await get_mrdata(get_http_client(), f"{ERGAST_BASE_URL}/{season}/{round}/results.json")
+        races = mrdata["RaceTable"]["Races"]
+        if not races:
+            return None
+        return races[0]
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (race result): {e}")
+
+async def fetch_season_results(season: str):
+    """Toutes les courses d'une saison avec leurs résultats, en un listing paginé.
+
+    Remplit au passage les clés race:{season}:{round} : la page d'une manche
+    est ensuite servie depuis le cache sans nouvel appel.
+    """
+    if not season.isdigit():
+        return None
+    store = get_results_store()
+    races = None
+    if store is not None:
+        with phase("db"):
+            races = await asyncio.to_thread(store.season_results, int(season))
+    if not races:
+        try:
+            races = await fetch_races(get_http_client(), f"{ERGAST_BASE_URL}/{season}/results.json")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Erreur API F1 (season results): {e}")
+    if not races:
+        return None
+    # Regroupées par TTL : une écriture groupée (pipeline Redis) par TTL, pas un aller-retour par manche
+    by_ttl: Dict[int, Dict[str, EncodedPayload]] = {}
+    for race in races:
+        key = f"race:{race['season']}:{race['round']}"
+        payload = encode_payload(race)
+        by_ttl.setdefault(await decide_ttl(key, payload), {})[key] = payload
+    with phase("cache"):
+        for ttl, items in by_ttl.items():
+            await custom_cache.set_many(items, ttl)
+    return races
+
+def _podiums(races: list) -> list:
+    return [{**race, "Results": race.get("Results", [])[:3]} for race in races]
+
+async def fetch_season_podiums(season: str):
+    """Podium de chaque course d'une saison, tiré des résultats complets en cache."""
+    payload = await get_cached_resource(f"season:{season}:results")
+    return _podiums(payload.decode()) if payload is not None else None
+
+async def fetch_all_driver_stats():
+    """Stats de carrière de tous les pilotes actuels, récupérées en parallèle."""
+    store = get_results_store()
+    if store is not None:
+        return await _all_driver_stats_from_store(store)
+    client = get_http_client()
+    try:
+        # Get current drivers list
+        mrdata = await get_mrdata(client, f"{ERGAST_BASE_URL}/current/drivers.json")
+        drivers = mrdata["DriverTable"]["Drivers"]
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (all driver stats): {e}")
+
+    # Un pilote lent ou en erreur n'empêche pas les autres de répondre
+    semaphore = asyncio.Semaphore(DRIVER_STATS_CONCURRENCY)
+    durations = []
+
+    async def driver_stats(driver):
+        driver_id = driver["driverId"]
+        name = f"{driver.get('givenName', '')} {driver.get('familyName', '')}".strip()
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                career = await asyncio.wait_for(fetch_driver_career(client, driver_id), DRIVER_STATS_TIMEOUT)
+            finally:
+                durations.append(time.perf_counter() - started)
+        return {"driver_id": driver_id, "name": name, **career}
+
+    started = time.perf_counter()
+    with phase("fanout"):
+        results = await asyncio.gather(*(driver_stats(d) for d in drivers), return_exceptions=True)
+    # Somme des durées par pilote : ce qu'aurait coûté la boucle séquentielle.
+    # Mesures de cette requête seulement (Server-Timing, métriques), pas stockées avec le corps
+    record_phase("fanout-serial", sum(durations))
+    FANOUT_DURATION.observe(time.perf_counter() - started, "wall")
+    FANOUT_DURATION.observe(sum(durations), "serial")
+
+    all_stats, failed = [], []
+    for driver, result in zip(drivers, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Driver stats failed for {driver['driverId']}: {result!r}")
+            failed.append(driver["driverId"])
+        else:
+            all_stats.append(result)
+    if drivers and not all_stats:
+        raise HTTPException(status_code=502, detail="Erreur API F1 (all driver stats): aucun pilote disponible")
+
+    headers = {}
+    if failed:
+        FANOUT_FAILED.inc(amount=len(failed))
+        # Gardé avec le corps : décide du TTL court d'un résultat partiel
+        headers["X-Fanout-Failed"] = ",".join(failed)
+    return encode_payload(all_stats, headers)
+
+async def _all_driver_stats_from_store(store: ResultsStore) -> EncodedPayload:
+    drivers = (await get_cached_resource("drivers:current")).decode()
+    engine = await get_stats_engine(store)
+    # Tous les pilotes en une passe vectorisée
+    with phase("stats"):
+        careers = engine.career_stats(d["driverId"] for d in drivers)
+    all_stats = []
+    for d in drivers:
+        career = careers[d["driverId"]]
+        all_stats.append({
+            "driver_id": d["driverId"],
+            "name": f"{d.get('givenName', '')} {d.get('familyName', '')}".strip(),
+            "total_wins": career["wins"],
+            "total_podiums": career["podiums"],
+            "total_races": career["races"],
+            "total_poles": career["poles"],
+            "total_points": career["points"],
+            "total_dnfs": career["dnfs"],
+            "avg_finish": career["avg_finish"],
+        })
+    return encode_payload(all_stats, {"X-Stats-Source": "results-db"})
+
+def _season_stats_rows(stats: Dict[str, dict]) -> list:
+    rows = [{"driver_id": driver_id, **row} for driver_id, row in stats.items()]
+    rows.sort(key=lambda row: (-row["points"], -row["wins"], row["driver_id"]))
+    return rows
+
+async def fetch_season_driver_stats(season: str):
+    """Totaux d'une saison par pilote (victoires, podiums, points, abandons, moyenne)."""
+    if not season.isdigit():
+        return None
+    store = get_results_store()
+    if store is not None:
+        engine = await get_stats_engine(store)
+        return _season_stats_rows(engine.season_stats(int(season)))
+    # Sans base locale : listings de la saison lus page par page
+    client = get_http_client()
+    try:
+        races, qualifying = [], []
+        async for page in iter_pages(client, f"{ERGAST_BASE_URL}/{season}/results.json"):
+            races.extend(page)
+        async for page in iter_pages(client, f"{ERGAST_BASE_URL}/{season}/qualifying.json"):
+            qualifying.extend(page)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (season stats): {e}")
+    if not races:
+        return None
+    engine = StatsEngine(ResultsTable.from_races(races), ResultsTable.from_races(qualifying, "QualifyingResults"))
+    return _season_stats_rows(engine.season_stats(int(season)))
+
+async def fetch_driver_stats(driver_id: str):
+    """Stats de carrière d'un pilote."""
+    store = get_results_store()
+    if store is not None:
+        with phase("db"):
+            career = await asyncio.to_thread(store.driver_career, driver_id)
+        career.pop("total_poles")
+        return {"driver_id": driver_id, **career}
+    try:
+        career = await fetch_driver_career(get_http_client(), driver_id, with_poles=False)
+        return {"driver_id": driver_id, **career}
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Erreur API F1 (driver stats): {e}")
+
+def _all_driver_stats_ttl(payload: EncodedPayload) -> Optional[int]:
+    # Réponse partielle : on réessaie bientôt au lieu d'attendre la prochaine course
+    return PARTIAL_RESULT_TTL if dict(payload.headers).get("X-Fanout-Failed") else None
+
+# ── Cached resources ──────────────────────────────────────────────────────────
+# Clé de cache -> (fetcher, ttl, stale_ttl) : une seule définition partagée par
+# les routes et le préchauffage du cache. ttl=None : TTL de la politique (calendrier).
+CACHE_RESOURCES: Dict[str, Tuple[Callable, TTL, int]] = {
+    "drivers:current": (fetch_current_drivers, None, 0),
+    "constructors:current": (fetch_current_constructors, None, 0),
+    "standings:drivers": (fetch_driver_standings, None, 0),
+    "standings:constructors": (fetch_constructor_standings, None, 0),
+    "schedule:current": (fetch_schedule, None, 86400),
+    "race:last": (fetch_last_race, None, 0),
+    "drivers:all:stats": (fetch_all_driver_stats, _all_driver_stats_ttl, 86400),
+}
+_DRIVER_STATS_KEY = re.compile(r"driver:([^:]+):stats")
+_RACE_KEY = re.compile(r"race:([^:]+):([^:]+)")
+_SEASON_STATS_KEY = re.compile(r"stats:([^:]+):drivers")
+_SEASON_RESULTS_KEY = re.compile(r"season:([^:]+):(results|podiums)")
+
+def resolve_resource(key: str) -> Tuple[Callable, TTL, int]:
+    """(fetcher, ttl, stale_ttl) of a cache key, including parametrized keys."""
+    if key in CACHE_RESOURCES:
+        return CACHE_RESOURCES[key]
+    match = _DRIVER_STATS_KEY.fullmatch(key)
+    if match:
+        return (lambda: fetch_driver_stats(match.group(1))), None, 86400
+    match = _RACE_KEY.fullmatch(key)
+    if match:
+        return (lambda: fetch_race_result(match.group(1), match.group(2))), None, 0
+    match = _SEASON_STATS_KEY.fullmatch(key)
+    if match:
+        return (lambda: fetch_season_driver_stats(match.group(1))), None, 0
+    match = _SEASON_RESULTS_KEY.fullmatch(key)
+    if match:
+        fetcher = fetch_season_results if match.group(2) == "results" else fetch_season_podiums
+        return (lambda: fetcher(match.group(1))), None, 0
+    raise KeyError(key)
+
+async def get_cached_resource(key: str) -> Optional[EncodedPayload]:
+    """Payload of a cache key, fetched on a miss."""
+    fetch_function, ttl, stale_ttl = resolve_resource(key)
+    return await get_cached_payload(key, fetch_function, ttl, stale_ttl)
+
+async def refresh_resource(key: str) -> bool:
+    """Fetch key now and replace its cached payload, unless a fetch is already running."""
+    if custom_cache.get_inflight(key) is not None:
+        return False
+    fetch_function, ttl, stale_ttl = resolve_resource(key)
+    await _fetch_and_store(key, _encoded(fetch_function), ttl, stale_ttl)
+    return True
+
+# ── Cache warmer ──────────────────────────────────────────────────────────────
+# Clés gardées au chaud : (clé, dépend des courses, suivie pendant le week-end).
+# drivers:current donne la liste des pilotes dont on préchauffe driver:{id}:stats.
+# Les stats pilotes (un appel Ergast par pilote) ne tournent pas en boucle le
+# week-end : seulement à la publication des résultats, puis selon leur TTL.
+WARM_KEYS = [
+    ("schedule:current", False, True),
+    ("drivers:current", False, True),
+    ("standings:drivers", True, True),
+    ("standings:constructors", True, True),
+    ("race:last", True, True),
+    ("drivers:all:stats", True, False),
+]
+
+def _warm_ttl(key: str) -> int:
+    """TTL given to the key at its last refresh (policy default before the first one)."""
+    decision = ttl_policy.last_decision(key)
+    return decision.ttl if decision else DEFAULT_TTLS.get(key_kind(key), 3600)
+
+async def _peek_decoded(key: str) -> Optional[Any]:
+    value = await custom_cache.peek(key)
+    return value.decode() if isinstance(value, EncodedPayload) else value
+
+async def discover_warm_jobs() -> list:
+    jobs = [WarmJob(key, _warm_ttl(key), race_sensitive, weekend_poll) for key, race_sensitive, weekend_poll in WARM_KEYS]
+    for driver in await _peek_decoded("drivers:current") or []:
+        key = f"driver:{driver['driverId']}:stats"
+        jobs.append(WarmJob(key, _warm_ttl(key), race_sensitive=True, weekend_poll=False))
+    return jobs
+
+cache_warmer = CacheWarmer(
+    refresh_resource,
+    discover_warm_jobs,
+    load_season_calendar,
+    lead=CACHE_WARMER_LEAD,
+    race_interval=CACHE_WARMER_RACE_INTERVAL,
+    concurrency=CACHE_WARMER_CONCURRENCY,
+)
 
 # ── Routes ────────────────────────────────────────────────────────────────────
 
@@ -194,14 +1202,21 @@ async def root():
             "/schedule/current",
             "/race/last",
             "/race/{season}/{round}",
+            "/race/{season}/results",
             "/drivers/stats",
             "/driver/{driver_id}/stats",
+            "/drivers/stats/{season}",
             "/cache/stats",
+            "/cache/warmer",
+            "/cache/ttl",
+            "/metrics",
+            "POST /batch",
         ],
     }
 
 @app.get("/health")
 async def health_check():
+    await custom_cache.refresh_stats()
     cache_stats = custom_cache.get_stats()
     
     return {
@@ -218,132 +1233,134 @@ async def health_check():
 @app.get("/cache/stats")
 async def cache_stats():
     """Get cache statistics for monitoring."""
+    await custom_cache.refresh_stats()
+    ingester = results_ingester
     return {
         "cache": custom_cache.get_stats(),
+        "http": get_http_stats(),
+        "results_store": await asyncio.to_thread(ingester.get_stats) if ingester is not None else None,
+        "stats_engine": ENGINE,
         "status": "active"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: routes, Ergast calls, cache lookups per key prefix."""
+    await custom_cache.refresh_stats()
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/cache/warmer")
+async def cache_warmer_plan():
+    """Next planned refresh of every warmed cache key."""
+    return {"enabled": CACHE_WARMER_ENABLED and not USE_MOCK_DATA, **cache_warmer.get_stats()}
+
+@app.get("/cache/ttl")
+async def cache_ttl_decisions(key: Optional[str] = None):
+    """TTL decisions of the policy: the last one per key, or a preview for ?key=."""
+    calendar = await load_season_calendar()
+    result = {"calendar": calendar is not None and bool(calendar.races), "policy": ttl_policy.get_stats()}
+    if key is not None:
+        data = await custom_cache.peek(key)
+        if data is NEGATIVE:
+            preview = ttl_policy.decide_negative(key, datetime.now(timezone.utc), calendar, record=False)
+        else:
+            preview = ttl_policy.decide(key, datetime.now(timezone.utc), calendar, data, record=False)
+        result["preview"] = preview.to_dict()
+        last = ttl_policy.last_decision(key)
+        result["last"] = last.to_dict() if last else None
+        return result
+    result["decisions"] = ttl_policy.decisions()
+    return result
+
 @app.get("/drivers/current")
-async def api_get_current_drivers():
+async def api_get_current_drivers(request: Request):
     if USE_MOCK_DATA:
-        return mock_get_drivers_current()
+        return payload_response(request, encode_payload(mock_get_drivers_current()))
 
-    async def fetch():
-        try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                r = await client.get(f"{ERGAST_BASE_URL}/current/drivers.json")
-                r.raise_for_status()
-                return r.json()["MRData"]["DriverTable"]["Drivers"]
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (drivers): {e}")
-    return await get_cached_data("drivers:current", fetch, ttl=86400)
+    return payload_response(request, await get_cached_resource("drivers:current"))
 
 @app.get("/constructors/current")
-async def api_get_current_constructors():
+async def api_get_current_constructors(request: Request):
     if USE_MOCK_DATA:
-        return mock_get_constructors_current()
+        return payload_response(request, encode_payload(mock_get_constructors_current()))
 
-    async def fetch():
+    return payload_response(request, await get_cached_resource("constructors:current"))
+
+def fields_response(request: Request, payload: EncodedPayload, fields: Optional[str]) -> Response:
+    """payload_response, restricted to ?fields= when given (400 if malformed)."""
+    if fields is not None:
         try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                r = await client.get(f"{ERGAST_BASE_URL}/current/constructors.json")
-                r.raise_for_status()
-                return r.json()["MRData"]["ConstructorTable"]["Constructors"]
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (constructors): {e}")
-    return await get_cached_data("constructors:current", fetch, ttl=86400)
+            payload = project_payload(payload, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return payload_response(request, payload)
 
 @app.get("/standings/drivers")
-async def api_get_driver_standings():
+async def api_get_driver_standings(request: Request, fields: Optional[str] = None):
     if USE_MOCK_DATA:
-        return mock_get_driver_standings()
+        return fields_response(request, encode_payload(mock_get_driver_standings()), fields)
 
-    async def fetch():
-        try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                r = await client.get(f"{ERGAST_BASE_URL}/current/driverStandings.json")
-                r.raise_for_status()
-                lists = r.json()["MRData"]["StandingsTable"]["StandingsLists"]
-                return lists[0]["DriverStandings"] if lists else []
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (driverStandings): {e}")
-    return await get_cached_data("standings:drivers", fetch, ttl=3600)
+    return fields_response(request, await get_cached_resource("standings:drivers"), fields)
 
 @app.get("/standings/constructors")
-async def api_get_constructor_standings():
+async def api_get_constructor_standings(request: Request, fields: Optional[str] = None):
     if USE_MOCK_DATA:
-        return mock_get_constructor_standings()
+        return fields_response(request, encode_payload(mock_get_constructor_standings()), fields)
 
-    async def fetch():
-        try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                r = await client.get(f"{ERGAST_BASE_URL}/current/constructorStandings.json")
-                r.raise_for_status()
-                lists = r.json()["MRData"]["StandingsTable"]["StandingsLists"]
-                return lists[0]["ConstructorStandings"] if lists else []
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (constructorStandings): {e}")
-    return await get_cached_data("standings:constructors", fetch, ttl=3600)
+    return fields_response(request, await get_cached_resource("standings:constructors"), fields)
 
 @app.get("/schedule/current")
-async def api_get_current_schedule():
+async def api_get_current_schedule(request: Request):
     if USE_MOCK_DATA:
-        return mock_get_schedule_current()
+        return payload_response(request, encode_payload(mock_get_schedule_current()))
 
-    async def fetch():
-        try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                r = await client.get(f"{ERGAST_BASE_URL}/current.json")
-                r.raise_for_status()
-                return r.json()["MRData"]["RaceTable"]["Races"]
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (schedule): {e}")
-    return await get_cached_data("schedule:current", fetch, ttl=86400)
+    return payload_response(request, await get_cached_resource("schedule:current"))
 
 @app.get("/race/last")
-async def api_get_last_race_results():
+async def api_get_last_race_results(request: Request, fields: Optional[str] = None):
     if USE_MOCK_DATA:
-        return mock_get_last_race()
+        return fields_response(request, encode_payload(mock_get_last_race()), fields)
 
-    async def fetch():
-        try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                r = await client.get(f"{ERGAST_BASE_URL}/current/last/results.json")
-                r.raise_for_status()
-                races = r.json()["MRData"]["RaceTable"]["Races"]
-                return races[0] if races else None
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (last race): {e}")
-    return await get_cached_data("race:last", fetch, ttl=1800)
+    payload = await get_cached_resource("race:last")
+    return fields_response(request, payload or encode_payload(None), fields)
+
+# Déclarée avant /race/{season}/{round}, qui prendrait "results" pour une manche
+@app.get("/race/{season}/results")
+async def api_get_season_results(request: Request, season: str, podium: bool = False, fields: Optional[str] = None):
+    """Every race of a season with its results (top 3 only with ?podium=true), in one request."""
+    if USE_MOCK_DATA:
+        races = [race for race in mock_get_race_results() if race["season"] == season]
+        history = get_mock_history()
+        if not races and history is not None and season.isdigit() and int(season) in history.seasons:
+            races = list(history.races(seasons=[int(season)]))
+        if not races:
+            raise HTTPException(status_code=404, detail=f"Pas de résultats pour la saison {season}")
+        return fields_response(request, encode_payload(_podiums(races) if podium else races), fields)
+
+    payload = await get_cached_resource(f"season:{season}:{'podiums' if podium else 'results'}")
+    if payload is None:
+        raise HTTPException(status_code=404, detail=f"Pas de résultats pour la saison {season}")
+    return fields_response(request, payload, fields)
 
 @app.get("/race/{season}/{round}")
-async def api_get_race_result(season: str, round: str):
+async def api_get_race_result(request: Request, season: str, round: str, fields: Optional[str] = None):
     """Get race results for a specific season and round."""
     if USE_MOCK_DATA:
         result = mock_get_race_result(season, round)
+        history = get_mock_history()
+        if result is None and history is not None and season.isdigit() and round.isdigit():
+            result = history.race_result(season, round)
         if result is None:
             raise HTTPException(status_code=404, detail=f"Résultats non disponibles pour la course {season}/{round}")
-        return result
+        return fields_response(request, encode_payload(result), fields)
 
-    async def fetch():
-        try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                r = await client.get(f"{ERGAST_BASE_URL}/{season}/{round}/results.json")
-                r.raise_for_status()
-                races = r.json()["MRData"]["RaceTable"]["Races"]
-                if not races:
-                    return None
-                return races[0]
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (race result): {e}")
-    
-    result = await get_cached_data(f"race:{season}:{round}", fetch, ttl=86400)
-    if result is None:
+    payload = await get_cached_resource(f"race:{season}:{round}")
+    if payload is None:
         raise HTTPException(status_code=404, detail=f"Résultats non disponibles pour la course {season}/{round}")
-    return result
+    return fields_response(request, payload, fields)
 
 @app.get("/drivers/stats")
-async def api_get_all_driver_stats():
+async def api_get_all_driver_stats(request: Request):
     """Get statistics for all current drivers"""
     if USE_MOCK_DATA:
         # Career statistics from statsf1.com (accurate as of end 2024 season)
@@ -369,55 +1386,31 @@ async def api_get_all_driver_stats():
             {"driver_id": "hadjar",     "name": "Isack Hadjar",     "total_wins": 0, "total_podiums": 1, "total_races": 18, "total_poles": 0},
             {"driver_id": "bortoleto",  "name": "Gabriel Bortoleto",  "total_wins": 0, "total_podiums": 0, "total_races": 18, "total_poles": 0},
         ]
-        return all_stats
+        return payload_response(request, encode_payload(all_stats))
 
-    async def fetch():
-        try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                # Get current drivers list
-                drivers_r = await client.get(f"{ERGAST_BASE_URL}/current/drivers.json")
-                drivers_r.raise_for_status()
-                drivers = drivers_r.json()["MRData"]["DriverTable"]["Drivers"]
-                
-                all_stats = []
-                for driver in drivers:
-                    driver_id = driver["driverId"]
-                    given_name = driver.get("givenName", "")
-                    family_name = driver.get("familyName", "")
-                    name = f"{given_name} {family_name}".strip()
-                    
-                    # Fetch stats for each driver
-                    wins_r = await client.get(f"{ERGAST_BASE_URL}/drivers/{driver_id}/results/1.json?limit=1000")
-                    all_r =  await client.get(f"{ERGAST_BASE_URL}/drivers/{driver_id}/results.json?limit=1000")
-                    poles_r = await client.get(f"{ERGAST_BASE_URL}/drivers/{driver_id}/qualifying/1.json?limit=1000")
-                    
-                    wins_r.raise_for_status()
-                    all_r.raise_for_status()
-                    poles_r.raise_for_status()
-                    
-                    wins_data = wins_r.json()["MRData"]["RaceTable"]
-                    all_races = all_r.json()["MRData"]["RaceTable"]["Races"]
-                    poles_data = poles_r.json()["MRData"]["RaceTable"]
-                    
-                    podiums = sum(1 for race in all_races for res in race["Results"] if int(res["position"]) <= 3)
-                    
-                    all_stats.append({
-                        "driver_id": driver_id,
-                        "name": name,
-                        "total_wins": int(wins_data["total"]),
-                        "total_podiums": podiums,
-                        "total_races": len(all_races),
-                        "total_poles": int(poles_data["total"])
-                    })
-                
-                return all_stats
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (all driver stats): {e}")
-    
-    return await get_cached_data("drivers:all:stats", fetch, ttl=86400)
+    return payload_response(request, await get_cached_resource("drivers:all:stats"))
+
+@app.get("/drivers/stats/{season}")
+async def api_get_season_driver_stats(request: Request, season: str):
+    """Per-driver totals of a season: wins, podiums, points, DNFs, average finish, poles."""
+    if USE_MOCK_DATA:
+        table = ResultsTable.from_races(mock_get_race_results())
+        history = get_mock_history()
+        if season.isdigit() and int(season) in table.seasons():
+            stats = StatsEngine(table).season_stats(int(season))
+        elif history is not None and season.isdigit() and int(season) in history.seasons:
+            stats = (await get_mock_history_engine(history)).season_stats(int(season))
+        else:
+            raise HTTPException(status_code=404, detail=f"Pas de résultats pour la saison {season}")
+        return payload_response(request, encode_payload(_season_stats_rows(stats)))
+
+    payload = await get_cached_resource(f"stats:{season}:drivers")
+    if payload is None:
+        raise HTTPException(status_code=404, detail=f"Pas de résultats pour la saison {season}")
+    return payload_response(request, payload)
 
 @app.get("/driver/{driver_id}/stats")
-async def api_get_driver_stats(driver_id: str):
+async def api_get_driver_stats(request: Request, driver_id: str):
     if USE_MOCK_DATA:
         # Career statistics from statsf1.com (accurate as of end 2024 season)
         mock_stats = {
@@ -442,21 +1435,20 @@ async def api_get_driver_stats(driver_id: str):
             "hadjar":     {"driver_id": "hadjar",     "total_wins": 0, "total_podiums": 1, "total_races": 18},
             "bortoleto":  {"driver_id": "bortoleto",  "total_wins": 0, "total_podiums": 0, "total_races": 18},
         }
-        return mock_stats.get(driver_id, {"driver_id": driver_id, "total_wins": 0, "total_podiums": 0, "total_races": 0})
+        stats = mock_stats.get(driver_id, {"driver_id": driver_id, "total_wins": 0, "total_podiums": 0, "total_races": 0})
+        return payload_response(request, encode_payload(stats))
 
-    async def fetch():
-        try:
-            async with httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers={"User-Agent": "f1-dashboard/1.0"}) as client:
-                wins_r = await client.get(f"{ERGAST_BASE_URL}/drivers/{driver_id}/results/1.json?limit=1000")
-                all_r =  await client.get(f"{ERGAST_BASE_URL}/drivers/{driver_id}/results.json?limit=1000")
-                wins_r.raise_for_status(); all_r.raise_for_status()
-                wins_data = wins_r.json()["MRData"]["RaceTable"]
-                all_races = all_r.json()["MRData"]["RaceTable"]["Races"]
-                podiums = sum(1 for race in all_races for res in race["Results"] if int(res["position"]) <= 3)
-                return {"driver_id": driver_id, "total_wins": int(wins_data["total"]), "total_podiums": podiums, "total_races": len(all_races)}
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=502, detail=f"Erreur API F1 (driver stats): {e}")
-    return await get_cached_data(f"driver:{driver_id}:stats", fetch, ttl=86400)
+    return payload_response(request, await get_cached_resource(f"driver:{driver_id}:stats"))
+
+@app.post("/batch")
+async def api_batch(paths: List[str] = Body(..., embed=True)):
+    """Several GET resources in one round-trip, resolved concurrently through the cache.
+
+    Body: {"paths": ["/standings/drivers", "/health"]}; each result has its own status.
+    """
+    if len(paths) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Trop de ressources ({len(paths)} > {BATCH_MAX_ITEMS})")
+    return Response(content=await run_batch(app, app.router, paths), media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,279 @@
+"""In-process metrics, exposed in the Prometheus text format on /metrics.
+
+prometheus_client is not a dependency: counters, gauges and histograms are
+plain dicts keyed by label values. The app runs on a single event loop, so
+recording needs no lock: a histogram observation is one bisect and two
+additions.
+
+- `MetricsMiddleware`: latency, count and in-flight requests per route
+- `InstrumentedTransport`: latency, status and errors of upstream calls
+  per URL template
+- cache lookups and evictions per key prefix are recorded by main.py
+"""
+
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+# Bornes par défaut de prometheus_client (secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """A named metric with label names; values are keyed by label value tuples."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(name suffix, formatted labels, value) of every series."""
+        return [("", _format_labels(self.labels, key), value) for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    """A gauge set by the app, or read from collect() at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 collect: Optional[Callable[[], float]] = None, registry: Optional["Registry"] = None):
+        super().__init__(name, help, labels, registry)
+        self._collect = collect
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        if self._collect is not None:
+            try:
+                self._values[()] = float(self._collect())
+            except Exception:
+                pass
+        return super().samples()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional["Registry"] = None):
+        super().__init__(name, help, labels, registry)
+        self.buckets = tuple(buckets)
+        # label values -> [compteurs par bucket (non cumulés, +Inf en dernier), somme, nombre]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        rows = []
+        for key, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                rows.append(("_bucket", _format_labels(self.labels, key, f'le="{le}"'), cumulative))
+            rows.append(("_sum", _format_labels(self.labels, key), total))
+            rows.append(("_count", _format_labels(self.labels, key), count))
+        return rows
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ── App metrics ───────────────────────────────────────────────────────────────
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route, method and status.",
+                        ("route", "method", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("route", "method"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served.")
+RESPONSE_BYTES = Counter("http_response_bytes_total", "JSON response bytes sent, by content-coding.", ("encoding",))
+RESPONSE_UNCOMPRESSED_BYTES = Counter("http_response_uncompressed_bytes_total",
+                                      "Size before compression of the JSON responses sent, by content-coding.",
+                                      ("encoding",))
+FANOUT_DURATION = Histogram("drivers_stats_fanout_seconds",
+                            "/drivers/stats fan-out: wall-clock time and sum of per-driver times.", ("measure",))
+FANOUT_FAILED = Counter("drivers_stats_fanout_failed_total", "Drivers left out of a /drivers/stats fan-out.")
+
+UPSTREAM_REQUESTS = Counter("ergast_requests_total", "Ergast requests by URL template and status.",
+                            ("endpoint", "status"))
+UPSTREAM_LATENCY = Histogram("ergast_request_duration_seconds", "Ergast request latency by URL template.",
+                             ("endpoint",))
+UPSTREAM_ERRORS = Counter("ergast_errors_total", "Ergast errors by URL template (HTTP status or exception).",
+                          ("endpoint", "error"))
+UPSTREAM_IN_FLIGHT = Gauge("ergast_requests_in_flight", "Ergast requests awaiting a response.")
+UPSTREAM_CONNECTIONS = Counter("ergast_connections_total",
+                               "Ergast responses by connection: a newly opened one or a reused keep-alive one.",
+                               ("connection",))
+
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by key prefix and result (hit, stale, negative, miss).",
+                        ("prefix", "result"))
+CACHE_COALESCED = Counter("cache_coalesced_total", "Cache misses that awaited another request's fetch.",
+                          ("prefix",))
+CACHE_EVICTIONS = Counter("cache_evictions_total", "Entries evicted to fit the cache budgets, by key prefix.",
+                          ("prefix",))
+
+
+def key_prefix(key: str) -> str:
+    """"standings:drivers" -> "standings:", "driver:verstappen:stats" -> "driver:"."""
+    head, sep, _ = key.partition(":")
+    return head + sep
+
+
+# ── HTTP server ───────────────────────────────────────────────────────────────
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # Le routeur a ajouté la route au scope : on agrège par gabarit, pas par URL
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.observe(time.perf_counter() - start, template, scope["method"])
+            HTTP_REQUESTS.inc(template, scope["method"], str(status))
+
+
+# ── Upstream ──────────────────────────────────────────────────────────────────
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps an httpx transport to time upstream requests per URL template.
+
+    Connection reuse is read from the `network_stream` response extension
+    (one stream per connection): a stream not seen before is a new
+    connection. Streams are held weakly, so closed ones are forgotten.
+    """
+
+    def __init__(self, wrapped: httpx.AsyncBaseTransport, template: Callable[[str], str]):
+        self.wrapped = wrapped
+        self._template = template
+        self._streams: "weakref.WeakSet" = weakref.WeakSet()
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    def _track_connection(self, response: httpx.Response):
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            return
+        try:
+            reused = stream in self._streams
+            self._streams.add(stream)
+        except TypeError:  # flux sans weakref : non suivi
+            return
+        if reused:
+            self.connections_reused += 1
+        else:
+            self.connections_opened += 1
+        UPSTREAM_CONNECTIONS.inc("reused" if reused else "new")
+
+    @property
+    def open_connections(self) -> int:
+        """Connections seen and not yet garbage collected (closed ones may linger briefly)."""
+        return len(self._streams)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = self._template(request.url.path)
+        UPSTREAM_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            response = await self.wrapped.handle_async_request(request)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(endpoint, type(e).__name__)
+            raise
+        finally:
+            UPSTREAM_IN_FLIGHT.dec()
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, endpoint)
+        UPSTREAM_REQUESTS.inc(endpoint, str(response.status_code))
+        self._track_connection(response)
+        if response.status_code >= 400:
+            UPSTREAM_ERRORS.inc(endpoint, str(response.status_code))
+        return response
+
+    async def aclose(self):
+        await self.wrapped.aclose()
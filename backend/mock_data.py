@@ -6,9 +6,13 @@ Données mockées riches pour le développement et les tests.
 - Classements pilotes réalistes (ordre/points issus de ta capture)
 - Classement constructeurs calculé automatiquement (cohérent)
 - Calendrier élargi + dernière course factice
+- SyntheticHistory : historique généré (N saisons × M manches) pour les tests de charge
 """
 
-from datetime import date
+import random
+from datetime import date, timedelta
+
+from race_model import CompactRace, CompactStandings, EntityPool
 
 # ────────────────────────────────────────────────────────────────────────────────
 # ÉCURIES
@@ -121,7 +125,7 @@ def _driver_entry(pos, driver_id, points, wins, podiums):
         "Constructors": [constructor],
     }
 
-MOCK_DRIVER_STANDINGS = [_driver_entry(*row) for row in _raw_driver_table]
+_driver_standing_rows = [_driver_entry(*row) for row in _raw_driver_table]
 
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -153,7 +157,9 @@ def compute_constructor_standings_from_drivers(driver_standings):
         })
     return result
 
-MOCK_CONSTRUCTOR_STANDINGS = compute_constructor_standings_from_drivers(MOCK_DRIVER_STANDINGS)
+# Stockage compact (entités partagées, colonnes typées) ; JSON reconstruit à la demande
+MOCK_DRIVER_STANDINGS = CompactStandings(_driver_standing_rows)
+MOCK_CONSTRUCTOR_STANDINGS = CompactStandings(compute_constructor_standings_from_drivers(_driver_standing_rows))
 
 
 # ────────────────────────────────────────────────────────────────────────────────
@@ -456,17 +462,17 @@ MOCK_SCHEDULE = [
 # DERNIÈRE COURSE (résultats factices, mais cohérents avec les entités)
 # ────────────────────────────────────────────────────────────────────────────────
 
+_STANDING_ENTITIES = {row["Driver"]["driverId"]: (row["Driver"], row["Constructors"][0]) for row in _driver_standing_rows}
+del _driver_standing_rows
+
 def _driver_in_standings(driver_id):
-    for row in MOCK_DRIVER_STANDINGS:
-        if row["Driver"]["driverId"] == driver_id:
-            return row["Driver"], row["Constructors"][0]
-    raise KeyError(driver_id)
+    return _STANDING_ENTITIES[driver_id]
 
 _1st_driver, _1st_ctor = _driver_in_standings("piastri")
 _2nd_driver, _2nd_ctor = _driver_in_standings("norris")
 _3rd_driver, _3rd_ctor = _driver_in_standings("verstappen")
 
-MOCK_LAST_RACE = {
+MOCK_LAST_RACE = CompactRace({
     "season": "2025",
     "round": "24",
     "raceName": "Abu Dhabi Grand Prix",
@@ -515,7 +521,7 @@ MOCK_LAST_RACE = {
             "Time": {"millis": "6292200", "time": "+3.200"},
         },
     ],
-}
+})
 
 # ────────────────────────────────────────────────────────────────────────────────
 # Helpers d’export compatibles avec tes endpoints
@@ -531,11 +537,11 @@ def get_constructors_current():
 
 def get_driver_standings():
     """Classement pilotes (mock)."""
-    return [row for row in MOCK_DRIVER_STANDINGS]
+    return MOCK_DRIVER_STANDINGS.expand()
 
 def get_constructor_standings():
     """Classement constructeurs (agrégé)."""
-    return [row for row in MOCK_CONSTRUCTOR_STANDINGS]
+    return MOCK_CONSTRUCTOR_STANDINGS.expand()
 
 def get_schedule_current():
     """Calendrier de la saison."""
@@ -543,19 +549,19 @@ def get_schedule_current():
 
 def get_last_race():
     """Dernière course (mock)."""
-    return MOCK_LAST_RACE
+    return MOCK_LAST_RACE.expand()
 
 # ────────────────────────────────────────────────────────────────────────────────
 # RÉSULTATS DE COURSES PASSÉES (pour l'affichage du podium dans le calendrier)
 # ────────────────────────────────────────────────────────────────────────────────
 
 def _create_race_result(season, round_num, race_name, circuit_info, race_date, race_time, p1_id, p2_id, p3_id):
-    """Helper pour créer un résultat de course avec un podium."""
+    """Helper pour créer un résultat de course avec un podium (stocké compact)."""
     p1_driver, p1_ctor = _driver_in_standings(p1_id)
     p2_driver, p2_ctor = _driver_in_standings(p2_id)
     p3_driver, p3_ctor = _driver_in_standings(p3_id)
     
-    return {
+    return CompactRace({
         "season": season,
         "round": round_num,
         "raceName": race_name,
@@ -600,7 +606,7 @@ def _create_race_result(season, round_num, race_name, circuit_info, race_date, r
                 "Time": {"millis": "5405000", "time": "+5.000"},
             },
         ],
-    }
+    })
 
 # Mock race results pour quelques courses passées (dates avant octobre 2025)
 MOCK_RACE_RESULTS = {
@@ -741,4 +747,213 @@ MOCK_RACE_RESULTS = {
 
 def get_race_result(season: str, round_num: str):
     """Récupère le résultat d'une course spécifique (mock)."""
-    return MOCK_RACE_RESULTS.get((season, round_num))
+    race = MOCK_RACE_RESULTS.get((season, round_num))
+    return race.expand() if race is not None else None
+
+def get_race_results():
+    """Tous les résultats de courses mockés."""
+    return [race.expand() for race in MOCK_RACE_RESULTS.values()]
+
+# ────────────────────────────────────────────────────────────────────────────────
+# GÉNÉRATEUR D'HISTORIQUE SYNTHÉTIQUE (tests de charge / d'échelle)
+# N saisons × M manches, déterministe pour une graine donnée. Chaque saison est
+# générée à la demande puis gardée au format compact.
+# ────────────────────────────────────────────────────────────────────────────────
+
+# Barème 2010+ (top 10)
+_POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+_DNF_STATUSES = ["Accident", "Collision", "Engine", "Gearbox", "Hydraulics", "Brakes", "Power Unit", "Spun off"]
+_GIVEN_NAMES = ["Alex", "Ben", "Carlos", "Dan", "Elio", "Felipe", "Guy", "Hugo", "Ivan", "Jack", "Kevin", "Luca",
+                "Marco", "Nico", "Oscar", "Pablo", "Rene", "Sam", "Theo", "Victor", "Will", "Yann", "Zak", "Jean"]
+_FAMILY_NAMES = ["Arnoux", "Brabham", "Cevert", "Depailler", "Ertl", "Fittipaldi", "Gurney", "Hill", "Ickx",
+                 "Jarier", "Keegan", "Laffite", "Mass", "Nannini", "Oliver", "Pironi", "Regazzoni", "Surtees",
+                 "Tambay", "Urquhart", "Villota", "Watson", "Yoong", "Zunino"]
+_NATIONALITIES = ["British", "French", "Italian", "German", "Brazilian", "Finnish", "Spanish", "Australian",
+                  "Dutch", "Austrian", "Japanese", "American", "Belgian", "Swiss", "Mexican", "Canadian"]
+
+
+def _lap_time(millis):
+    minutes, rest = divmod(millis, 60000)
+    return f"{minutes}:{rest // 1000:02d}.{rest % 1000:03d}"
+
+
+def _race_time(millis):
+    hours, rest = divmod(millis, 3600000)
+    return f"{hours}:{_lap_time(rest).zfill(9)}"
+
+
+class SyntheticHistory:
+    """Historique Ergast cohérent : pilotes, écuries, résultats, qualifications, classements.
+
+    - `seasons` saisons consécutives finissant à `last_season`, `rounds` manches chacune
+    - `drivers` pilotes par saison (2 par écurie) ; quelques recrues remplacent
+      des titulaires chaque hiver, les écuries gardent leurs identifiants
+    - résultats et qualifications dépendent de la voiture, du pilote et du hasard ;
+      abandons, retardataires et temps au format Ergast
+    """
+
+    def __init__(self, seasons=75, rounds=22, drivers=20, last_season=2024, seed=0):
+        self.seasons = list(range(last_season - seasons + 1, last_season + 1))
+        self.rounds = rounds
+        self.seed = seed
+        self._pool = EntityPool()
+        self._cache = {}  # season -> (races, qualifying) compacts
+        rng = random.Random(f"{seed}:roster")
+
+        teams = drivers // 2
+        self.constructors = [dict(MOCK_CONSTRUCTORS[i]) if i < len(MOCK_CONSTRUCTORS) else
+                             {"constructorId": f"team_{i + 1}", "name": f"Team {i + 1}", "nationality": "British"}
+                             for i in range(teams)]
+        self.drivers = []        # tous les pilotes de l'historique
+        self._skill = {}         # driverId -> talent
+        self._lineups = {}       # season -> [(driver, constructor)]
+        seats = []
+        for _ in range(teams * 2):
+            seats.append(self._new_driver(rng, self.seasons[0], seats))
+        for season in self.seasons:
+            # Mercato : retraite à 38 ans, 1 à 3 recrues par saison, quelques changements d'écurie
+            if season != self.seasons[0]:
+                leaving = {i for i, d in enumerate(seats) if season - int(d["dateOfBirth"][:4]) >= 38}
+                leaving.update(rng.sample(range(len(seats)), rng.randint(1, 3)))
+                for seat in sorted(leaving):
+                    seats[seat] = self._new_driver(rng, season, seats[:seat] + seats[seat + 1:])
+            if season != self.seasons[0] and rng.random() < 0.5:
+                i, j = rng.sample(range(len(seats)), 2)
+                seats[i], seats[j] = seats[j], seats[i]
+            self._lineups[season] = [(d, self.constructors[i // 2]) for i, d in enumerate(seats)]
+
+    def _new_driver(self, rng, season, teammates):
+        n = len(self.drivers) + 1
+        family = rng.choice(_FAMILY_NAMES)
+        taken = {d["permanentNumber"] for d in teammates}
+        driver = {
+            "driverId": f"{family.lower()}_{n}",
+            "permanentNumber": rng.choice([str(k) for k in range(2, 100) if str(k) not in taken]),
+            "code": f"{family[:2].upper()}{n % 10}",
+            "givenName": rng.choice(_GIVEN_NAMES),
+            "familyName": family,
+            "dateOfBirth": str(date(season - rng.randint(19, 24), rng.randint(1, 12), rng.randint(1, 28))),
+            "nationality": rng.choice(_NATIONALITIES),
+        }
+        self.drivers.append(driver)
+        self._skill[driver["driverId"]] = rng.gauss(0, 1)
+        return driver
+
+    # ── Génération d'une saison ──────────────────────────────────────────────
+    def _race_info(self, season, round_num):
+        template = MOCK_SCHEDULE[(round_num - 1) % len(MOCK_SCHEDULE)]
+        spacing = max(7, min(14, 280 // self.rounds))
+        day = date(season, 3, 1) + timedelta(days=spacing * (round_num - 1))
+        return {
+            "season": str(season), "round": str(round_num), "raceName": template["raceName"],
+            "Circuit": template["Circuit"], "date": str(day), "time": template.get("time", "13:00:00Z"),
+        }
+
+    def _generate(self, season):
+        rng = random.Random(f"{self.seed}:{season}")
+        lineup = self._lineups[season]
+        car = {c["constructorId"]: rng.gauss(0, 1.5) for c in self.constructors}
+        races, qualifying = [], []
+        for round_num in range(1, self.rounds + 1):
+            info = self._race_info(season, round_num)
+            pace = {d["driverId"]: car[c["constructorId"]] + self._skill[d["driverId"]] for d, c in lineup}
+
+            # Qualifications : Q1 pour tous, Q2 pour les 15 premiers, Q3 pour les 10 premiers
+            grid = sorted(lineup, key=lambda dc: -(pace[dc[0]["driverId"]] + rng.gauss(0, 1)))
+            pole_lap = rng.randint(75000, 95000)
+            quali_rows = []
+            lap = pole_lap
+            for pos, (driver, ctor) in enumerate(grid, 1):
+                row = {"number": driver["permanentNumber"], "position": str(pos), "Driver": driver, "Constructor": ctor}
+                for session, cutoff, margin in (("Q1", len(grid), 700), ("Q2", 15, 350), ("Q3", 10, 0)):
+                    if pos <= cutoff:
+                        row[session] = _lap_time(lap + margin)
+                quali_rows.append(row)
+                lap += rng.randint(20, 250)
+            qualifying.append(CompactRace({**info, "QualifyingResults": quali_rows}, self._pool, "QualifyingResults"))
+
+            # Course : abandons au hasard, les autres classés selon le rythme du jour
+            laps = rng.randint(50, 72)
+            starts = {dc[0]["driverId"]: pos for pos, dc in enumerate(grid, 1)}
+            retired = {d["driverId"]: rng.randint(0, laps - 1) for d, _ in lineup if rng.random() < 0.1}
+            running = sorted((dc for dc in lineup if dc[0]["driverId"] not in retired),
+                             key=lambda dc: -(pace[dc[0]["driverId"]] + rng.gauss(0, 1.2)))
+            dnfs = sorted((dc for dc in lineup if dc[0]["driverId"] in retired),
+                          key=lambda dc: -retired[dc[0]["driverId"]])
+            winner_millis = rng.randint(5200000, 6400000)
+            gap, results = 0, []
+            for pos, (driver, ctor) in enumerate(running + dnfs, 1):
+                driver_id = driver["driverId"]
+                row = {
+                    "number": driver["permanentNumber"], "position": str(pos), "positionText": str(pos),
+                    "points": str(_POINTS[pos - 1] if pos <= len(_POINTS) and driver_id not in retired else 0),
+                    "Driver": driver, "Constructor": ctor, "grid": str(starts[driver_id]),
+                }
+                if driver_id in retired:
+                    row.update(positionText="R", laps=str(retired[driver_id]), status=rng.choice(_DNF_STATUSES))
+                elif pos > 1 and gap > 80000:
+                    lapped = 1 + (gap - 80000) // 90000
+                    row.update(laps=str(laps - lapped), status=f"+{lapped} Lap" + ("s" if lapped > 1 else ""))
+                else:
+                    millis = winner_millis + gap
+                    row.update(laps=str(laps), status="Finished",
+                               Time={"millis": str(millis), "time": _race_time(millis) if pos == 1 else f"+{gap / 1000:.3f}"})
+                gap += rng.randint(500, 12000)
+                results.append(row)
+            races.append(CompactRace({**info, "Results": results}, self._pool))
+        return races, qualifying
+
+    def _season(self, season):
+        if season not in self._cache:
+            if season not in self._lineups:
+                raise KeyError(season)
+            self._cache[season] = self._generate(season)
+        return self._cache[season]
+
+    # ── Accès au format Ergast ───────────────────────────────────────────────
+    def race_result(self, season, round_num):
+        """Une course avec ses Results (None si hors de l'historique)."""
+        season, round_num = int(season), int(round_num)
+        if season not in self._lineups or not 1 <= round_num <= self.rounds:
+            return None
+        return self._season(season)[0][round_num - 1].expand()
+
+    def races(self, listing="results", seasons=None):
+        """Courses (Results ou QualifyingResults) saison par saison, comme les listings Ergast."""
+        index = 0 if listing == "results" else 1
+        for season in seasons or self.seasons:
+            for race in self._season(season)[index]:
+                yield race.expand()
+
+    def schedule(self, season):
+        return [self._race_info(season, r) for r in range(1, self.rounds + 1)]
+
+    def lineup(self, season):
+        """Pilotes d'une saison (avec constructorId, comme MOCK_DRIVERS)."""
+        return [{**driver, "constructorId": ctor["constructorId"]} for driver, ctor in self._lineups[season]]
+
+    def driver_standings(self, season, round_num=None):
+        """Classement pilotes après round_num (fin de saison par défaut)."""
+        totals = {}
+        for race in self._season(season)[0][:round_num or self.rounds]:
+            for row in race.expand()["Results"]:
+                entry = totals.setdefault(row["Driver"]["driverId"], {"points": 0, "wins": 0})
+                entry["points"] += int(row["points"])
+                entry["wins"] += row["position"] == "1"
+                entry["Driver"], entry["Constructor"] = row["Driver"], row["Constructor"]
+        ordered = sorted(totals.values(), key=lambda t: (t["points"], t["wins"]), reverse=True)
+        return [
+            {"position": str(pos), "positionText": str(pos), "points": str(t["points"]), "wins": str(t["wins"]),
+             "Driver": t["Driver"], "Constructors": [t["Constructor"]]}
+            for pos, t in enumerate(ordered, 1)
+        ]
+
+    def constructor_standings(self, season, round_num=None):
+        return compute_constructor_standings_from_drivers(self.driver_standings(season, round_num))
+
+    def fill_store(self, store, seasons=None):
+        """Ingest the history into a ResultsStore (marked complete, like a finished backfill)."""
+        for season in seasons or self.seasons:
+            for listing in ("results", "qualifying"):
+                rows = store.ingest_races(list(self.races(listing, [season])), listing)
+                store.mark_ingested(season, listing, rows, True)
@@ -0,0 +1,169 @@
+"""Pre-encoded JSON response bodies.
+
+Routes cache an `EncodedPayload` (the final JSON bytes and their content
+hash) instead of Python objects, so a cache hit is served without
+re-encoding, and clients revalidating with `If-None-Match` get a 304.
+
+A payload can also carry compressed variants of its body (gzip, and brotli
+when the optional `brotli` package is installed), produced once when it is
+written to the cache: responses pick one from `Accept-Encoding` without
+compressing anything on the request path.
+"""
+
+import gzip
+import hashlib
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+import json_codec
+from metrics import RESPONSE_BYTES, RESPONSE_UNCOMPRESSED_BYTES
+from timing import phase
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Sous ce seuil, la compression ne gagne presque rien (en-têtes gzip, trame TCP)
+COMPRESS_MIN_BYTES = 1024
+# Au-delà, compresser dans un thread (une saison complète : ~175 Ko, ~7 ms)
+COMPRESS_THREAD_BYTES = 64 * 1024
+GZIP_LEVEL = 6
+# Qualité 5 : ~99 % des octets gagnés par la qualité 11, pour ~1 % du temps (saison complète)
+BROTLI_QUALITY = 5
+# Ordre de préférence à qualité égale dans Accept-Encoding
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedPayload:
+    """JSON body encoded once, with its strong ETag.
+
+    headers are extra response headers computed when the body was built
+    (e.g. fetch timing metadata); they are served with every hit.
+    variants are (content-coding, compressed body) pairs, see compress_payload().
+    """
+    body: bytes
+    etag: str
+    headers: Tuple[Tuple[str, str], ...] = ()
+    variants: Tuple[Tuple[str, bytes], ...] = ()
+
+    def decode(self) -> Any:
+        return json_codec.loads(self.body)
+
+    def variant(self, encoding: str) -> Optional[bytes]:
+        for name, body in self.variants:
+            if name == encoding:
+                return body
+        return None
+
+    def __setstate__(self, state):
+        # Entrées persistées avant l'ajout des variantes : 3 champs
+        body, etag, headers, *variants = state
+        object.__setattr__(self, "body", body)
+        object.__setattr__(self, "etag", etag)
+        object.__setattr__(self, "headers", headers)
+        object.__setattr__(self, "variants", variants[0] if variants else ())
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def encode_payload(data: Any, headers: Optional[Dict[str, str]] = None) -> EncodedPayload:
+    """Encode data to JSON bytes (orjson when available) and hash them."""
+    with phase("encode"):
+        body = json_codec.dumps(data)
+        etag = compute_etag(body)
+    return EncodedPayload(body, etag, tuple((headers or {}).items()))
+
+
+def compress_payload(payload: EncodedPayload) -> EncodedPayload:
+    """payload with its gzip (and brotli) variants; small or already compressed payloads as-is.
+
+    A variant that would not be smaller than the body is left out.
+    """
+    if payload.variants or len(payload.body) < COMPRESS_MIN_BYTES:
+        return payload
+    with phase("compress"):
+        variants = []
+        if brotli is not None:
+            variants.append(("br", brotli.compress(payload.body, quality=BROTLI_QUALITY)))
+        # mtime=0 : mêmes octets pour un même body
+        variants.append(("gzip", gzip.compress(payload.body, compresslevel=GZIP_LEVEL, mtime=0)))
+    return replace(payload, variants=tuple((name, body) for name, body in variants if len(body) < len(payload.body)))
+
+
+def negotiate(accept_encoding: str, available) -> Optional[str]:
+    """Content-coding to serve for an Accept-Encoding header (None: identity).
+
+    Highest q-value wins, then the server's preference (br before gzip).
+    """
+    if not accept_encoding or not available:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in ENCODINGS:
+        if coding not in available:
+            continue
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Strong ETags differ per content-coding: '"abc"' -> '"abc-br"'."""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against etag (RFC 9110)."""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def payload_response(request: Request, payload: EncodedPayload) -> Response:
+    """Serve payload (compressed if the client accepts it), or 304 if the client already has it."""
+    encoding = None
+    if payload.variants:
+        encoding = negotiate(request.headers.get("accept-encoding", ""), [name for name, _ in payload.variants])
+    etag = variant_etag(payload.etag, encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if payload.variants:
+        headers["Vary"] = "Accept-Encoding"
+    if_none_match = request.headers.get("if-none-match")
+    # Même contenu quelle que soit la variante que le client a gardée
+    if if_none_match and any(etag_matches(if_none_match, variant_etag(payload.etag, name))
+                             for name in (None, *(name for name, _ in payload.variants))):
+        return Response(status_code=304, headers=headers)
+    headers.update(payload.headers)
+    body = payload.body
+    if encoding is not None:
+        body = payload.variant(encoding)
+        headers["Content-Encoding"] = encoding
+        headers["X-Uncompressed-Length"] = str(len(payload.body))
+        headers["X-Compression-Ratio"] = f"{len(body) / len(payload.body):.3f}"
+    RESPONSE_BYTES.inc(encoding or "identity", amount=len(body))
+    RESPONSE_UNCOMPRESSED_BYTES.inc(encoding or "identity", amount=len(payload.body))
+    return Response(content=body, media_type="application/json", headers=headers)
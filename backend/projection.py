@@ -0,0 +1,119 @@
+"""Sparse fieldsets: `?fields=position,points,Driver.code,Constructors.name`.
+
+A field list is compiled once into a projection function (lru_cache per
+normalized list) that keeps only the named keys. Dotted paths descend into
+objects; lists are projected item by item, so the top-level list of a
+standings or results payload and nested lists (`Constructors`, `Results`)
+take the same syntax. Unknown fields are left out, not reported.
+
+Projected bodies are memoized per (source ETag, field list): repeated widget
+requests on a cached payload are served without decoding or re-encoding.
+"""
+
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from payloads import EncodedPayload, compress_payload, encode_payload
+from timing import phase
+
+MAX_FIELDS = 64
+# Taille de la mémo des réponses projetées ; les corps projetés sont petits
+PROJECTED_CACHE_SIZE = 256
+
+_SEGMENT = re.compile(r"^\w+$")
+
+Tree = Dict[str, Optional["Tree"]]
+
+
+def normalize_fields(spec: str) -> str:
+    """Canonical field list ("a, b.c,a" -> "a,b.c"); ValueError if malformed."""
+    fields = []
+    for field in spec.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        if not all(_SEGMENT.match(segment) for segment in field.split(".")):
+            raise ValueError(f"Champ invalide : {field!r}")
+        if field not in fields:
+            fields.append(field)
+    if not fields:
+        raise ValueError("Liste de champs vide")
+    if len(fields) > MAX_FIELDS:
+        raise ValueError(f"Trop de champs (max {MAX_FIELDS})")
+    return ",".join(fields)
+
+
+def _tree(fields: str) -> Tree:
+    tree: Tree = {}
+    for field in fields.split(","):
+        node = tree
+        *parents, leaf = field.split(".")
+        for name in parents:
+            child = node.get(name, {})
+            if child is None:
+                # "Driver" déjà demandé en entier : "Driver.code" n'enlève rien
+                break
+            node = node.setdefault(name, child)
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _compile(tree: Tree) -> Callable[[Any], Any]:
+    children = [(name, None if sub is None else _compile(sub)) for name, sub in tree.items()]
+
+    def project(value):
+        if isinstance(value, list):
+            return [project(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        out = {}
+        for name, sub in children:
+            if name not in value:
+                continue
+            child = value[name]
+            if sub is None:
+                out[name] = child
+            elif isinstance(child, (dict, list)):
+                out[name] = sub(child)
+        return out
+
+    return project
+
+
+@lru_cache(maxsize=256)
+def compile_projection(fields: str) -> Callable[[Any], Any]:
+    """Projection function for a normalized field list (see normalize_fields)."""
+    return _compile(_tree(fields))
+
+
+def project(data: Any, spec: str) -> Any:
+    return compile_projection(normalize_fields(spec))(data)
+
+
+_projected: "OrderedDict[Tuple[str, str], EncodedPayload]" = OrderedDict()
+
+
+def project_payload(payload: EncodedPayload, spec: str) -> EncodedPayload:
+    """payload restricted to the fields of spec; ValueError if spec is malformed.
+
+    The projected payload has its own ETag, and compressed variants when the
+    source had some.
+    """
+    fields = normalize_fields(spec)
+    key = (payload.etag, fields)
+    cached = _projected.get(key)
+    if cached is not None:
+        _projected.move_to_end(key)
+        return cached
+    with phase("project"):
+        data = compile_projection(fields)(payload.decode())
+    projected = encode_payload(data, dict(payload.headers))
+    if payload.variants:
+        projected = compress_payload(projected)
+    _projected[key] = projected
+    if len(_projected) > PROJECTED_CACHE_SIZE:
+        _projected.popitem(last=False)
+    return projected
@@ -0,0 +1,250 @@
+"""Compact in-memory model for race results and standings.
+
+Ergast-shaped results are nested dicts of strings: every row repeats its
+full `Driver` and `Constructor` objects and stores numbers as strings.
+Here drivers, constructors and circuits are interned once in an
+`EntityPool`, rows reference them by index, and numeric fields live in
+typed `array` columns. The public JSON shape is rebuilt by `expand()`,
+only when a response is serialized.
+
+Encoding is lossless: a value that would not round-trip exactly (e.g.
+points "25.0") is kept as-is in the row's extras. Expanded rows share the
+pooled entity dicts, so treat them as read-only.
+"""
+
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import json_codec
+
+_ABSENT = -1
+_OMITTED = object()  # positionText absent de la ligne (ex. qualifications)
+
+
+class EntityPool:
+    """Distinct Driver / Constructor / Circuit objects, each stored once."""
+
+    __slots__ = ("items", "_index")
+
+    def __init__(self):
+        self.items: List[dict] = []
+        self._index: Dict[bytes, int] = {}
+
+    def add(self, obj: dict) -> int:
+        key = json_codec.dumps(obj)
+        idx = self._index.get(key)
+        if idx is None:
+            idx = self._index[key] = len(self.items)
+            self.items.append(obj)
+        return idx
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+# Pool partagé par défaut : un pilote est stocké une fois pour toutes les courses
+POOL = EntityPool()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _int_or_none(value: Any, limit: int = 1 << 15) -> Optional[int]:
+    """int for a canonical non-negative integer string ("7", not "07" or "-1") below limit."""
+    if isinstance(value, str) and value.isdigit() and str(int(value)) == value and int(value) < limit:
+        return int(value)
+    return None
+
+
+def _format_points(value: float) -> str:
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def _points_or_none(value: Any) -> Optional[float]:
+    try:
+        number = float(array("f", [float(value)])[0])
+    except (TypeError, ValueError):
+        return None
+    return number if _format_points(number) == value else None
+
+
+class _Columns:
+    """Typed columns shared by results and standings rows."""
+
+    __slots__ = ("position", "position_text", "points", "extras")
+
+    def __init__(self):
+        self.position = array("h")
+        self.position_text: List[Optional[str]] = []   # None : identique à position
+        self.points = array("f")
+        self.extras: List[Optional[dict]] = []
+
+    def _add_common(self, row: dict, extras: dict):
+        position = _int_or_none(row.get("position"))
+        self.position.append(_ABSENT if position is None else position)
+        if position is None and "position" in row:
+            extras["position"] = row["position"]
+        text = row.get("positionText", _OMITTED)
+        self.position_text.append(None if position is not None and text == str(position) else _intern(text))
+        points = _points_or_none(row.get("points"))
+        self.points.append(float("nan") if points is None else points)
+        if points is None and "points" in row:
+            extras["points"] = row["points"]
+
+    def _expand_common(self, i: int, out: dict):
+        position = self.position[i]
+        if position != _ABSENT:
+            out["position"] = str(position)
+        text = self.position_text[i]
+        if text is _OMITTED:
+            pass
+        elif text is not None:
+            out["positionText"] = text
+        elif position != _ABSENT:
+            out["positionText"] = str(position)
+        points = self.points[i]
+        if points == points:  # NaN : absent ou gardé dans extras
+            out["points"] = _format_points(points)
+
+
+class CompactResults(_Columns):
+    """Results rows of one race as columns."""
+
+    __slots__ = ("number", "driver", "constructor", "grid", "laps", "status", "millis", "time_text")
+
+    HANDLED = {"number", "position", "positionText", "points", "Driver", "Constructor", "grid", "laps", "status", "Time"}
+
+    def __init__(self):
+        super().__init__()
+        self.number: List[Optional[str]] = []
+        self.driver = array("H")
+        self.constructor = array("H")
+        self.grid = array("h")
+        self.laps = array("h")
+        self.status: List[Optional[str]] = []
+        self.millis = array("q")
+        self.time_text: List[Optional[str]] = []
+
+    def add(self, row: dict, pool: EntityPool):
+        extras = {k: v for k, v in row.items() if k not in self.HANDLED}
+        self._add_common(row, extras)
+        self.number.append(_intern(row.get("number")))
+        self.driver.append(pool.add(row["Driver"]))
+        self.constructor.append(pool.add(row["Constructor"]) if "Constructor" in row else 0xFFFF)
+        for name in ("grid", "laps"):
+            value = _int_or_none(row.get(name))
+            getattr(self, name).append(_ABSENT if value is None else value)
+            if value is None and name in row:
+                extras[name] = row[name]
+        self.status.append(_intern(row.get("status")))
+        time_ = row.get("Time")
+        millis = _int_or_none(time_.get("millis"), 1 << 63) if isinstance(time_, dict) and set(time_) == {"millis", "time"} else None
+        if millis is None and time_ is not None:
+            extras["Time"] = time_
+        self.millis.append(_ABSENT if millis is None else millis)
+        self.time_text.append(time_["time"] if millis is not None else None)
+        self.extras.append(extras or None)
+
+    def expand(self, i: int, pool: EntityPool) -> dict:
+        out = {}
+        if self.number[i] is not None:
+            out["number"] = self.number[i]
+        self._expand_common(i, out)
+        out["Driver"] = pool.items[self.driver[i]]
+        if self.constructor[i] != 0xFFFF:
+            out["Constructor"] = pool.items[self.constructor[i]]
+        for name in ("grid", "laps"):
+            value = getattr(self, name)[i]
+            if value != _ABSENT:
+                out[name] = str(value)
+        if self.status[i] is not None:
+            out["status"] = self.status[i]
+        if self.millis[i] != _ABSENT:
+            out["Time"] = {"millis": str(self.millis[i]), "time": self.time_text[i]}
+        if self.extras[i]:
+            out.update(self.extras[i])
+        return out
+
+    def __len__(self) -> int:
+        return len(self.driver)
+
+
+class CompactRace:
+    """A race and its results (or QualifyingResults); entities are indexes into a pool."""
+
+    __slots__ = ("season", "round", "circuit", "fields", "results", "pool", "rows_key")
+
+    def __init__(self, race: dict, pool: EntityPool = POOL, rows_key: str = "Results"):
+        self.pool = pool
+        self.rows_key = rows_key
+        self.season = _intern(race["season"])
+        self.round = _intern(race["round"])
+        self.circuit = pool.add(race["Circuit"]) if "Circuit" in race else None
+        # Autres champs de la course (raceName, date, time, url, sessions...)
+        self.fields: Tuple[Tuple[str, Any], ...] = tuple(
+            (sys.intern(k), _intern(v)) for k, v in race.items() if k not in ("season", "round", "Circuit", rows_key)
+        )
+        self.results = CompactResults()
+        for row in race.get(rows_key, []):
+            self.results.add(row, pool)
+
+    def expand(self) -> dict:
+        """The race in Ergast's JSON shape."""
+        race = {"season": self.season, "round": self.round}
+        fields = dict(self.fields)
+        if "raceName" in fields:
+            race["raceName"] = fields.pop("raceName")
+        if self.circuit is not None:
+            race["Circuit"] = self.pool.items[self.circuit]
+        race.update(fields)
+        race[self.rows_key] = [self.results.expand(i, self.pool) for i in range(len(self.results))]
+        return race
+
+
+class CompactStandings(_Columns):
+    """A driver or constructor standings list as columns."""
+
+    __slots__ = ("wins", "entity", "constructors", "pool", "kind")
+
+    HANDLED = {"position", "positionText", "points", "wins", "Driver", "Constructor", "Constructors"}
+
+    def __init__(self, rows: List[dict], pool: EntityPool = POOL):
+        super().__init__()
+        self.pool = pool
+        self.kind = "Driver" if rows and "Driver" in rows[0] else "Constructor"
+        self.wins = array("h")
+        self.entity = array("H")
+        self.constructors: List[Tuple[int, ...]] = []
+        for row in rows:
+            extras = {k: v for k, v in row.items() if k not in self.HANDLED}
+            self._add_common(row, extras)
+            wins = _int_or_none(row.get("wins"))
+            self.wins.append(_ABSENT if wins is None else wins)
+            if wins is None and "wins" in row:
+                extras["wins"] = row["wins"]
+            self.entity.append(pool.add(row[self.kind]))
+            self.constructors.append(tuple(pool.add(c) for c in row.get("Constructors", ())))
+            if self.kind == "Driver" and "Constructors" not in row:
+                extras["Constructors"] = None
+            self.extras.append(extras or None)
+
+    def expand(self) -> List[dict]:
+        rows = []
+        for i in range(len(self.entity)):
+            row = {}
+            self._expand_common(i, row)
+            if self.wins[i] != _ABSENT:
+                row["wins"] = str(self.wins[i])
+            extras = dict(self.extras[i] or {})
+            # Champs hors standard (ex. "podiums") à leur place d'origine, avant les entités
+            row.update({k: v for k, v in extras.items() if k != "Constructors"})
+            row[self.kind] = self.pool.items[self.entity[i]]
+            if self.kind == "Driver" and "Constructors" not in extras:
+                row["Constructors"] = [self.pool.items[c] for c in self.constructors[i]]
+            rows.append(row)
+        return rows
+
+    def __len__(self) -> int:
+        return len(self.entity)
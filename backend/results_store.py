@@ -0,0 +1,463 @@
+"""Local historical results database (SQLite).
+
+Ergast result listings are ingested season by season into an indexed
+SQLite file, so career statistics and race results are answered by SQL
+queries instead of downloading and re-aggregating raw JSON on every cache
+miss.
+
+Tables: races, results, qualifying, drivers, constructors, plus
+ingest_state (rows read per season, used for incremental ingests).
+`ResultsStore` is synchronous (sqlite3); the app calls it through
+`asyncio.to_thread`.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+import json_codec
+from ergast import get_mrdata, iter_pages
+from season_calendar import results_available
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drivers (
+    driver_id TEXT PRIMARY KEY,
+    code TEXT,
+    permanent_number TEXT,
+    given_name TEXT,
+    family_name TEXT,
+    nationality TEXT
+);
+CREATE TABLE IF NOT EXISTS constructors (
+    constructor_id TEXT PRIMARY KEY,
+    name TEXT,
+    nationality TEXT
+);
+CREATE TABLE IF NOT EXISTS races (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    race_name TEXT,
+    date TEXT,
+    time TEXT,
+    data BLOB NOT NULL,             -- race JSON without its results
+    PRIMARY KEY (season, round)
+);
+CREATE TABLE IF NOT EXISTS results (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    driver_id TEXT NOT NULL,
+    constructor_id TEXT,
+    position INTEGER,
+    position_text TEXT,
+    grid INTEGER,
+    points REAL,
+    status TEXT,
+    data BLOB NOT NULL,             -- result JSON as served by Ergast
+    PRIMARY KEY (season, round, driver_id)
+);
+CREATE TABLE IF NOT EXISTS qualifying (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    driver_id TEXT NOT NULL,
+    constructor_id TEXT,
+    position INTEGER,
+    PRIMARY KEY (season, round, driver_id)
+);
+CREATE TABLE IF NOT EXISTS ingest_state (
+    season INTEGER NOT NULL,
+    listing TEXT NOT NULL,          -- "results" or "qualifying"
+    rows INTEGER NOT NULL,
+    complete INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (season, listing)
+);
+CREATE INDEX IF NOT EXISTS results_driver ON results (driver_id, position);
+CREATE INDEX IF NOT EXISTS results_constructor ON results (constructor_id, season);
+CREATE INDEX IF NOT EXISTS qualifying_driver ON qualifying (driver_id, position);
+CREATE INDEX IF NOT EXISTS qualifying_constructor ON qualifying (constructor_id, season);
+CREATE INDEX IF NOT EXISTS races_date ON races (date);
+"""
+
+LISTINGS = {"results": "Results", "qualifying": "QualifyingResults"}
+# Réponses Ergast qui valent un nouvel essai (rate limiting, panne passagère)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultsStore:
+    """Indexed results database in a single SQLite file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Incrémenté à chaque ingestion : invalide les vues dérivées (tables en colonnes)
+        self.version = 0
+        # (version, nombre de lignes par table) : pas de COUNT(*) tant que rien n'est ingéré
+        self._counts: Optional[Tuple[int, Dict[str, int]]] = None
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ── Ingest ───────────────────────────────────────────────────────────────
+    def ingest_races(self, races: List[dict], listing: str = "results", replace: bool = False) -> int:
+        """Upsert a page of an Ergast listing (races with Results or QualifyingResults).
+
+        A race split across two pages is simply upserted twice. With
+        replace, the rows of these races are deleted first (corrected
+        results: a driver may have left the classification). Returns the
+        number of result rows written.
+        """
+        rows_key = LISTINGS[listing]
+        drivers, constructors, race_rows, rows = {}, {}, [], []
+        for race in races:
+            season, round_ = int(race["season"]), int(race["round"])
+            race_data = {k: v for k, v in race.items() if k not in LISTINGS.values()}
+            race_rows.append((season, round_, race.get("raceName"), race.get("date"), race.get("time"),
+                              json_codec.dumps(race_data)))
+            for result in race.get(rows_key, []):
+                driver, constructor = result["Driver"], result.get("Constructor") or {}
+                drivers[driver["driverId"]] = (
+                    driver["driverId"], driver.get("code"), driver.get("permanentNumber"),
+                    driver.get("givenName"), driver.get("familyName"), driver.get("nationality"),
+                )
+                if constructor:
+                    constructors[constructor["constructorId"]] = (
+                        constructor["constructorId"], constructor.get("name"), constructor.get("nationality"),
+                    )
+                if listing == "results":
+                    rows.append((season, round_, driver["driverId"], constructor.get("constructorId"),
+                                 _int(result.get("position")), result.get("positionText"), _int(result.get("grid")),
+                                 float(result.get("points") or 0), result.get("status"), json_codec.dumps(result)))
+                else:
+                    rows.append((season, round_, driver["driverId"], constructor.get("constructorId"),
+                                 _int(result.get("position"))))
+
+        table = "results" if listing == "results" else "qualifying"
+        with self._lock, self._conn:
+            if replace:
+                self._conn.executemany(f"DELETE FROM {table} WHERE season = ? AND round = ?",
+                                       [row[:2] for row in race_rows])
+            self._conn.executemany("INSERT OR REPLACE INTO drivers VALUES (?, ?, ?, ?, ?, ?)", drivers.values())
+            self._conn.executemany("INSERT OR REPLACE INTO constructors VALUES (?, ?, ?)", constructors.values())
+            self._conn.executemany(
+                "INSERT INTO races VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (season, round) DO UPDATE SET "
+                "race_name = excluded.race_name, date = excluded.date, time = excluded.time, data = excluded.data",
+                race_rows,
+            )
+            if listing == "results":
+                self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            else:
+                self._conn.executemany("INSERT OR REPLACE INTO qualifying VALUES (?, ?, ?, ?, ?)", rows)
+        if rows or replace:
+            self.version += 1
+        return len(rows)
+
+    def ingested_rows(self, season: int, listing: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rows, complete FROM ingest_state WHERE season = ? AND listing = ?", (season, listing)
+            ).fetchone()
+        return {"rows": row[0], "complete": bool(row[1])} if row else None
+
+    def mark_ingested(self, season: int, listing: str, rows: int, complete: bool):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO ingest_state VALUES (?, ?, ?, ?, ?)",
+                               (season, listing, rows, int(complete), time.time()))
+
+    def ingested_seasons(self) -> List[int]:
+        """Seasons whose results and qualifying were both fully ingested (marked complete)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT season FROM ingest_state WHERE complete = 1 GROUP BY season HAVING COUNT(*) = ? "
+                "ORDER BY season",
+                (len(LISTINGS),),
+            ).fetchall()
+        return [season for (season,) in rows]
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+    def races(self, season: int) -> List[dict]:
+        """Ingested races of a season, without their results, by round."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM races WHERE season = ? ORDER BY round", (season,)
+            ).fetchall()
+        return [json_codec.loads(data) for (data,) in rows]
+
+    def driver_career(self, driver_id: str) -> dict:
+        """Career totals of one driver (races, wins, podiums, poles)."""
+        return self.driver_careers([driver_id])[driver_id]
+
+    def driver_careers(self, driver_ids: Iterable[str]) -> Dict[str, dict]:
+        """Career totals of several drivers in two grouped queries."""
+        driver_ids = list(driver_ids)
+        careers = {d: {"total_wins": 0, "total_podiums": 0, "total_races": 0, "total_poles": 0} for d in driver_ids}
+        if not driver_ids:
+            return careers
+        marks = ",".join("?" * len(driver_ids))
+        with self._lock:
+            results = self._conn.execute(
+                f"SELECT driver_id, COUNT(*), SUM(position = 1), SUM(position <= 3) FROM results "
+                f"WHERE driver_id IN ({marks}) GROUP BY driver_id", driver_ids,
+            ).fetchall()
+            poles = self._conn.execute(
+                f"SELECT driver_id, COUNT(*) FROM qualifying "
+                f"WHERE driver_id IN ({marks}) AND position = 1 GROUP BY driver_id", driver_ids,
+            ).fetchall()
+        for driver_id, races, wins, podiums in results:
+            careers[driver_id].update(total_races=races, total_wins=wins or 0, total_podiums=podiums or 0)
+        for driver_id, count in poles:
+            careers[driver_id]["total_poles"] = count
+        return careers
+
+    def result_rows(self) -> List[tuple]:
+        """Every result as (season, round, driver_id, constructor_id, position, grid, points, status)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT season, round, driver_id, constructor_id, position, grid, points, status FROM results"
+            ).fetchall()
+
+    def qualifying_rows(self) -> List[tuple]:
+        """Qualifying results in the same row shape (no grid, points or status)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT season, round, driver_id, constructor_id, position, 0, 0, NULL FROM qualifying"
+            ).fetchall()
+
+    def race_result(self, season: int, round_: int) -> Optional[dict]:
+        """A race with its Results, in Ergast's shape (None if not ingested)."""
+        with self._lock:
+            race = self._conn.execute(
+                "SELECT data FROM races WHERE season = ? AND round = ?", (season, round_)
+            ).fetchone()
+            results = self._conn.execute(
+                "SELECT data FROM results WHERE season = ? AND round = ? ORDER BY position", (season, round_)
+            ).fetchall()
+        if race is None or not results:
+            return None
+        return {**json_codec.loads(race[0]), "Results": [json_codec.loads(data) for (data,) in results]}
+
+    def season_results(self, season: int) -> List[dict]:
+        """Every ingested race of a season with its Results, by round."""
+        with self._lock:
+            races = self._conn.execute(
+                "SELECT round, data FROM races WHERE season = ? ORDER BY round", (season,)
+            ).fetchall()
+            results = self._conn.execute(
+                "SELECT round, data FROM results WHERE season = ? ORDER BY round, position", (season,)
+            ).fetchall()
+        rows: Dict[int, List[dict]] = {}
+        for round_, data in results:
+            rows.setdefault(round_, []).append(json_codec.loads(data))
+        return [{**json_codec.loads(data), "Results": rows[round_]} for round_, data in races if round_ in rows]
+
+    def get_stats(self) -> dict:
+        """Row count of each table, counted again only after an ingest changed the store."""
+        with self._lock:
+            if self._counts is None or self._counts[0] != self.version:
+                counts = {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                          for table in ("races", "results", "qualifying", "drivers", "constructors")}
+                self._counts = (self.version, counts)
+            counts = self._counts[1]
+        return {"path": self.path, **counts}
+
+
+# ── Ingestion from Ergast ─────────────────────────────────────────────────────
+async def ingest_season(client: httpx.AsyncClient, store: ResultsStore, base_url: str, season: int,
+                        complete: bool) -> int:
+    """Ingest the results and qualifying listings of a season.
+
+    Listings are read from the number of rows already ingested (offsets
+    count result rows), so re-ingesting the current season only downloads
+    the rows added since. Progress is saved after every page: an ingest
+    interrupted by an error resumes where it stopped. Returns the number
+    of rows written.
+    """
+    written = 0
+    for listing in LISTINGS:
+        state = await asyncio.to_thread(store.ingested_rows, season, listing)
+        if state and state["complete"]:
+            continue
+        offset = state["rows"] if state else 0
+        rows = offset
+        async for races in iter_pages(client, f"{base_url}/{season}/{listing}.json", offset=offset):
+            count = await asyncio.to_thread(store.ingest_races, races, listing)
+            rows += count
+            written += count
+            await asyncio.to_thread(store.mark_ingested, season, listing, rows, False)
+        await asyncio.to_thread(store.mark_ingested, season, listing, rows, complete)
+    return written
+
+
+def retry_delay(error: Exception, attempt: int, max_backoff: float) -> Optional[float]:
+    """Seconds to wait before retrying after error (Retry-After, else exponential), None if not retryable."""
+    if isinstance(error, httpx.HTTPStatusError):
+        if error.response.status_code not in RETRY_STATUSES:
+            return None
+        retry_after = error.response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), max_backoff)
+    elif not isinstance(error, httpx.TransportError):
+        return None
+    return min(float(2 ** attempt), max_backoff)
+
+
+async def recheck_rounds(client: httpx.AsyncClient, store: ResultsStore, base_url: str, season: int,
+                         since: datetime) -> int:
+    """Re-read the rounds of a season whose results were published after since.
+
+    Ergast corrects results after first publication (penalties, DSQs);
+    the season listing is only read forward, so recent rounds are fetched
+    again and replaced when they differ. Returns the number of rows written.
+    """
+    written = 0
+    for race in await asyncio.to_thread(store.races, season):
+        if results_available(race) < since:
+            continue
+        round_ = int(race["round"])
+        mrdata = await get_mrdata(client, f"{base_url}/{season}/{round_}/results.json")
+        fresh = mrdata["RaceTable"]["Races"]
+        if not fresh:
+            continue
+        stored = await asyncio.to_thread(store.race_result, season, round_)
+        old = stored["Results"] if stored else []
+        if sorted(map(json_codec.dumps, old)) == sorted(map(json_codec.dumps, fresh[0].get("Results", []))):
+            continue
+        count = await asyncio.to_thread(store.ingest_races, fresh, "results", True)
+        written += count
+        # Les offsets du listing saison suivent le nombre de lignes
+        state = await asyncio.to_thread(store.ingested_rows, season, "results")
+        if state is not None:
+            await asyncio.to_thread(store.mark_ingested, season, "results", state["rows"] + count - len(old),
+                                    state["complete"])
+        logger.info(f"Results store: {season}/{round_} corrected upstream, {count} rows replaced")
+    return written
+
+
+class ResultsIngester:
+    """Backfills past seasons once, then keeps the current season up to date.
+
+    The backfill is paced (season_pause seconds between seasons) and a
+    season hitting a 429 or a 5xx is retried after Retry-After (or an
+    exponential backoff), up to max_retries times, from the page it
+    reached. Rounds of the current season published less than
+    recheck_window seconds ago are re-read on every pass, to pick up
+    corrected results.
+    """
+
+    def __init__(self, store: ResultsStore, client_factory, base_url: str, first_season: int,
+                 current_season, refresh_interval: float = 600, season_pause: float = 1.0,
+                 max_retries: int = 5, max_backoff: float = 300, recheck_window: float = 7 * 86400):
+        self.store = store
+        self._client_factory = client_factory
+        self._base_url = base_url
+        self._first_season = first_season
+        self._current_season = current_season
+        self._refresh_interval = refresh_interval
+        self._season_pause = season_pause
+        self._max_retries = max_retries
+        self._max_backoff = max_backoff
+        self._recheck_window = timedelta(seconds=recheck_window)
+        self.retries = 0
+        self._task: Optional[asyncio.Task] = None
+        self.ready = self._backfilled()
+        self.last_error: Optional[str] = None
+
+    def _backfilled(self) -> bool:
+        """Every past season complete and the current one ingested at least once."""
+        current = self._current_season()
+        seasons = set(self.store.ingested_seasons())
+        return (all(s in seasons for s in range(self._first_season, current))
+                and self.store.ingested_rows(current, "results") is not None)
+
+    async def run_once(self) -> int:
+        """Ingest every missing past season and the current one.
+
+        The current season is ingested as incomplete: once the year changes
+        it is a missing past season, read to its end and marked complete.
+        """
+        client = self._client_factory()
+        current = self._current_season()
+        done = set(await asyncio.to_thread(self.store.ingested_seasons))
+        written = 0
+        for season in range(self._first_season, current):
+            if season not in done:
+                written += await self._ingest(client, season, complete=True)
+                logger.info(f"Results store: season {season} ingested")
+                # Le rattrapage ne doit pas saturer Ergast (limite de débit partagée avec les requêtes)
+                await asyncio.sleep(self._season_pause)
+        written += await self._ingest(client, current, complete=False)
+        since = datetime.now(timezone.utc) - self._recheck_window
+        written += await recheck_rounds(client, self.store, self._base_url, current, since)
+        self.ready = True
+        return written
+
+    async def _ingest(self, client: httpx.AsyncClient, season: int, complete: bool) -> int:
+        attempt = 0
+        while True:
+            try:
+                return await ingest_season(client, self.store, self._base_url, season, complete)
+            except Exception as e:
+                delay = retry_delay(e, attempt, self._max_backoff)
+                if delay is None or attempt >= self._max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"Results store: season {season} failed ({e}), retry {attempt} in {delay:.0f}s")
+                await asyncio.sleep(delay)
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                logger.warning(f"Results store ingest failed: {self.last_error}")
+            await asyncio.sleep(self._refresh_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def get_stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "running": self._task is not None,
+            "seasons": len(self.store.ingested_seasons()),
+            "retries": self.retries,
+            "last_error": self.last_error,
+            **self.store.get_stats(),
+        }
@@ -0,0 +1,70 @@
+"""Race weekend dates from the Ergast schedule (`schedule:current`).
+
+Used to decide how fresh race-dependent data must be: standings and
+results only change during a race weekend, so they can be refreshed
+aggressively then and rarely in between.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+# Sans heure dans le calendrier, on suppose un départ en début d'après-midi (UTC)
+DEFAULT_RACE_TIME = "13:00:00Z"
+# Durée d'une course (drapeau à damier) et délai de publication des résultats
+RACE_DURATION = timedelta(hours=2)
+RESULTS_DELAY = timedelta(hours=1)
+# Un week-end commence avec les essais libres, le vendredi
+WEEKEND_LEAD = timedelta(days=2, hours=6)
+
+
+def parse_session(date: str, time: Optional[str] = None) -> datetime:
+    """Ergast session date + time ("2024-03-02", "15:00:00Z") as an aware UTC datetime."""
+    time = (time or DEFAULT_RACE_TIME).rstrip("Z")
+    return datetime.fromisoformat(f"{date}T{time}").replace(tzinfo=timezone.utc)
+
+
+def race_start(race: dict) -> datetime:
+    return parse_session(race["date"], race.get("time"))
+
+
+def weekend_start(race: dict) -> datetime:
+    """Start of the first practice session, or WEEKEND_LEAD before the race."""
+    practice = race.get("FirstPractice")
+    if practice and practice.get("date"):
+        return parse_session(practice["date"], practice.get("time", "00:00:00Z"))
+    return race_start(race) - WEEKEND_LEAD
+
+
+def results_available(race: dict) -> datetime:
+    """When the race results are expected on Ergast."""
+    return race_start(race) + RACE_DURATION + RESULTS_DELAY
+
+
+class SeasonCalendar:
+    """The races of a season, sorted by start time."""
+
+    def __init__(self, races: List[dict]):
+        self.races = sorted((r for r in races if r.get("date")), key=race_start)
+
+    def next_race(self, now: datetime) -> Optional[dict]:
+        """The race in progress or the next one (None after the last race)."""
+        for race in self.races:
+            if results_available(race) > now:
+                return race
+        return None
+
+    def last_race(self, now: datetime) -> Optional[dict]:
+        """The last race whose results should be available."""
+        last = None
+        for race in self.races:
+            if results_available(race) > now:
+                break
+            last = race
+        return last
+
+    def current_weekend(self, now: datetime, tail: timedelta = timedelta(hours=6)) -> Optional[dict]:
+        """The race whose weekend is under way (first practice until tail after the results)."""
+        for race in self.races:
+            if weekend_start(race) <= now <= results_available(race) + tail:
+                return race
+        return None
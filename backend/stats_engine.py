@@ -0,0 +1,216 @@
+"""Columnar results table and vectorized career/season aggregations.
+
+Results are stored as one array per column (season, round, position, grid,
+points, finished) with drivers and constructors encoded as integer codes.
+Wins, podiums, points, DNFs and average finish of every driver (or
+constructor) are then computed in a handful of `np.bincount` group-bys,
+instead of a Python loop over nested Ergast dicts per driver.
+
+numpy is optional: without it the same aggregations run as a single
+Python pass over the columns.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+ENGINE = "numpy" if np is not None else "python"
+
+# Columns of a row: (season, round, driver_id, constructor_id, position, grid, points, status)
+ROW_FIELDS = ("season", "round", "driver_id", "constructor_id", "position", "grid", "points", "status")
+
+
+def is_finish(status: Optional[str]) -> bool:
+    """Classified at the flag: "Finished" or lapped ("+1 Lap", "+2 Laps"...)."""
+    return bool(status) and (status == "Finished" or status.startswith("+"))
+
+
+def rows_from_races(races: Iterable[dict], rows_key: str = "Results") -> List[tuple]:
+    """Flatten Ergast races (with Results or QualifyingResults) into rows."""
+    rows = []
+    for race in races:
+        season, round_ = int(race["season"]), int(race["round"])
+        for result in race.get(rows_key, []):
+            rows.append((
+                season, round_, result["Driver"]["driverId"],
+                (result.get("Constructor") or {}).get("constructorId"),
+                int(result.get("position") or 0), int(result.get("grid") or 0),
+                float(result.get("points") or 0), result.get("status"),
+            ))
+    return rows
+
+
+class _Codes:
+    """String id <-> integer code."""
+
+    __slots__ = ("ids", "index")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        value = value or ""
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.ids)
+            self.ids.append(value)
+        return code
+
+
+class ResultsTable:
+    """Race results as columns, ids as integer codes."""
+
+    def __init__(self, columns: Dict[str, Sequence], drivers: List[str], constructors: List[str]):
+        self.columns = columns
+        self.drivers = drivers
+        self.constructors = constructors
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "ResultsTable":
+        drivers, constructors = _Codes(), _Codes()
+        cols = {name: [] for name in ("season", "round", "driver", "constructor", "position", "grid", "points", "finished")}
+        for season, round_, driver_id, constructor_id, position, grid, points, status in rows:
+            cols["season"].append(season)
+            cols["round"].append(round_)
+            cols["driver"].append(drivers.code(driver_id))
+            cols["constructor"].append(constructors.code(constructor_id))
+            cols["position"].append(position or 0)
+            cols["grid"].append(grid or 0)
+            cols["points"].append(points or 0.0)
+            cols["finished"].append(is_finish(status))
+        if np is not None:
+            cols = {
+                "season": np.array(cols["season"], dtype=np.int16),
+                "round": np.array(cols["round"], dtype=np.int16),
+                "driver": np.array(cols["driver"], dtype=np.int32),
+                "constructor": np.array(cols["constructor"], dtype=np.int32),
+                "position": np.array(cols["position"], dtype=np.int16),
+                "grid": np.array(cols["grid"], dtype=np.int16),
+                "points": np.array(cols["points"], dtype=np.float32),
+                "finished": np.array(cols["finished"], dtype=bool),
+            }
+        return cls(cols, drivers.ids, constructors.ids)
+
+    @classmethod
+    def from_races(cls, races: Iterable[dict], rows_key: str = "Results") -> "ResultsTable":
+        return cls.from_rows(rows_from_races(races, rows_key))
+
+    def __len__(self) -> int:
+        return len(self.columns["season"])
+
+    def seasons(self) -> List[int]:
+        return sorted({int(s) for s in self.columns["season"]})
+
+    def select(self, season: int) -> "ResultsTable":
+        """Rows of one season (codes are kept, so the id lists are shared)."""
+        if np is not None:
+            mask = self.columns["season"] == season
+            return ResultsTable({name: col[mask] for name, col in self.columns.items()}, self.drivers, self.constructors)
+        keep = [i for i, s in enumerate(self.columns["season"]) if s == season]
+        return ResultsTable({name: [col[i] for i in keep] for name, col in self.columns.items()},
+                            self.drivers, self.constructors)
+
+    # ── Aggregations ─────────────────────────────────────────────────────────
+    def aggregate(self, by: str = "driver") -> Dict[str, dict]:
+        """races, wins, podiums, points, dnfs, avg_finish (and poles) per driver or constructor.
+
+        poles counts position 1 rows, which is what it means on a table
+        built from qualifying listings.
+        """
+        ids = self.drivers if by == "driver" else self.constructors
+        if np is not None:
+            return self._aggregate_numpy(by, ids)
+        return self._aggregate_python(by, ids)
+
+    def _aggregate_numpy(self, by: str, ids: List[str]) -> Dict[str, dict]:
+        cols, n = self.columns, len(ids)
+        codes = cols[by]
+        position, finished = cols["position"], cols["finished"]
+
+        def count(weights=None):
+            return np.bincount(codes, weights=weights, minlength=n)
+
+        races = count()
+        wins = count(position == 1)
+        podiums = count((position >= 1) & (position <= 3))
+        points = count(cols["points"])
+        finishes = count(finished)
+        finish_sum = count(np.where(finished, position, 0))
+        avg_finish = np.divide(finish_sum, finishes, out=np.full(n, np.nan), where=finishes > 0)
+
+        present = np.flatnonzero(races)
+        return {
+            ids[i]: {
+                "races": int(races[i]),
+                "wins": int(wins[i]),
+                "podiums": int(podiums[i]),
+                "points": round(float(points[i]), 2),
+                "dnfs": int(races[i] - finishes[i]),
+                "avg_finish": round(float(avg_finish[i]), 2) if finishes[i] else None,
+            }
+            for i in present
+        }
+
+    def _aggregate_python(self, by: str, ids: List[str]) -> Dict[str, dict]:
+        cols = self.columns
+        totals: Dict[int, list] = {}
+        for code, position, points, finished in zip(cols[by], cols["position"], cols["points"], cols["finished"]):
+            t = totals.get(code)
+            if t is None:
+                t = totals[code] = [0, 0, 0, 0.0, 0, 0]  # races, wins, podiums, points, finishes, finish_sum
+            t[0] += 1
+            t[1] += position == 1
+            t[2] += 1 <= position <= 3
+            t[3] += points
+            if finished:
+                t[4] += 1
+                t[5] += position
+        return {
+            ids[code]: {
+                "races": t[0],
+                "wins": t[1],
+                "podiums": t[2],
+                "points": round(t[3], 2),
+                "dnfs": t[0] - t[4],
+                "avg_finish": round(t[5] / t[4], 2) if t[4] else None,
+            }
+            for code, t in totals.items()
+        }
+
+    def first_places(self, by: str = "driver") -> Dict[str, int]:
+        """Number of position 1 rows per id (poles on a qualifying table)."""
+        return {key: row["wins"] for key, row in self.aggregate(by).items() if row["wins"]}
+
+    def nbytes(self) -> int:
+        if np is not None:
+            return sum(col.nbytes for col in self.columns.values())
+        return 0
+
+
+class StatsEngine:
+    """Results and qualifying tables of a results store, aggregated on demand."""
+
+    def __init__(self, results: ResultsTable, qualifying: Optional[ResultsTable] = None):
+        self.results = results
+        self.qualifying = qualifying
+
+    def career_stats(self, driver_ids: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        """Career totals of every driver (or of driver_ids, zeros if unknown), poles included."""
+        stats = self.results.aggregate("driver")
+        poles = self.qualifying.first_places("driver") if self.qualifying is not None else {}
+        empty = {"races": 0, "wins": 0, "podiums": 0, "points": 0.0, "dnfs": 0, "avg_finish": None}
+        keys = stats.keys() if driver_ids is None else driver_ids
+        return {d: {**stats.get(d, empty), "poles": poles.get(d, 0)} for d in keys}
+
+    def season_stats(self, season: int, by: str = "driver") -> Dict[str, dict]:
+        """Totals of one season per driver or constructor."""
+        stats = self.results.select(season).aggregate(by)
+        if self.qualifying is not None:
+            poles = self.qualifying.select(season).first_places(by)
+            for key, row in stats.items():
+                row["poles"] = poles.get(key, 0)
+        return stats
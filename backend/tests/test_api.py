@@ -220,6 +220,16 @@ def test_get_race_result_not_found():
     response = client.get("/race/2025/99")
     assert response.status_code == 404
 
+def test_get_season_results():
+    """Test des résultats d'une saison en une requête, complets ou podiums seulement"""
+    races = client.get("/race/2025/results").json()
+    assert races[0] == client.get("/race/2025/1").json()
+    podiums = client.get("/race/2025/results", params={"podium": "true"}).json()
+    assert [r["round"] for r in podiums] == [r["round"] for r in races]
+    assert all(len(r["Results"]) <= 3 for r in podiums)
+    assert podiums[0]["Results"] == races[0]["Results"][:3]
+    assert client.get("/race/1900/results").status_code == 404
+
 def test_cache_stats():
     """Test du endpoint de statistiques du cache"""
     response = client.get("/cache/stats")
@@ -272,4 +282,116 @@ def test_health_check_multiple_calls():
         data = response.json()
         assert data["status"] == "healthy"
         assert "cache" in data
-        assert data["cache"]["status"] == "active"
\ No newline at end of file
+        assert data["cache"]["status"] == "active"
+
+def test_cache_stats_http_pool():
+    """Test des statistiques du pool HTTP partagé"""
+    response = client.get("/cache/stats")
+    assert response.status_code == 200
+    http_stats = response.json()["http"]
+    for field in ("requests", "errors", "connections", "connections_opened", "connections_reused",
+                  "active", "idle", "max_connections", "http2"):
+        assert field in http_stats
+
+
+def test_http_connection_tracking_without_pool_internals():
+    """Test du suivi des connexions par le transport instrumenté, sans les attributs privés de httpcore"""
+    import asyncio
+
+    import httpx
+    from main import _pool_usage
+    from metrics import InstrumentedTransport
+
+    class Stream:
+        pass
+
+    streams = [Stream(), Stream()]
+
+    def handler(request):
+        # Deux requêtes sur la première connexion, une sur la seconde
+        stream = streams[0] if request.url.path != "/b" else streams[1]
+        return httpx.Response(200, extensions={"network_stream": stream})
+
+    transport = InstrumentedTransport(httpx.MockTransport(handler), lambda path: path)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=transport) as http:
+            for path in ("/a", "/a", "/b"):
+                await http.get(f"http://ergast.test{path}")
+
+    asyncio.run(scenario())
+    assert (transport.connections_opened, transport.connections_reused) == (2, 1)
+    assert transport.open_connections == 2
+    # MockTransport n'a pas de _pool : pas d'exception, pas de chiffres
+    assert _pool_usage(transport.wrapped) == {}
+
+
+def test_shared_http_client_lifespan():
+    """Test que le client HTTP est partagé et fermé avec l'application"""
+    import main
+
+    with TestClient(app):
+        shared = main.get_http_client()
+        assert shared is main.get_http_client()
+        assert not shared.is_closed
+    assert shared.is_closed
+
+
+def test_season_driver_stats():
+    """Test des totaux de saison par pilote (mode mock)"""
+    response = client.get("/drivers/stats/2025")
+    assert response.status_code == 200
+    data = response.json()
+    assert data[0]["points"] >= data[-1]["points"]
+    for row in data:
+        assert row["races"] >= row["podiums"] >= row["wins"]
+    assert client.get("/drivers/stats/1900").status_code == 404
+
+
+def test_cache_warmer_plan():
+    """Test de l'endpoint du plan de préchauffage (désactivé en mode mock)"""
+    response = client.get("/cache/warmer")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["enabled"] is False
+    assert data["running"] is False
+    assert isinstance(data["plan"], list)
+
+
+def test_etag_and_not_modified():
+    """Test de l'ETag et de la réponse 304 sur If-None-Match"""
+    response = client.get("/standings/drivers")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"')
+
+    cached = client.get("/standings/drivers", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    weak = client.get("/standings/drivers", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert weak.status_code == 304
+
+    changed = client.get("/standings/drivers", headers={"If-None-Match": '"stale"'})
+    assert changed.status_code == 200
+    assert changed.json() == response.json()
+
+
+def test_mock_history(monkeypatch):
+    """Test de l'historique synthétique en mode mock"""
+    import main
+    monkeypatch.setattr(main, "MOCK_HISTORY_SEASONS", 3)
+    monkeypatch.setattr(main, "MOCK_HISTORY_ROUNDS", 4)
+    monkeypatch.setattr(main, "mock_history", None)
+    monkeypatch.setattr(main, "_mock_history_engine", None)
+
+    response = client.get("/race/2023/4")
+    assert response.status_code == 200
+    assert len(response.json()["Results"]) == 20
+    assert client.get("/race/2023/5").status_code == 404
+
+    response = client.get("/drivers/stats/2022")
+    assert response.status_code == 200
+    assert sum(row["wins"] for row in response.json()) == 4
+    assert client.get("/drivers/stats/2021").status_code == 404
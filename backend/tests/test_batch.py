@@ -0,0 +1,53 @@
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from ergast_stub import ErgastStub
+from fastapi.testclient import TestClient
+from main import CustomCache, app
+from mock_data import get_driver_standings
+
+client = TestClient(app)
+
+
+def test_batch_items_keep_order_and_status():
+    paths = ["/standings/drivers", "/race/2025/99", "/nope", "bad", "/health", "/standings/drivers"]
+    response = client.post("/batch", json={"paths": paths})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["path"] for r in results] == paths
+    assert [r["status"] for r in results] == [200, 404, 404, 400, 200, 200]
+    assert results[0]["body"] == get_driver_standings()
+    assert results[1]["body"]["detail"].startswith("Résultats non disponibles")
+    assert results[4]["body"]["status"] == "healthy"
+
+
+def test_batch_limits():
+    assert client.post("/batch", json={"paths": ["/health"] * (main.BATCH_MAX_ITEMS + 1)}).status_code == 400
+    assert client.post("/batch", json={"paths": "/health"}).status_code == 422
+    assert client.post("/batch", json={"paths": []}).json() == {"results": []}
+    # Pas de batch imbriqué : /batch n'accepte pas GET
+    assert client.post("/batch", json={"paths": ["/batch"]}).json()["results"][0]["status"] == 405
+
+
+def test_batch_uses_the_cache(monkeypatch):
+    stub = ErgastStub()
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "ERGAST_BASE_URL", "http://ergast.test/api/f1")
+    monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+    monkeypatch.setattr(main, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(stub.handler)))
+
+    paths = ["/standings/drivers", "/standings/constructors", "/schedule/current", "/race/last", "/health"]
+    first = client.post("/batch", json={"paths": paths}).json()["results"]
+    assert all(r["status"] == 200 for r in first)
+    assert stub.calls == 4
+    second = client.post("/batch", json={"paths": paths}).json()["results"]
+    assert stub.calls == 4
+    assert [r["body"] for r in second[:4]] == [r["body"] for r in first[:4]]
+    assert second[0]["body"] == client.get("/standings/drivers").json()
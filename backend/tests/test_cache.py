@@ -0,0 +1,361 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from cache_backends import NEGATIVE
+from cache_eviction import approx_size
+from main import CustomCache, get_cached_data
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Cache en mémoire isolé, branché à la place du cache global"""
+    fresh = CustomCache(persist=False)
+    monkeypatch.setattr(main, "custom_cache", fresh)
+    return fresh
+
+
+def test_concurrent_misses_share_one_fetch(cache):
+    """Test que les requêtes concurrentes sur une clé expirée ne font qu'un fetch"""
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def scenario():
+        return await asyncio.gather(*(get_cached_data("standings:drivers", fetch) for _ in range(50)))
+
+    results = asyncio.run(scenario())
+    assert calls == 1
+    assert all(r == {"value": 42} for r in results)
+    stats = cache.get_stats()
+    assert stats["coalesced"] == 49
+    assert stats["inflight"] == 0
+
+
+def test_concurrent_misses_share_errors(cache):
+    """Test que l'erreur du fetch est propagée à toutes les requêtes en attente"""
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("ergast down")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(get_cached_data("race:last", fetch) for _ in range(10)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get_stats()["inflight"] == 0
+
+    # La clé n'est pas bloquée après une erreur
+    async def ok():
+        return [1]
+
+    assert asyncio.run(get_cached_data("race:last", ok)) == [1]
+
+
+def test_cancelled_leader_does_not_cancel_followers(cache):
+    """Test qu'une requête en attente survit à l'annulation du leader du fetch"""
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": calls}
+
+    async def scenario():
+        leader = asyncio.create_task(get_cached_data("standings:drivers", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(get_cached_data("standings:drivers", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await follower
+        assert leader.cancelled()
+        assert not follower.cancelled()
+        return result
+
+    assert asyncio.run(scenario()) == {"value": 2}
+    assert calls == 2
+    assert cache.get_stats()["inflight"] == 0
+
+
+def test_stale_entry_served_while_refreshing(cache):
+    """Test du stale-while-revalidate : valeur périmée servie, un seul refresh"""
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"version": calls}
+
+    async def scenario():
+        await cache.set("drivers:all:stats", {"version": 0}, ttl=0, stale_ttl=60)
+        served = await asyncio.gather(
+            *(get_cached_data("drivers:all:stats", fetch, ttl=60, stale_ttl=60) for _ in range(5))
+        )
+        # Laisser le refresh en arrière-plan se terminer
+        await asyncio.sleep(0.05)
+        return served, await cache.get("drivers:all:stats")
+
+    served, refreshed = asyncio.run(scenario())
+    assert all(v == {"version": 0} for v in served)
+    assert refreshed == {"version": 1}
+    assert calls == 1
+    stats = cache.get_stats()
+    assert stats["stale_hits"] == 5
+    assert stats["background_refreshes"] == 1
+
+
+def test_stale_entry_not_served_without_opt_in(cache):
+    """Test qu'une entrée périmée n'est pas servie sans stale_ttl"""
+    async def fetch():
+        return "fresh"
+
+    async def scenario():
+        await cache.set("standings:drivers", "stale", ttl=0, stale_ttl=60)
+        return await get_cached_data("standings:drivers", fetch, ttl=60)
+
+    assert asyncio.run(scenario()) == "fresh"
+    assert cache.get_stats()["stale_hits"] == 0
+
+
+def test_persistence_log_roundtrip(tmp_path):
+    """Test que les écritures bufferisées sont rechargées après redémarrage"""
+    async def scenario():
+        first = CustomCache(cache_dir=str(tmp_path), persist=True)
+        await first.set("standings:drivers", [{"position": "1"}], ttl=60)
+        await first.set("race:last", {"round": "24"}, ttl=60)
+        await first.set("race:last", {"round": "23"}, ttl=60)
+        await first.close()
+
+    asyncio.run(scenario())
+    reloaded = CustomCache(cache_dir=str(tmp_path), persist=True)
+    assert asyncio.run(reloaded.get("standings:drivers")) == [{"position": "1"}]
+    assert asyncio.run(reloaded.get("race:last")) == {"round": "23"}
+
+
+def test_persistent_cache_is_not_pinned_by_atexit(tmp_path):
+    """Test que le flush de sortie ne garde pas les instances en vie"""
+    import gc
+    import weakref
+
+    first = CustomCache(cache_dir=str(tmp_path), persist=True)
+    ref = weakref.ref(first)
+    del first
+    gc.collect()
+    assert ref() is None
+
+    second = CustomCache(cache_dir=str(tmp_path), persist=True)
+    asyncio.run(second.close())
+    assert second._atexit_hook is None
+
+
+def test_persistence_log_drops_torn_record(tmp_path):
+    """Test qu'un enregistrement tronqué (crash pendant un append) est ignoré"""
+    async def scenario():
+        cache = CustomCache(cache_dir=str(tmp_path), persist=True)
+        await cache.set("schedule:current", ["bahrain"], ttl=60)
+        await cache.close()
+
+    asyncio.run(scenario())
+    with open(tmp_path / "cache_log.bin", "ab") as f:
+        f.write(b"\x00\x00\x01\x00garbage")
+
+    reloaded = CustomCache(cache_dir=str(tmp_path), persist=True)
+    assert asyncio.run(reloaded.get("schedule:current")) == ["bahrain"]
+
+
+def test_persistence_log_keeps_records_when_write_fails(tmp_path, monkeypatch):
+    """Test qu'un flush en échec (disque plein) ne perd pas les écritures en attente"""
+    import cache_persistence
+    from cache_persistence import CacheLog
+
+    log = CacheLog(tmp_path)
+    log.load()
+    log.record_set("race:2024:1", {"round": "1"})
+    log.flush()
+    log.record_delete("race:2024:1")
+    log.record_set("race:2024:2", {"round": "2"})
+    log.record_set("race:2024:3", lambda: None)  # impossible à pickler
+    size = (tmp_path / "cache_log.bin").stat().st_size
+
+    def disk_full(fd):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(cache_persistence.os, "fsync", disk_full)
+    with pytest.raises(OSError):
+        log.flush()
+    assert (tmp_path / "cache_log.bin").stat().st_size == size
+    assert log.pending == 3
+    # Écrite pendant l'échec : la plus récente gagne
+    log.record_set("race:2024:2", {"round": "2b"})
+
+    monkeypatch.undo()
+    assert log.flush() == 2
+    assert CacheLog(tmp_path).load() == {"race:2024:2": {"round": "2b"}}
+
+
+def test_persistence_log_compaction(tmp_path, monkeypatch):
+    """Test que la compaction remplace le log par un snapshot cohérent"""
+    from cache_persistence import CacheLog
+
+    async def scenario():
+        cache = CustomCache(cache_dir=str(tmp_path), persist=True)
+        cache._log = CacheLog(tmp_path, min_compact_records=10)
+        cache._log.load()
+        for i in range(30):
+            await cache.set(f"race:2024:{i % 5}", {"i": i}, ttl=60)
+            await cache.flush()
+        await cache.close()
+        return cache._log.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["compactions"] >= 1
+    assert stats["log_records"] < 10
+    reloaded = CustomCache(cache_dir=str(tmp_path), persist=True)
+    assert asyncio.run(reloaded.get("race:2024:4")) == {"i": 29}
+    assert reloaded.get_stats()["entries"] == 5
+
+
+def test_lru_eviction_on_max_entries():
+    """Test de l'éviction LRU quand le nombre d'entrées dépasse la limite"""
+    cache = CustomCache(persist=False, max_entries=3, eviction_policy="lru")
+
+    async def scenario():
+        for i in range(3):
+            await cache.set(f"race:2024:{i}", i, ttl=60)
+        await cache.get("race:2024:0")  # 0 devient le plus récent
+        await cache.set("race:2024:3", 3, ttl=60)
+        return [await cache.get(f"race:2024:{i}") for i in range(4)]
+
+    assert asyncio.run(scenario()) == [0, None, 2, 3]
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 3
+
+
+def test_lfu_eviction_keeps_popular_keys():
+    """Test de l'éviction LFU : les clés les plus lues sont conservées"""
+    cache = CustomCache(persist=False, max_entries=2, eviction_policy="lfu")
+
+    async def scenario():
+        await cache.set("standings:drivers", "hot", ttl=60)
+        await cache.set("driver:crawler1:stats", "cold", ttl=60)
+        for _ in range(5):
+            await cache.get("standings:drivers")
+        await cache.set("driver:crawler2:stats", "cold", ttl=60)
+        return await cache.get("standings:drivers"), await cache.get("driver:crawler1:stats")
+
+    assert asyncio.run(scenario()) == ("hot", None)
+
+
+def test_unknown_eviction_policy_falls_back_to_lru(caplog):
+    """Test qu'une politique inconnue est signalée puis remplacée par LRU, comme CACHE_BACKEND"""
+    cache = CustomCache(persist=False, eviction_policy="fifo")
+    assert cache.get_stats()["eviction_policy"] == "lru"
+    assert "Unknown cache eviction policy 'fifo'" in caplog.text
+
+
+def test_byte_budget_eviction():
+    """Test que le budget en octets est respecté et comptabilisé"""
+    payload = [{"position": str(i), "Driver": {"driverId": f"d{i}"}} for i in range(20)]
+    cache = CustomCache(persist=False, max_bytes=3 * approx_size(payload) + 100)
+
+    async def scenario():
+        for i in range(10):
+            await cache.set(f"race:2024:{i}", payload, ttl=60)
+
+    asyncio.run(scenario())
+    stats = cache.get_stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 7
+    assert 0 < stats["bytes"] <= stats["max_bytes"]
+
+
+def test_sweep_expired_entries():
+    """Test du balayage des entrées expirées jamais relues"""
+    cache = CustomCache(persist=False)
+
+    async def scenario():
+        await cache.set("driver:bot1:stats", {}, ttl=0)
+        await cache.set("driver:bot2:stats", {}, ttl=0, stale_ttl=60)
+        await cache.set("standings:drivers", [], ttl=60)
+        return await cache.sweep_expired()
+
+    assert asyncio.run(scenario()) == 1
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["expired_swept"] == 1
+
+
+def test_cached_payload_is_encoded_once(cache):
+    """Test que le cache stocke les octets JSON encodés avec leur ETag"""
+    from main import get_cached_payload
+    from payloads import EncodedPayload
+
+    async def fetch():
+        return [{"position": "1", "points": "25"}]
+
+    async def scenario():
+        first = await get_cached_payload("standings:drivers", fetch)
+        second = await get_cached_payload("standings:drivers", fetch)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, EncodedPayload)
+    assert second is first
+    assert first.decode() == [{"position": "1", "points": "25"}]
+    assert first.body == b'[{"position":"1","points":"25"}]'
+
+
+def test_missing_data_is_cached_as_negative(cache):
+    """Test qu'une clé sans données en amont n'est demandée qu'une fois, et reste un None"""
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return None
+
+    async def scenario():
+        first = await get_cached_data("race:2019:99", fetch)
+        again = [await get_cached_data("race:2019:99", fetch) for _ in range(3)]
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert first is None and again == [None, None, None]
+    assert calls == 1
+    stats = cache.get_stats()
+    assert stats["negative_hits"] == 3
+    assert main.ttl_policy.last_decision("race:2019:99").reason.startswith("no data")
+
+
+def test_negative_entry_survives_persistence(tmp_path):
+    """Test que l'entrée négative est rechargée comme telle après redémarrage"""
+    async def scenario():
+        first = CustomCache(cache_dir=str(tmp_path), persist=True)
+        await first.set("race:2019:99", NEGATIVE, ttl=60)
+        await first.close()
+
+    asyncio.run(scenario())
+    reloaded = CustomCache(cache_dir=str(tmp_path), persist=True)
+    assert asyncio.run(reloaded.lookup("race:2019:99")) == (NEGATIVE, False)
@@ -0,0 +1,103 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_warmer import CacheWarmer, WarmJob
+from season_calendar import SeasonCalendar, race_start, results_available
+
+SCHEDULE = [
+    {"round": "1", "raceName": "Bahrain Grand Prix", "date": "2025-03-02", "time": "15:00:00Z",
+     "FirstPractice": {"date": "2025-02-28", "time": "11:30:00Z"}},
+    {"round": "2", "raceName": "Saudi Arabian Grand Prix", "date": "2025-03-09", "time": "17:00:00Z"},
+    {"round": "3", "raceName": "Australian Grand Prix", "date": "2025-03-23"},
+]
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def _warmer(calendar=SeasonCalendar(SCHEDULE)):
+    async def nothing(*_):
+        return None
+    warmer = CacheWarmer(nothing, nothing, nothing, lead=0.8, race_interval=600)
+    warmer._calendar = calendar
+    return warmer
+
+
+def test_calendar_next_and_last_race():
+    """Test du calendrier : course en cours, suivante et dernière terminée"""
+    calendar = SeasonCalendar(list(reversed(SCHEDULE)))
+    assert race_start(SCHEDULE[2]) == _utc(2025, 3, 23, 13)
+    assert calendar.next_race(_utc(2025, 3, 1))["round"] == "1"
+    # Pendant la course et jusqu'à la publication des résultats
+    assert calendar.next_race(_utc(2025, 3, 2, 16))["round"] == "1"
+    assert calendar.last_race(_utc(2025, 3, 2, 16)) is None
+    assert calendar.last_race(_utc(2025, 3, 5))["round"] == "1"
+    assert calendar.next_race(_utc(2025, 4, 1)) is None
+
+
+def test_calendar_race_weekend_window():
+    """Test de la fenêtre du week-end : des essais libres à quelques heures après la course"""
+    calendar = SeasonCalendar(SCHEDULE)
+    assert calendar.current_weekend(_utc(2025, 2, 28, 10)) is None
+    assert calendar.current_weekend(_utc(2025, 2, 28, 12))["round"] == "1"
+    assert calendar.current_weekend(_utc(2025, 3, 2, 20))["round"] == "1"
+    assert calendar.current_weekend(_utc(2025, 3, 5)) is None
+    # Sans FirstPractice : le vendredi précédant la course
+    assert calendar.current_weekend(_utc(2025, 3, 7, 12))["round"] == "2"
+
+
+def test_plan_refreshes_before_expiry_between_weekends():
+    """Test qu'entre deux week-ends une clé est rafraîchie à 80 % de son TTL"""
+    warmer = _warmer()
+    now = _utc(2025, 3, 4, 12)
+    job = WarmJob("schedule:current", ttl=86400, last_run=now)
+    assert warmer.next_run(job, now) == (now + timedelta(seconds=69120), "before expiry")
+    assert warmer.next_run(WarmJob("race:last", ttl=1800), now) == (now, "initial warm-up")
+
+
+def test_plan_is_aggressive_during_race_weekend():
+    """Test que les clés liées aux courses sont rafraîchies souvent pendant un week-end"""
+    warmer = _warmer()
+    now = _utc(2025, 3, 2, 14)
+    job = WarmJob("standings:drivers", ttl=3600, race_sensitive=True, last_run=now)
+    when, reason = warmer.next_run(job, now)
+    assert when == now + timedelta(minutes=10)
+    assert reason == "race weekend: Bahrain Grand Prix"
+    # Une clé indépendante des courses garde son rythme
+    job = WarmJob("drivers:current", ttl=86400, last_run=now)
+    assert warmer.next_run(job, now)[1] == "before expiry"
+
+
+def test_plan_fetches_results_as_soon_as_published():
+    """Test qu'une clé longue est rafraîchie dès la publication des résultats de la course suivante"""
+    warmer = _warmer()
+    now = _utc(2025, 3, 4, 12)
+    job = WarmJob("driver:hamilton:stats", ttl=86400 * 7, race_sensitive=True, last_run=now)
+    assert warmer.next_run(job, now) == (results_available(SCHEDULE[1]), "results of Saudi Arabian Grand Prix")
+
+
+def test_plan_without_calendar_and_after_error():
+    """Test du plan sans calendrier connu et après un échec"""
+    warmer = _warmer(calendar=None)
+    now = _utc(2025, 3, 2, 14)
+    job = WarmJob("standings:drivers", ttl=3600, race_sensitive=True, last_run=now)
+    assert warmer.next_run(job, now) == (now + timedelta(seconds=2880), "before expiry")
+    job.last_error = "502"
+    assert warmer.next_run(job, now) == (now + timedelta(seconds=300), "retry after error")
+
+
+def test_driver_stats_wait_for_results_during_race_weekend():
+    """Test que les stats pilotes ne tournent pas toutes les 10 minutes pendant un week-end"""
+    warmer = _warmer()
+    now = _utc(2025, 3, 2, 14)
+    job = WarmJob("driver:hamilton:stats", ttl=86400, race_sensitive=True, weekend_poll=False, last_run=now)
+    assert warmer.next_run(job, now) == (results_available(SCHEDULE[0]), "results of Bahrain Grand Prix")
+
+    # Résultats attendus mais pas encore publiés : TTL court de la politique (poll)
+    after = results_available(SCHEDULE[0]) + timedelta(minutes=1)
+    job = WarmJob("driver:hamilton:stats", ttl=300, race_sensitive=True, weekend_poll=False, last_run=after)
+    assert warmer.next_run(job, after) == (after + timedelta(seconds=240), "before expiry")
@@ -0,0 +1,84 @@
+import asyncio
+import gzip
+import os
+import pickle
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+import payloads
+from ergast_stub import ErgastStub
+from fastapi.testclient import TestClient
+from main import CustomCache, app
+from metrics import RESPONSE_BYTES
+from payloads import EncodedPayload, compress_payload, encode_payload, negotiate
+
+
+def test_negotiate_accept_encoding():
+    available = ["br", "gzip"]
+    assert negotiate("gzip, deflate, br", available) == ("br" if payloads.brotli else "gzip")
+    assert negotiate("gzip;q=1.0, br;q=0.5", available) == "gzip"
+    assert negotiate("br;q=0, gzip;q=0", available) is None
+    assert negotiate("*", ["gzip"]) == "gzip"
+    assert negotiate("identity", available) is None
+    assert negotiate("", available) is None
+
+
+def test_compressed_variants_roundtrip():
+    payload = compress_payload(encode_payload([{"driverId": f"driver_{i}", "points": "0"} for i in range(100)]))
+    assert gzip.decompress(payload.variant("gzip")) == payload.body
+    if payloads.brotli is not None:
+        assert payloads.brotli.decompress(payload.variant("br")) == payload.body
+    # Trop petit pour valoir le coup
+    assert compress_payload(encode_payload({"a": 1})).variants == ()
+    # Entrée persistée avant les variantes (3 champs)
+    old = EncodedPayload.__new__(EncodedPayload)
+    old.__setstate__([b"{}", '"x"', ()])
+    assert old.variants == () and pickle.loads(pickle.dumps(payload)) == payload
+
+
+@pytest.fixture
+def live_client(monkeypatch):
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "ERGAST_BASE_URL", "http://ergast.test/api/f1")
+    monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+    monkeypatch.setattr(main, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(ErgastStub().handler)))
+    return TestClient(app)
+
+
+def test_hits_are_served_precompressed(live_client, monkeypatch):
+    raw = live_client.get("/standings/drivers", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    assert raw.headers["vary"] == "Accept-Encoding"
+
+    # Un hit ne recompresse pas
+    calls = []
+    monkeypatch.setattr(payloads.gzip, "compress", lambda *a, **k: calls.append(a))
+    sent = RESPONSE_BYTES.value("gzip")
+    response = live_client.get("/standings/drivers", headers={"Accept-Encoding": "gzip"})
+    assert calls == []
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == raw.json()
+    assert int(response.headers["x-uncompressed-length"]) == len(raw.content)
+    assert float(response.headers["x-compression-ratio"]) < 0.5
+    assert int(response.headers["content-length"]) < len(raw.content)
+    assert RESPONSE_BYTES.value("gzip") == sent + int(response.headers["content-length"])
+
+    # ETag par variante ; revalider avec l'une ou l'autre donne 304
+    assert response.headers["etag"] == raw.headers["etag"][:-1] + '-gzip"'
+    for etag in (raw.headers["etag"], response.headers["etag"]):
+        again = live_client.get("/standings/drivers", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert again.status_code == 304
+
+
+def test_compression_can_be_disabled():
+    cache = CustomCache(persist=False, compress=False)
+    payload = encode_payload(["x" * 2000])
+    asyncio.run(cache.set("standings:drivers", payload, ttl=60))
+    assert asyncio.run(cache.get("standings:drivers")).variants == ()
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from ergast import iter_pages
+from ergast_stub import ErgastStub, MockDataSource, StubConfig
+from fastapi.testclient import TestClient
+from main import CustomCache, app
+from mock_data import SyntheticHistory, get_driver_standings
+
+BASE = "http://ergast.test/api/f1"
+
+
+def _client(stub):
+    return httpx.AsyncClient(transport=httpx.MockTransport(stub.handler))
+
+
+def test_season_listing_pages_follow_ergast():
+    history = SyntheticHistory(seasons=2, rounds=3)
+    stub = ErgastStub(history, StubConfig(max_limit=25))
+
+    async def scenario():
+        async with _client(stub) as client:
+            pages = [page async for page in iter_pages(client, f"{BASE}/2024/results.json", page_size=100)]
+        return pages
+
+    pages = asyncio.run(scenario())
+    # limit plafonné à 25 lignes : 60 lignes en 3 pages, une course coupée entre deux pages
+    assert [sum(len(r["Results"]) for r in page) for page in pages] == [25, 25, 10]
+    rows = [row for page in pages for race in page for row in race["Results"]]
+    assert rows == [row for race in history.races(seasons=[2024]) for row in race["Results"]]
+
+
+def test_rate_limit_returns_429():
+    now = [0.0]
+    stub = ErgastStub(MockDataSource(), StubConfig(rate_limit=2, burst=2), clock=lambda: now[0])
+
+    async def scenario():
+        async with _client(stub) as client:
+            codes = [(await client.get(f"{BASE}/current/drivers.json")).status_code for _ in range(3)]
+            throttled = await client.get(f"{BASE}/current/drivers.json")
+            now[0] += 0.5
+            codes.append((await client.get(f"{BASE}/current/drivers.json")).status_code)
+        return codes, throttled
+
+    codes, throttled = asyncio.run(scenario())
+    assert codes == [200, 200, 429, 200]
+    assert throttled.headers["retry-after"] == "1"
+    assert stub.get_stats()["throttled"] == 2
+
+
+def test_errors_and_latency_per_route():
+    stub = ErgastStub(MockDataSource(), StubConfig(error_rate=0.5, route_latency={"drivers": 0.05}, seed=3))
+
+    async def scenario():
+        async with _client(stub) as client:
+            codes = [(await client.get(f"{BASE}/current.json")).status_code for _ in range(40)]
+            start = asyncio.get_running_loop().time()
+            await client.get(f"{BASE}/current/drivers.json")
+            return codes, asyncio.get_running_loop().time() - start
+
+    codes, elapsed = asyncio.run(scenario())
+    assert set(codes) == {200, 503}
+    assert 5 < codes.count(503) < 35
+    assert elapsed >= 0.05
+
+
+def test_live_mode_against_stub(monkeypatch):
+    stub = ErgastStub(MockDataSource())
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "ERGAST_BASE_URL", BASE)
+    monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+    monkeypatch.setattr(main, "_http_client", _client(stub))
+    client = TestClient(app)
+
+    assert client.get("/standings/drivers").json() == get_driver_standings()
+    assert client.get("/race/2025/3").json()["raceName"] == "Japanese Grand Prix"
+    assert client.get("/race/last").json()["round"] == "24"
+    assert client.get("/driver/norris/stats").json()["total_wins"] == 5
+    assert stub.get_stats()["by_route"]["career"] == 1
+
+
+def test_season_results_fill_round_keys(monkeypatch):
+    history = SyntheticHistory(seasons=2, rounds=6)
+    stub = ErgastStub(history, StubConfig(max_limit=25))
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "ERGAST_BASE_URL", BASE)
+    monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+    monkeypatch.setattr(main, "_http_client", _client(stub))
+    client = TestClient(app)
+
+    # 120 lignes par pages de 25 : 5 appels, les courses coupées entre deux pages sont recollées
+    assert client.get("/race/2024/results").json() == list(history.races(seasons=[2024]))
+    assert stub.calls == 5
+    podiums = client.get("/race/2024/results?podium=true").json()
+    assert [len(r["Results"]) for r in podiums] == [3] * 6
+    for round_num in range(1, 7):
+        assert client.get(f"/race/2024/{round_num}").json() == history.race_result(2024, round_num)
+    assert stub.calls == 5
+
+
+def test_missing_round_is_not_refetched(monkeypatch):
+    stub = ErgastStub()
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "ERGAST_BASE_URL", BASE)
+    monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+    monkeypatch.setattr(main, "_http_client", _client(stub))
+    client = TestClient(app)
+
+    assert [client.get("/race/2025/99").status_code for _ in range(3)] == [404, 404, 404]
+    assert stub.calls == 1
+    assert client.get("/cache/stats").json()["cache"]["negative_hits"] == 2
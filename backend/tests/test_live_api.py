@@ -0,0 +1,219 @@
+import asyncio
+import os
+import re
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from cache_warmer import CacheWarmer
+from fastapi.testclient import TestClient
+from main import CustomCache, app
+
+
+def _race(season, round_num, driver_id, position):
+    return {
+        "season": str(season),
+        "round": str(round_num),
+        "raceName": f"Grand Prix {round_num}",
+        "date": f"{season}-03-{round_num:02d}",
+        "Results": [{"position": str(position), "status": "Finished", "Driver": {"driverId": driver_id}}],
+    }
+
+
+class FakeErgast:
+    """Faux Ergast servi via httpx.MockTransport (latence injectable)"""
+
+    def __init__(self, careers, latency=0.0, slow_drivers=()):
+        # careers : driver_id -> liste de positions (une par course, ordre chronologique)
+        self.careers = careers
+        self.latency = latency
+        self.slow_drivers = set(slow_drivers)
+        self.schedule = []
+        self.calls = []
+        self.offsets = []
+
+    def _races(self, driver_id, position_filter=None):
+        races = [
+            _race(2000 + i // 20, i % 20 + 1, driver_id, pos)
+            for i, pos in enumerate(self.careers[driver_id])
+        ]
+        if position_filter is not None:
+            races = [r for r in races if r["Results"][0]["position"] == position_filter]
+        return races
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.replace("/api/f1", "")
+        self.calls.append(path)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        limit = int(request.url.params.get("limit", 30))
+        offset = int(request.url.params.get("offset", 0))
+        self.offsets.append((path, offset))
+
+        if path == "/current/drivers.json":
+            drivers = [{"driverId": d, "givenName": d.title(), "familyName": "Test"} for d in self.careers]
+            return httpx.Response(200, json={"MRData": {"DriverTable": {"Drivers": drivers}}})
+
+        if path == "/current.json":
+            return httpx.Response(200, json={"MRData": {"RaceTable": {"Races": self.schedule}}})
+
+        m = re.fullmatch(r"/drivers/(\w+)/(results|qualifying)(/1)?\.json", path)
+        if m:
+            driver_id = m.group(1)
+            if driver_id in self.slow_drivers:
+                await asyncio.sleep(5)
+            races = self._races(driver_id, "1" if m.group(3) else None)
+            page = races[offset:offset + limit]
+            return httpx.Response(200, json={"MRData": {
+                "limit": str(limit), "offset": str(offset), "total": str(len(races)),
+                "RaceTable": {"Races": page},
+            }})
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def live(monkeypatch):
+    """Mode live : cache mémoire isolé et client HTTP branché sur le faux Ergast"""
+    def setup(fake):
+        monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+        monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+        http = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+        monkeypatch.setattr(main, "_http_client", http)
+        return TestClient(app)
+    return setup
+
+
+def test_all_driver_stats_fan_out_is_concurrent(live, monkeypatch):
+    """Test que /drivers/stats interroge les pilotes en parallèle"""
+    monkeypatch.setattr(main, "DRIVER_STATS_CONCURRENCY", 10)
+    careers = {f"driver{i}": [1, 2, 3, 10] for i in range(10)}
+    fake = FakeErgast(careers, latency=0.05)
+    client = live(fake)
+
+    response = client.get("/drivers/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 10
+    assert data[0] == {
+        "driver_id": "driver0", "name": "Driver0 Test",
+        "total_wins": 1, "total_podiums": 3, "total_races": 4, "total_poles": 1,
+        "total_points": 0.0, "total_dnfs": 0, "avg_finish": 4.0,
+    }
+    timings = dict(
+        (item.split(";")[0], float(item.split("dur=")[1].split(";")[0]))
+        for item in response.headers["server-timing"].split(", ")
+    )
+    # 10 pilotes x 3 requêtes de 50 ms : bien plus rapide que 1,5 s en séquentiel
+    assert timings["fanout"] < timings["fanout-serial"]
+    assert timings["fanout"] < 800
+    assert "x-fanout-failed" not in response.headers
+
+    # Un hit ne rejoue pas les mesures du fetch d'origine
+    hit = client.get("/drivers/stats")
+    assert "fanout" not in hit.headers["server-timing"]
+
+
+def test_all_driver_stats_partial_failure(live, monkeypatch):
+    """Test qu'un pilote trop lent n'empêche pas la réponse des autres"""
+    monkeypatch.setattr(main, "DRIVER_STATS_TIMEOUT", 0.3)
+    fake = FakeErgast({"fast": [1], "slow": [2], "other": [3]}, slow_drivers={"slow"})
+    client = live(fake)
+
+    response = client.get("/drivers/stats")
+    assert response.status_code == 200
+    assert [d["driver_id"] for d in response.json()] == ["fast", "other"]
+    assert response.headers["x-fanout-failed"] == "slow"
+
+
+def test_driver_stats_follows_pagination(live):
+    """Test que la carrière complète est lue page par page, au-delà de 1000 courses"""
+    positions = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10] * 123 + [1, 2, 3, 20]
+    fake = FakeErgast({"alonso": positions})
+    client = live(fake)
+
+    response = client.get("/driver/alonso/stats")
+    assert response.status_code == 200
+    assert response.json() == {
+        "driver_id": "alonso", "total_wins": 124, "total_podiums": 372, "total_races": 1234,
+    }
+    pages = [c for c in fake.calls if c == "/drivers/alonso/results.json"]
+    assert len(pages) == 13
+
+
+def test_driver_stats_refresh_only_fetches_new_races(live):
+    """Test de la mise à jour incrémentale : seules les nouvelles courses sont relues"""
+    fake = FakeErgast({"hamilton": [1, 2, 3] * 100})
+    client = live(fake)
+
+    first = client.get("/driver/hamilton/stats").json()
+    assert first["total_races"] == 300
+
+    # Une nouvelle course, puis expiration de l'entrée de stats
+    fake.careers["hamilton"].append(1)
+    asyncio.run(main.custom_cache.delete("driver:hamilton:stats"))
+    fake.offsets.clear()
+    before = main.custom_cache.get_stats()
+
+    second = client.get("/driver/hamilton/stats").json()
+    assert second == {"driver_id": "hamilton", "total_wins": 101, "total_podiums": 301, "total_races": 301}
+    # Une seule page, à partir de la dernière course déjà couverte
+    assert fake.offsets == [("/drivers/hamilton/results.json", 299)]
+    # Le point de reprise est lu sans compter de hit : seul le miss des stats est compté
+    after = main.custom_cache.get_stats()
+    assert (after["hits"], after["misses"]) == (before["hits"], before["misses"] + 1)
+
+
+def test_driver_stats_rebuilds_when_history_changes(live):
+    """Test qu'un historique modifié en amont provoque une reconstruction complète"""
+    fake = FakeErgast({"norris": [2] * 10})
+    client = live(fake)
+    assert client.get("/driver/norris/stats").json()["total_wins"] == 0
+
+    # Course supprimée en amont : la dernière course couverte ne correspond plus
+    fake.careers["norris"] = [1] * 9
+    asyncio.run(main.custom_cache.delete("driver:norris:stats"))
+    assert client.get("/driver/norris/stats").json()["total_wins"] == 9
+
+
+def test_driver_stats_rebuilds_when_last_result_is_corrected(live):
+    """Test qu'un résultat corrigé sur la dernière course couverte est pris en compte"""
+    fake = FakeErgast({"piastri": [2, 3, 1]})
+    client = live(fake)
+    assert client.get("/driver/piastri/stats").json()["total_wins"] == 1
+
+    # Déclassement après coup : même course, autre position
+    fake.careers["piastri"][-1] = 4
+    asyncio.run(main.custom_cache.delete("driver:piastri:stats"))
+    stats = client.get("/driver/piastri/stats").json()
+    assert (stats["total_wins"], stats["total_podiums"]) == (0, 2)
+
+
+def test_cache_warmer_fills_keys_before_first_visit(live):
+    """Test que le préchauffage remplit le calendrier, les pilotes et leurs stats"""
+    fake = FakeErgast({"leclerc": [1, 2], "sainz": [3]})
+    fake.schedule = [_race(2030, 1, "leclerc", 1)]
+    client = live(fake)
+    warmer = CacheWarmer(main.refresh_resource, main.discover_warm_jobs, main.load_season_calendar)
+
+    asyncio.run(warmer.run_once())
+    # Second passage : les stats des pilotes découverts via drivers:current
+    asyncio.run(warmer.run_once())
+
+    for key in ("schedule:current", "drivers:current", "driver:leclerc:stats", "driver:sainz:stats"):
+        assert asyncio.run(main.custom_cache.peek(key)) is not None, key
+    plan = {row["key"]: row for row in warmer.plan()}
+    assert plan["driver:leclerc:stats"]["refreshes"] == 1
+    # Pas de classement dans le faux Ergast : échec enregistré, nouvel essai planifié
+    assert plan["standings:drivers"]["reason"] == "retry after error"
+    assert warmer.get_stats()["next_race"]["date"] == "2030-03-01"
+
+    calls = len(fake.calls)
+    response = client.get("/driver/leclerc/stats")
+    assert response.json()["total_wins"] == 1
+    assert len(fake.calls) == calls
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from ergast import url_template
+from ergast_stub import ErgastStub
+from fastapi.testclient import TestClient
+from main import CustomCache, app
+from metrics import (
+    CACHE_LOOKUPS,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    UPSTREAM_ERRORS,
+    UPSTREAM_REQUESTS,
+    Counter,
+    Histogram,
+    InstrumentedTransport,
+    Registry,
+    key_prefix,
+)
+
+client = TestClient(app)
+
+
+def test_render_text_format():
+    registry = Registry()
+    hits = Counter("hits_total", "Hits.", ("prefix",), registry=registry)
+    latency = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0), registry=registry)
+    hits.inc("race:")
+    hits.inc("race:", amount=2)
+    for value in (0.05, 0.5, 3.0):
+        latency.observe(value, '/a"b')
+    text = registry.render()
+    assert '# TYPE hits_total counter\nhits_total{prefix="race:"} 3\n' in text
+    assert 'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a\\"b",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a\\"b"} 3' in text
+
+
+def test_request_metrics_use_route_templates():
+    before = HTTP_REQUESTS.value("/race/{season}/{round}", "GET", "200")
+    client.get("/race/2025/1")
+    client.get("/race/2025/2")
+    client.get("/race/2025/99")
+    assert HTTP_REQUESTS.value("/race/{season}/{round}", "GET", "200") == before + 2
+    assert HTTP_REQUESTS.value("/race/{season}/{round}", "GET", "404") >= 1
+    assert HTTP_LATENCY.count("/race/{season}/{round}", "GET") >= 3
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_bucket{route="/race/{season}/{round}",method="GET",le="0.005"}' in response.text
+    assert "http_requests_in_flight" in response.text
+
+
+def test_upstream_and_cache_metrics(monkeypatch):
+    stub = ErgastStub()
+    base = "http://ergast.test/api/f1"
+    transport = InstrumentedTransport(httpx.MockTransport(stub.handler), lambda p: url_template(p, "/api/f1"))
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "ERGAST_BASE_URL", base)
+    monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+    monkeypatch.setattr(main, "_http_client", httpx.AsyncClient(transport=transport))
+
+    template = "/{season}/{round}/results.json"
+    calls = UPSTREAM_REQUESTS.value(template, "200")
+    misses, hits = CACHE_LOOKUPS.value("race:", "miss"), CACHE_LOOKUPS.value("race:", "hit")
+    client.get("/race/2025/1")
+    client.get("/race/2025/1")
+    assert UPSTREAM_REQUESTS.value(template, "200") == calls + 1
+    assert CACHE_LOOKUPS.value("race:", "miss") == misses + 1
+    assert CACHE_LOOKUPS.value("race:", "hit") == hits + 1
+
+    errors = UPSTREAM_ERRORS.value("/{season}/{round}/nope.json", "404")
+    asyncio.run(main._http_client.get(f"{base}/2025/1/nope.json"))
+    assert UPSTREAM_ERRORS.value("/{season}/{round}/nope.json", "404") == errors + 1
+
+
+def test_key_prefix():
+    assert key_prefix("standings:drivers") == "standings:"
+    assert key_prefix("driver:verstappen:stats") == "driver:"
+    assert key_prefix("nokey") == "nokey"
@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_data import SyntheticHistory
+from results_store import ResultsStore
+from stats_engine import ResultsTable, StatsEngine
+
+
+def test_same_seed_same_history():
+    a, b = SyntheticHistory(seasons=3, rounds=4, seed=1), SyntheticHistory(seasons=3, rounds=4, seed=1)
+    assert list(a.races()) == list(b.races())
+    assert list(a.races()) != list(SyntheticHistory(seasons=3, rounds=4, seed=2).races())
+    # Une saison générée seule est identique à celle générée avec les autres
+    assert SyntheticHistory(seasons=3, rounds=4, seed=1).race_result(2024, 2) == a.race_result(2024, 2)
+
+
+def test_races_are_consistent():
+    history = SyntheticHistory(seasons=2, rounds=5, drivers=22)
+    qualifying = {(q["season"], q["round"]): q["QualifyingResults"] for q in history.races("qualifying")}
+    for race in history.races():
+        results = race["Results"]
+        assert len(results) == 22
+        assert [r["position"] for r in results] == [str(i) for i in range(1, 23)]
+        assert len({r["Driver"]["driverId"] for r in results}) == 22
+        grid = {q["Driver"]["driverId"]: q["position"] for q in qualifying[(race["season"], race["round"])]}
+        assert all(r["grid"] == grid[r["Driver"]["driverId"]] for r in results)
+        for r in results:
+            if r["positionText"] == "R":
+                assert r["points"] == "0" and "Time" not in r
+
+
+def test_standings_follow_results():
+    history = SyntheticHistory(seasons=1, rounds=6)
+    points = {}
+    for race in history.races():
+        for r in race["Results"]:
+            points[r["Driver"]["driverId"]] = points.get(r["Driver"]["driverId"], 0) + int(r["points"])
+    standings = history.driver_standings(2024)
+    assert {row["Driver"]["driverId"]: int(row["points"]) for row in standings} == points
+    assert [int(row["points"]) for row in standings] == sorted(points.values(), reverse=True)
+    constructors = history.constructor_standings(2024)
+    assert sum(int(row["points"]) for row in constructors) == sum(points.values())
+    assert history.driver_standings(2024, round_num=1)[0]["points"] == "25"
+
+
+def test_fill_store_matches_stats_engine():
+    history = SyntheticHistory(seasons=3, rounds=5)
+    store = ResultsStore(":memory:")
+    history.fill_store(store)
+    assert store.ingested_seasons() == history.seasons
+
+    engine = StatsEngine(ResultsTable.from_races(history.races()),
+                         ResultsTable.from_races(history.races("qualifying"), "QualifyingResults"))
+    careers = store.driver_careers(d["driverId"] for d in history.drivers)
+    for driver_id, stats in engine.career_stats().items():
+        assert careers[driver_id]["total_wins"] == stats["wins"]
+        assert careers[driver_id]["total_races"] == stats["races"]
+        assert careers[driver_id]["total_poles"] == stats["poles"]
+    assert store.race_result(2023, 2) == history.race_result(2023, 2)
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+import projection
+from fastapi.testclient import TestClient
+from main import app
+from payloads import compress_payload, encode_payload
+from projection import compile_projection, normalize_fields, project, project_payload
+
+client = TestClient(app)
+
+ROW = {
+    "position": "1", "points": "346", "wins": "7",
+    "Driver": {"driverId": "piastri", "code": "PIA", "dateOfBirth": "2001-04-06"},
+    "Constructors": [{"constructorId": "mclaren", "name": "McLaren"}, {"constructorId": "x", "name": "X"}],
+}
+
+
+def test_project_paths_and_lists():
+    fields = "position,points,Driver.code,Constructors.name"
+    assert project([ROW], fields) == [{
+        "position": "1", "points": "346",
+        "Driver": {"code": "PIA"},
+        "Constructors": [{"name": "McLaren"}, {"name": "X"}],
+    }]
+    # Champ inconnu ignoré, objet entier demandé avant un sous-champ
+    assert project(ROW, "nope,Driver,Driver.code") == {"Driver": ROW["Driver"]}
+    # Sous-champ d'un scalaire : rien
+    assert project(ROW, "points.value") == {}
+
+
+def test_normalize_and_compile_cache():
+    assert normalize_fields(" position, Driver.code ,position,") == "position,Driver.code"
+    for bad in ("", " , ", "Driver..code", "a-b", ",".join(f"f{i}" for i in range(100))):
+        with pytest.raises(ValueError):
+            normalize_fields(bad)
+    compile_projection.cache_clear()
+    project(ROW, "position,points")
+    project(ROW, "position, points")
+    assert compile_projection.cache_info().hits == 1
+
+
+def test_project_payload_is_memoized():
+    projection._projected.clear()
+    payload = compress_payload(encode_payload([ROW] * 50))
+    projected = project_payload(payload, "position,Driver.code")
+    assert projected.decode() == [{"position": "1", "Driver": {"code": "PIA"}}] * 50
+    assert projected.etag != payload.etag
+    assert projected.variants
+    assert project_payload(payload, "position, Driver.code") is projected
+
+
+def test_fields_query_on_routes(monkeypatch):
+    monkeypatch.setattr(main, "USE_MOCK_DATA", True)
+    full = client.get("/standings/drivers")
+    response = client.get("/standings/drivers", params={"fields": "position,points,Driver.code,Constructors.name"})
+    assert response.status_code == 200
+    rows = response.json()
+    assert set(rows[0]) == {"position", "points", "Driver", "Constructors"}
+    assert set(rows[0]["Driver"]) == {"code"}
+    assert len(rows) == len(full.json())
+    assert len(response.content) < len(full.content) / 2
+    assert response.headers["etag"] != full.headers["etag"]
+
+    race = client.get("/race/last", params={"fields": "raceName,Results.position,Results.Driver.code"}).json()
+    assert set(race) == {"raceName", "Results"}
+    assert set(race["Results"][0]) == {"position", "Driver"}
+
+    assert client.get("/standings/drivers", params={"fields": "Driver..code"}).status_code == 400
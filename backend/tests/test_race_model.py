@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_eviction import approx_size
+from mock_data import get_constructor_standings, get_driver_standings, get_last_race, get_race_results
+from race_model import CompactRace, CompactStandings, EntityPool
+
+DRIVER = {"driverId": "max_verstappen", "code": "VER", "givenName": "Max", "familyName": "Verstappen"}
+TEAM = {"constructorId": "red_bull", "name": "Red Bull"}
+
+
+def _race(round_num, rows):
+    return {
+        "season": "2024", "round": str(round_num), "raceName": f"GP {round_num}",
+        "Circuit": {"circuitId": "bahrain", "circuitName": "Bahrain International Circuit"},
+        "date": "2024-03-02", "Results": rows,
+    }
+
+
+def _row(**extra):
+    row = {"number": "1", "position": "1", "positionText": "1", "points": "25", "Driver": dict(DRIVER),
+           "Constructor": dict(TEAM), "grid": "1", "laps": "57", "status": "Finished",
+           "Time": {"millis": "5504742", "time": "1:31:44.742"}}
+    row.update(extra)
+    return row
+
+
+def test_mock_data_round_trips():
+    for race in get_race_results() + [get_last_race()]:
+        assert CompactRace(race, EntityPool()).expand() == race
+    for standings in (get_driver_standings(), get_constructor_standings()):
+        assert CompactStandings(standings, EntityPool()).expand() == standings
+
+
+def test_non_canonical_values_are_kept():
+    rows = [
+        _row(points="25.0", position="07", grid="", Time={"time": "+1 Lap"}, FastestLap={"rank": "1"}),
+        _row(positionText="R", position="20", points="0.5", status="Retired"),
+        {k: v for k, v in _row().items() if k not in ("Constructor", "Time", "number")},
+    ]
+    race = _race(1, rows)
+    assert CompactRace(race, EntityPool()).expand() == race
+
+
+def test_entities_are_pooled_across_races():
+    pool = EntityPool()
+    races = [CompactRace(_race(n, [_row()]), pool) for n in range(1, 6)]
+    assert len(pool) == 3  # circuit, pilote, écurie
+    first, last = races[0].expand(), races[-1].expand()
+    assert first["Results"][0]["Driver"] is last["Results"][0]["Driver"]
+
+
+def test_compact_race_is_smaller():
+    pool = EntityPool()
+    races = [_race(n, [_row(number=str(i), position=str(i), positionText=str(i)) for i in range(1, 21)])
+             for n in range(1, 25)]
+    compact = [CompactRace(race, pool) for race in races]
+    assert approx_size(compact) * 3 < approx_size(races)
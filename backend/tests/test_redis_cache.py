@@ -0,0 +1,283 @@
+import asyncio
+import fnmatch
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from cache_backends import NEGATIVE, RedisCache, decode_redis_value, encode_redis_value
+from main import get_cached_data
+
+
+class FakeRedis:
+    """Sous-ensemble en mémoire de redis.asyncio.Redis utilisé par RedisCache"""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = 0
+        self.pipelines = 0
+
+    def _alive(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    async def get(self, key):
+        self.commands += 1
+        return self._alive(key)
+
+    async def set(self, key, value, px=None):
+        self.commands += 1
+        self.data[key] = (value, time.monotonic() + px / 1000 if px else None)
+
+    async def delete(self, *keys):
+        self.commands += 1
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match="*", count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def aclose(self):
+        pass
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._queued = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, px=None):
+        self._queued.append(("set", key, value, px))
+
+    def delete(self, key):
+        self._queued.append(("delete", key))
+
+    async def execute(self):
+        self._redis.pipelines += 1
+        for op in self._queued:
+            if op[0] == "set":
+                self._redis.data[op[1]] = (op[2], time.monotonic() + op[3] / 1000 if op[3] else None)
+            else:
+                self._redis.data.pop(op[1], None)
+        self._queued = []
+
+
+def _real_redis():
+    """Client Redis réel si REDIS_HOST est défini et joignable (CI), sinon None"""
+    if not os.getenv("REDIS_HOST"):
+        return None
+    try:
+        import redis.asyncio as aioredis
+    except ImportError:
+        return None
+    client = aioredis.Redis(host=os.environ["REDIS_HOST"], port=int(os.getenv("REDIS_PORT", "6379")), db=15)
+
+    async def ping():
+        try:
+            return await client.ping()
+        except Exception:
+            return False
+
+    return client if asyncio.run(ping()) else None
+
+
+@pytest.fixture(params=["fake", "real"])
+def redis_cache(request):
+    if request.param == "fake":
+        return RedisCache(client=FakeRedis(), prefix="test:")
+    client = _real_redis()
+    if client is None:
+        pytest.skip("Redis non disponible")
+    cache = RedisCache(client=client, prefix="test:")
+    asyncio.run(cache.clear())
+    return cache
+
+
+def test_redis_value_roundtrip_and_compression():
+    """Test de la sérialisation compacte (JSON + zlib au-delà de 1 Ko)"""
+    small = {"position": "1"}
+    large = [{"position": str(i), "Driver": {"driverId": "verstappen"}} for i in range(200)]
+    for value in (small, large):
+        blob = encode_redis_value(value, 123.0)
+        assert decode_redis_value(blob) == (value, 123.0)
+    assert len(encode_redis_value(large, 0)) < len(repr(large)) / 5
+    assert decode_redis_value(encode_redis_value(NEGATIVE, 5.0)) == (NEGATIVE, 5.0)
+
+
+def test_redis_get_set_and_stale(redis_cache):
+    """Test du get/set, de la fenêtre stale et des statistiques"""
+    async def scenario():
+        await redis_cache.set("standings:drivers", [{"position": "1"}], ttl=60)
+        await redis_cache.set("drivers:all:stats", ["old"], ttl=0, stale_ttl=60)
+        fresh = await redis_cache.lookup("standings:drivers")
+        stale_refused = await redis_cache.lookup("drivers:all:stats")
+        stale = await redis_cache.lookup("drivers:all:stats", allow_stale=True)
+        missing = await redis_cache.get("race:2025:99")
+        await redis_cache.refresh_stats()
+        return fresh, stale_refused, stale, missing
+
+    fresh, stale_refused, stale, missing = asyncio.run(scenario())
+    assert fresh == ([{"position": "1"}], False)
+    assert stale_refused == (None, False)
+    assert stale == (["old"], True)
+    assert missing is None
+    stats = redis_cache.get_stats()
+    assert stats["backend"] == "redis"
+    assert stats["hits"] == 1
+    assert stats["stale_hits"] == 1
+    assert stats["entries"] >= 2
+
+
+def test_redis_pipelined_bulk_operations():
+    """Test que set_many et clear passent par un pipeline"""
+    fake = FakeRedis()
+    cache = RedisCache(client=fake, prefix="test:")
+
+    async def scenario():
+        await cache.set_many({f"race:2024:{i}": {"round": str(i)} for i in range(1, 25)}, ttl=60)
+        found = {key: value for key in (f"race:2024:{i}" for i in range(1, 30))
+                 if (value := await cache.get(key)) is not None}
+        await cache.clear()
+        return found, await cache.get("race:2024:1")
+
+    found, after_clear = asyncio.run(scenario())
+    assert len(found) == 24
+    assert found["race:2024:5"] == {"round": "5"}
+    assert after_clear is None
+    assert fake.pipelines == 2
+
+
+def test_redis_stats_are_scoped_to_prefix():
+    """Test que entries ne compte que les clés du cache et que clear() remet tout à zéro"""
+    fake = FakeRedis()
+    fake.data["other:app:key"] = (b"x", None)
+    cache = RedisCache(client=fake, prefix="test:")
+
+    async def scenario():
+        await cache.set_many({f"race:2024:{i}": {"round": str(i)} for i in range(1, 4)}, ttl=60)
+        await cache.set("race:2024:9", ["old"], ttl=0, stale_ttl=60)
+        await cache.lookup("race:2024:9", allow_stale=True)
+        cache.record_coalesced()
+        cache.record_negative_hit()
+        await cache.refresh_stats()
+        entries = cache.get_stats()["entries"]
+        await cache.clear()
+        return entries
+
+    assert asyncio.run(scenario()) == 4
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["stale_hits"], stats["coalesced"], stats["negative_hits"]) == (0, 0, 0, 0, 0)
+    assert "other:app:key" in fake.data
+
+
+def test_get_cached_data_with_redis_backend(monkeypatch):
+    """Test que get_cached_data fonctionne derrière l'interface avec Redis"""
+    cache = RedisCache(client=FakeRedis(), prefix="test:")
+    monkeypatch.setattr(main, "custom_cache", cache)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"round": "24"}
+
+    async def scenario():
+        first = await asyncio.gather(*(get_cached_data("race:last", fetch, ttl=60) for _ in range(5)))
+        again = await get_cached_data("race:last", fetch, ttl=60)
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert calls == 1
+    assert again == {"round": "24"}
+    assert cache.get_stats()["coalesced"] == 4
+
+
+def test_redis_stores_encoded_payload_bytes():
+    """Test que les payloads pré-encodés sont stockés tels quels dans Redis"""
+    from payloads import encode_payload
+
+    payload = encode_payload([{"position": "1"}])
+    value, _ = decode_redis_value(encode_redis_value(payload, 0))
+    assert value == payload
+
+    with_headers = encode_payload([{"position": "1"}] * 100, {"X-Fanout-Failed": "sainz"})
+    value, _ = decode_redis_value(encode_redis_value(with_headers, 0))
+    assert value == with_headers
+
+
+def test_redis_keeps_compressed_variants():
+    """Test que les variantes gzip/br sont stockées dans Redis avec le corps et l'ETag"""
+    from payloads import compress_payload, encode_payload
+
+    payload = compress_payload(encode_payload([{"position": "1"}] * 100, {"X-Fanout-Failed": "sainz"}))
+    blob = encode_redis_value(payload, 0)
+    value, _ = decode_redis_value(blob)
+    assert value == payload
+    # Corps en clair, sans copie zlib en plus
+    assert len(blob) < len(payload.body) + sum(len(body) for _, body in payload.variants) + 150
+
+    cache = RedisCache(client=FakeRedis(), prefix="test:", compress=True)
+
+    async def scenario():
+        await cache.set("standings:drivers", encode_payload([{"position": "1"}] * 100), ttl=60)
+        return await cache.get("standings:drivers")
+
+    stored = asyncio.run(scenario())
+    assert stored.variant("gzip") is not None
+    assert cache.get_stats()["compression"] is True
+
+
+def test_redis_hit_does_not_decompress_or_hash(monkeypatch):
+    """Test qu'un hit Redis relit le corps et l'ETag stockés, sans décompresser ni hacher"""
+    import cache_backends
+    from payloads import encode_payload
+
+    cache = RedisCache(client=FakeRedis(), prefix="test:", compress=True)
+    payload = encode_payload([{"position": str(i), "Driver": {"driverId": "verstappen"}} for i in range(500)])
+    asyncio.run(cache.set("season:2024:results", payload, ttl=60))
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("no decompression or hashing on a hit")
+
+    monkeypatch.setattr(cache_backends.gzip, "decompress", forbidden)
+    monkeypatch.setattr(cache_backends.zlib, "decompress", forbidden)
+    monkeypatch.setattr(cache_backends, "compute_etag", forbidden)
+    stored = asyncio.run(cache.get("season:2024:results"))
+    assert (stored.body, stored.etag) == (payload.body, payload.etag)
+    assert stored.variant("gzip") is not None
+
+
+def test_redis_reads_variant_only_values():
+    """Test que les valeurs écrites avant FLAG_ETAG (variantes seules) se relisent encore"""
+    import struct
+
+    from cache_backends import FLAG_PAYLOAD, FLAG_VARIANTS, _pack_variants
+    from payloads import compress_payload, encode_payload
+
+    payload = compress_payload(encode_payload([{"position": "1"}] * 100))
+    blob = struct.pack("!dB", 7.0, FLAG_PAYLOAD | FLAG_VARIANTS) + _pack_variants(payload.variants)
+    assert decode_redis_value(blob) == (payload, 7.0)
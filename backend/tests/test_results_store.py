@@ -0,0 +1,335 @@
+import asyncio
+import os
+import sys
+import threading
+from datetime import timedelta
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from fastapi.testclient import TestClient
+from main import CustomCache, app
+from payloads import encode_payload
+from results_store import ResultsIngester, ResultsStore, ingest_season
+
+
+def _result(driver_id, position, constructor="ferrari"):
+    return {
+        "position": str(position), "positionText": str(position), "points": "0", "grid": "1",
+        "status": "Finished",
+        "Driver": {"driverId": driver_id, "givenName": driver_id.title(), "familyName": "Test"},
+        "Constructor": {"constructorId": constructor, "name": constructor.title()},
+    }
+
+
+def _season(season, finishes):
+    """finishes : une liste d'ordres d'arrivée (un par manche)"""
+    return [
+        {"season": str(season), "round": str(i + 1), "raceName": f"Grand Prix {i + 1}",
+         "date": f"{season}-05-{i + 1:02d}", "Circuit": {"circuitId": f"c{i}"},
+         "Results": [_result(d, p + 1) for p, d in enumerate(order)]}
+        for i, order in enumerate(finishes)
+    ]
+
+
+def _rows(races, key="Results"):
+    """Découpe un listing saison en lignes (comme les offsets Ergast)"""
+    return [(race, row) for race in races for row in race[key]]
+
+
+class SeasonErgast:
+    """Faux Ergast servant /{season}/results.json et /{season}/qualifying.json page par page,
+    et /{season}/{round}/results.json"""
+
+    def __init__(self, seasons):
+        self.seasons = seasons
+        self.offsets = []
+        self.rounds = []
+
+    async def handler(self, request):
+        parts = request.url.path.split("/")
+        if parts[-3].isdigit() and parts[-2].isdigit():
+            season, round_ = int(parts[-3]), parts[-2]
+            self.rounds.append((season, int(round_)))
+            races = [r for r in self.seasons.get(season, []) if r["round"] == round_]
+            return httpx.Response(200, json={"MRData": {"total": str(len(races)), "RaceTable": {"Races": races}}})
+        season, listing = parts[-2:]
+        listing = listing.replace(".json", "")
+        limit = int(request.url.params["limit"])
+        offset = int(request.url.params["offset"])
+        self.offsets.append((season, listing, offset))
+        races = self.seasons.get(int(season), [])
+        key = "Results" if listing == "results" else "QualifyingResults"
+        if key == "QualifyingResults":
+            races = [{**{k: v for k, v in r.items() if k != "Results"},
+                      "QualifyingResults": r["Results"]} for r in races]
+        rows = _rows(races, key)
+        page, merged = rows[offset:offset + limit], []
+        for race, row in page:
+            if not merged or merged[-1]["round"] != race["round"]:
+                merged.append({**{k: v for k, v in race.items() if k != key}, key: []})
+            merged[-1][key].append(row)
+        return httpx.Response(200, json={"MRData": {"total": str(len(rows)), "RaceTable": {"Races": merged}}})
+
+
+@pytest.fixture
+def store():
+    store = ResultsStore(":memory:")
+    yield store
+    store.close()
+
+
+def test_careers_and_race_results_from_sql(store):
+    """Test des agrégats de carrière et de la reconstitution d'une course"""
+    races = _season(2021, [["hamilton", "verstappen", "bottas"], ["verstappen", "hamilton", "norris"]])
+    assert store.ingest_races(races) == 6
+    store.ingest_races([{**races[0], "QualifyingResults": races[0]["Results"]}], "qualifying")
+
+    careers = store.driver_careers(["hamilton", "verstappen", "norris", "unknown"])
+    assert careers["hamilton"] == {"total_wins": 1, "total_podiums": 2, "total_races": 2, "total_poles": 1}
+    assert careers["norris"] == {"total_wins": 0, "total_podiums": 1, "total_races": 1, "total_poles": 0}
+    assert careers["unknown"]["total_races"] == 0
+
+    race = store.race_result(2021, 2)
+    assert race["raceName"] == "Grand Prix 2"
+    assert race["Circuit"] == {"circuitId": "c1"}
+    assert [r["Driver"]["driverId"] for r in race["Results"]] == ["verstappen", "hamilton", "norris"]
+    assert store.race_result(2021, 3) is None
+    assert store.season_results(2021) == [store.race_result(2021, 1), race]
+    assert store.get_stats()["results"] == 6
+
+
+def test_ingest_season_pages_and_resumes(store):
+    """Test de l'ingestion paginée (course coupée entre deux pages) puis incrémentale"""
+    drivers = [f"d{i}" for i in range(15)]
+    seasons = {2022: _season(2022, [drivers] * 10)}
+    fake = SeasonErgast(seasons)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+
+    asyncio.run(ingest_season(client, store, "http://ergast/api/f1", 2022, complete=False))
+    assert store.get_stats()["results"] == 150
+    assert store.driver_career("d0")["total_wins"] == 10
+    assert store.ingested_rows(2022, "results") == {"rows": 150, "complete": False}
+
+    # Nouvelle manche : seules les nouvelles lignes sont relues
+    seasons[2022] = _season(2022, [drivers] * 11)
+    fake.offsets.clear()
+    asyncio.run(ingest_season(client, store, "http://ergast/api/f1", 2022, complete=False))
+    assert ("2022", "results", 150) in fake.offsets
+    assert all(offset >= 150 for _, _, offset in fake.offsets)
+    assert store.driver_career("d0")["total_races"] == 11
+
+
+def test_ingester_backfills_missing_seasons(store):
+    """Test du rattrapage des saisons passées, une seule fois"""
+    fake = SeasonErgast({2019: _season(2019, [["a", "b"]]), 2020: _season(2020, [["b", "a"]])})
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    ingester = ResultsIngester(store, lambda: client, "http://ergast/api/f1", 2019, lambda: 2021, season_pause=0)
+    assert ingester.ready is False
+
+    asyncio.run(ingester.run_once())
+    assert ingester.ready is True
+    # La saison en cours n'est pas complète
+    assert store.ingested_seasons() == [2019, 2020]
+    assert ResultsIngester(store, lambda: client, "http://ergast/api/f1", 2019, lambda: 2021).ready is True
+    fake.offsets.clear()
+    asyncio.run(ingester.run_once())
+    assert {season for season, _, _ in fake.offsets} == {"2021"}
+
+
+def test_ingester_completes_last_season_after_new_year(store):
+    """Test qu'une saison ingérée en cours d'année est terminée et marquée complète l'année suivante"""
+    fake = SeasonErgast({2021: _season(2021, [["a", "b"]])})
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    year = [2021]
+    ingester = ResultsIngester(store, lambda: client, "http://ergast/api/f1", 2021, lambda: year[0], season_pause=0)
+    asyncio.run(ingester.run_once())
+    assert store.ingested_seasons() == []
+
+    # Dernière manche publiée après le passage à 2022
+    fake.seasons[2021] = _season(2021, [["a", "b"], ["b", "a"]])
+    year[0] = 2022
+    asyncio.run(ingester.run_once())
+    assert store.ingested_seasons() == [2021]
+    assert store.driver_career("b")["total_wins"] == 1
+
+
+def test_ingester_keeps_store_calls_off_the_event_loop(store):
+    """Test que l'ingestion n'appelle jamais la base (et son verrou) depuis la boucle asyncio"""
+    fake = SeasonErgast({2020: _season(2020, [["a", "b"]]), 2021: _season(2021, [["a", "b"], ["b", "a"]])})
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    on_loop = []
+
+    def watch(name):
+        method = getattr(store, name)
+
+        def wrapper(*args, **kwargs):
+            if threading.current_thread() is threading.main_thread():
+                on_loop.append(name)
+            return method(*args, **kwargs)
+        setattr(store, name, wrapper)
+
+    for name in ("ingest_races", "ingested_rows", "mark_ingested", "ingested_seasons", "races", "race_result"):
+        watch(name)
+    ingester = ResultsIngester(store, lambda: client, "http://ergast/api/f1", 2020, lambda: 2021,
+                               season_pause=0, recheck_window=100 * 365 * 86400)
+    on_loop.clear()
+    asyncio.run(ingester.run_once())
+    assert fake.rounds  # manches relues : races/race_result appelés aussi
+    assert on_loop == []
+
+
+def test_store_stats_counted_once_per_ingest(store):
+    """Test que get_stats ne refait les COUNT(*) qu'après une ingestion"""
+    counts = []
+    store._conn.set_trace_callback(lambda sql: counts.append(sql) if "COUNT(*)" in sql else None)
+    store.ingest_races(_season(2021, [["a", "b"]]))
+    assert store.get_stats()["results"] == 2
+    assert store.get_stats()["results"] == 2
+    assert len(counts) == 5
+    store.ingest_races(_season(2021, [["a", "b"], ["b", "a"]]))
+    assert store.get_stats()["results"] == 4
+    assert len(counts) == 10
+
+
+def test_ingester_retries_rate_limited_season(store):
+    """Test qu'un 429 pendant le rattrapage est réessayé après Retry-After, depuis la dernière page"""
+    drivers = [f"d{i}" for i in range(15)]
+    fake = SeasonErgast({2019: _season(2019, [drivers] * 10)})
+    limited = []
+
+    async def handler(request):
+        if request.url.params["offset"] == "100" and not limited:
+            limited.append(request.url)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return await fake.handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    ingester = ResultsIngester(store, lambda: client, "http://ergast/api/f1", 2019, lambda: 2020, season_pause=0)
+    asyncio.run(ingester.run_once())
+    assert ingester.retries == 1
+    assert store.ingested_seasons() == [2019]
+    assert store.get_stats()["results"] == 150
+    # Reprise à la page en échec, pas depuis le début
+    assert [o for s, l, o in fake.offsets if (s, l) == ("2019", "results")] == [0, 100]
+
+
+def test_ingester_gives_up_on_client_errors(store):
+    """Test qu'une erreur non transitoire (404) n'est pas réessayée"""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+    ingester = ResultsIngester(store, lambda: client, "http://ergast/api/f1", 2019, lambda: 2020, season_pause=0)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(ingester.run_once())
+    assert ingester.retries == 0
+
+
+def test_ingester_rechecks_recent_rounds(store):
+    """Test qu'un résultat corrigé après publication remplace les lignes de la manche"""
+    seasons = {2021: _season(2021, [["a", "b", "c"], ["b", "a", "c"]])}
+    fake = SeasonErgast(seasons)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    # Fenêtre assez large pour couvrir les dates de test
+    ingester = ResultsIngester(store, lambda: client, "http://ergast/api/f1", 2021, lambda: 2021,
+                               season_pause=0, recheck_window=100 * 365 * 86400)
+    asyncio.run(ingester.run_once())
+    version = store.version
+    assert fake.rounds == [(2021, 1), (2021, 2)]
+
+    # Rien de changé : relu, pas réécrit
+    asyncio.run(ingester.run_once())
+    assert store.version == version
+
+    # b disqualifié de la manche 2 : retiré du classement
+    seasons[2021][1]["Results"] = [_result("a", 1), _result("c", 2)]
+    asyncio.run(ingester.run_once())
+    assert [r["Driver"]["driverId"] for r in store.race_result(2021, 2)["Results"]] == ["a", "c"]
+    assert store.driver_career("b")["total_wins"] == 0
+    assert store.ingested_rows(2021, "results")["rows"] == 5
+
+    # Hors de la fenêtre : pas relu
+    fake.rounds.clear()
+    ingester._recheck_window = timedelta(0)
+    asyncio.run(ingester.run_once())
+    assert fake.rounds == []
+
+
+def test_routes_served_from_the_store(store, monkeypatch):
+    """Test que les stats et résultats viennent de la base locale, sans appel Ergast"""
+    store.ingest_races(_season(2023, [["leclerc", "sainz"], ["sainz", "leclerc"]]))
+    ingester = ResultsIngester(store, lambda: None, "http://ergast/api/f1", 2023, lambda: 2023)
+    ingester.ready = True
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(500)
+
+    cache = CustomCache(persist=False)
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "custom_cache", cache)
+    monkeypatch.setattr(main, "results_ingester", ingester)
+    monkeypatch.setattr(main, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    drivers = [{"driverId": "leclerc", "givenName": "Charles", "familyName": "Leclerc"},
+               {"driverId": "sainz", "givenName": "Carlos", "familyName": "Sainz"}]
+    asyncio.run(cache.set("drivers:current", encode_payload(drivers), ttl=3600))
+    client = TestClient(app)
+
+    assert client.get("/driver/leclerc/stats").json() == {
+        "driver_id": "leclerc", "total_wins": 1, "total_podiums": 2, "total_races": 2,
+    }
+    response = client.get("/drivers/stats")
+    assert response.headers["x-stats-source"] == "results-db"
+    assert response.json()[1] == {
+        "driver_id": "sainz", "name": "Carlos Sainz",
+        "total_wins": 1, "total_podiums": 2, "total_races": 2, "total_poles": 0,
+        "total_points": 0.0, "total_dnfs": 0, "avg_finish": 1.5,
+    }
+    assert client.get("/race/2023/2").json()["Results"][0]["Driver"]["driverId"] == "sainz"
+    assert [r["round"] for r in client.get("/race/2023/results").json()] == ["1", "2"]
+    assert calls == []
+    assert client.get("/cache/stats").json()["results_store"]["races"] == 2
+
+
+def test_all_driver_stats_same_fields_from_store_and_ergast(store, monkeypatch):
+    """Test que /drivers/stats renvoie les mêmes lignes depuis la base locale et depuis Ergast"""
+    races = _season(2023, [["leclerc", "sainz"], ["sainz", "leclerc"], ["leclerc", "sainz"]])
+    for race in races:
+        race["Results"][0]["points"], race["Results"][1]["points"] = "25", "18"
+    races[1]["Results"][1]["status"] = "Engine"
+    store.ingest_races(races)
+    drivers = [{"driverId": "leclerc", "givenName": "Charles", "familyName": "Leclerc"},
+               {"driverId": "sainz", "givenName": "Carlos", "familyName": "Sainz"}]
+
+    async def handler(request):
+        path = request.url.path
+        if path.endswith("/current/drivers.json"):
+            return httpx.Response(200, json={"MRData": {"DriverTable": {"Drivers": drivers}}})
+        driver_id = path.split("/drivers/")[1].split("/")[0]
+        if "/qualifying/" in path:
+            return httpx.Response(200, json={"MRData": {"total": "0", "RaceTable": {"Races": []}}})
+        own = [{**race, "Results": [r for r in race["Results"] if r["Driver"]["driverId"] == driver_id]}
+               for race in races]
+        return httpx.Response(200, json={"MRData": {"total": str(len(own)), "RaceTable": {"Races": own}}})
+
+    ingester = ResultsIngester(store, lambda: None, "http://ergast/api/f1", 2023, lambda: 2023)
+    ingester.ready = True
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    def all_stats(results_ingester):
+        monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+        monkeypatch.setattr(main, "results_ingester", results_ingester)
+        return TestClient(app).get("/drivers/stats").json()
+
+    from_store, from_ergast = all_stats(ingester), all_stats(None)
+    assert from_store == from_ergast
+    assert from_ergast[0] == {
+        "driver_id": "leclerc", "name": "Charles Leclerc",
+        "total_wins": 2, "total_podiums": 3, "total_races": 3, "total_poles": 0,
+        "total_points": 68.0, "total_dnfs": 1, "avg_finish": 1.0,
+    }
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stats_engine
+from stats_engine import ResultsTable, StatsEngine, is_finish
+
+
+def _race(season, round_num, rows):
+    """rows : (driver_id, constructor_id, position, points, status)"""
+    return {
+        "season": str(season), "round": str(round_num),
+        "Results": [
+            {"position": str(p), "grid": str(p), "points": str(pts), "status": status,
+             "Driver": {"driverId": d}, "Constructor": {"constructorId": c}}
+            for d, c, p, pts, status in rows
+        ],
+    }
+
+
+RACES = [
+    _race(2023, 1, [("max", "rbr", 1, 25, "Finished"), ("checo", "rbr", 2, 18, "Finished"),
+                    ("lewis", "merc", 3, 15, "+1 Lap"), ("george", "merc", 4, 0, "Engine")]),
+    _race(2023, 2, [("checo", "rbr", 1, 25, "Finished"), ("max", "rbr", 2, 18, "Finished"),
+                    ("george", "merc", 3, 15, "Finished"), ("lewis", "merc", 4, 0, "Collision")]),
+    _race(2024, 1, [("max", "rbr", 1, 26, "Finished"), ("lewis", "ferrari", 2, 18, "Finished")]),
+]
+QUALIFYING = [
+    {**{k: v for k, v in race.items() if k != "Results"}, "QualifyingResults": race["Results"]}
+    for race in RACES
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    """Même jeu de tests avec et sans numpy"""
+    if request.param == "python":
+        monkeypatch.setattr(stats_engine, "np", None)
+    elif stats_engine.np is None:
+        pytest.skip("numpy n'est pas installé")
+    return StatsEngine(ResultsTable.from_races(RACES), ResultsTable.from_races(QUALIFYING, "QualifyingResults"))
+
+
+def test_is_finish():
+    assert is_finish("Finished") and is_finish("+2 Laps")
+    assert not is_finish("Engine") and not is_finish(None)
+
+
+def test_career_stats_for_all_drivers(engine):
+    """Test des agrégats de carrière de tous les pilotes en une passe"""
+    careers = engine.career_stats()
+    assert careers["max"] == {"races": 3, "wins": 2, "podiums": 3, "points": 69.0, "dnfs": 0,
+                              "avg_finish": 1.33, "poles": 2}
+    # Tour de retard : classé. Collision : abandon, exclu de la moyenne
+    assert careers["lewis"] == {"races": 3, "wins": 0, "podiums": 2, "points": 33.0, "dnfs": 1,
+                                "avg_finish": 2.5, "poles": 0}
+    assert engine.career_stats(["unknown"])["unknown"]["races"] == 0
+
+
+def test_season_stats_by_driver_and_constructor(engine):
+    """Test des totaux d'une saison par pilote et par écurie"""
+    season = engine.season_stats(2023)
+    assert set(season) == {"max", "checo", "lewis", "george"}
+    assert season["george"]["dnfs"] == 1 and season["george"]["avg_finish"] == 3.0
+    assert season["checo"]["poles"] == 1
+
+    constructors = engine.season_stats(2023, by="constructor")
+    assert constructors["rbr"]["points"] == 86.0
+    assert constructors["merc"]["wins"] == 0 and constructors["merc"]["dnfs"] == 2
+    assert engine.season_stats(2024, by="constructor")["ferrari"]["races"] == 1
+    assert engine.results.seasons() == [2023, 2024]
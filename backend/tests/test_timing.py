@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from ergast_stub import ErgastStub
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from main import CustomCache, app
+from timing import RequestTimer, ServerTimingMiddleware, phase
+
+
+def _phases(header: str) -> dict:
+    phases = {}
+    for part in header.split(", "):
+        name, dur = part.split(";")[:2]
+        phases[name] = float(dur.removeprefix("dur="))
+    return phases
+
+
+def test_header_sums_repeated_phases():
+    timer = RequestTimer()
+    timer.record("upstream", 0.010)
+    timer.record("upstream", 0.020)
+    timer.record("encode", 0.0005)
+    assert timer.header(0.05) == 'upstream;dur=30.0;desc="x2", encode;dur=0.5, total;dur=50.0'
+    # Hors requête chronométrée, phase() ne fait rien
+    with phase("upstream"):
+        pass
+
+
+def test_live_request_phases(monkeypatch):
+    monkeypatch.setattr(main, "USE_MOCK_DATA", False)
+    monkeypatch.setattr(main, "ERGAST_BASE_URL", "http://ergast.test/api/f1")
+    monkeypatch.setattr(main, "custom_cache", CustomCache(persist=False))
+    monkeypatch.setattr(main, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(ErgastStub().handler)))
+    client = TestClient(app)
+
+    miss = client.get("/race/2025/1")
+    assert miss.status_code == 200
+    assert set(_phases(miss.headers["server-timing"])) >= {"cache", "lock", "fetch", "upstream", "parse", "encode", "total"}
+    assert miss.headers["timing-allow-origin"] == "*"
+
+    hit = _phases(client.get("/race/2025/1").headers["server-timing"])
+    assert "cache" in hit and "upstream" not in hit and "fetch" not in hit
+
+
+def test_sampled_log_lines(caplog):
+    small = FastAPI()
+
+    @small.get("/ping/{n}")
+    async def ping(n: int):
+        with phase("work"):
+            return {"n": n}
+
+    small.add_middleware(ServerTimingMiddleware, header=False, sample_rate=1.0)
+    with caplog.at_level(logging.INFO, logger="timing"):
+        response = TestClient(small).get("/ping/3")
+    assert "server-timing" not in response.headers
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["route"] == "/ping/{n}" and line["status"] == 200 and line["sampled"]
+    assert line["phases"]["work"]["count"] == 1
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["USE_MOCK_DATA"] = "true"
+
+import main
+from fastapi.testclient import TestClient
+from main import CustomCache, get_cached_data
+from payloads import encode_payload
+from season_calendar import SeasonCalendar
+from ttl_policy import TTLPolicy
+
+SCHEDULE = [
+    {"season": "2025", "round": "1", "raceName": "Bahrain Grand Prix", "date": "2025-03-02", "time": "15:00:00Z",
+     "FirstPractice": {"date": "2025-02-28", "time": "11:30:00Z"}},
+    {"season": "2025", "round": "2", "raceName": "Saudi Arabian Grand Prix", "date": "2025-03-09", "time": "17:00:00Z"},
+]
+CALENDAR = SeasonCalendar(SCHEDULE)
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_race_dependent_keys_live_until_next_results():
+    """Test qu'en milieu de semaine les classements vivent jusqu'aux résultats suivants"""
+    policy = TTLPolicy()
+    decision = policy.decide("standings:drivers", _utc(2025, 3, 5, 17), CALENDAR)
+    # Résultats attendus le 9 mars à 20h (départ 17h + 3h)
+    assert decision.ttl == 4 * 86400 + 3 * 3600
+    assert decision.reason == "until results of Saudi Arabian Grand Prix"
+    assert policy.decide("driver:hamilton:stats", _utc(2025, 3, 5, 17), CALENDAR).ttl == decision.ttl
+
+
+def test_poll_after_race_until_results_published():
+    """Test du sondage court juste après une course, sauf si race:last est déjà à jour"""
+    policy = TTLPolicy(poll_ttl=300)
+    now = _utc(2025, 3, 2, 18, 30)
+    assert policy.decide("standings:drivers", now, CALENDAR).reason == "awaiting results of Bahrain Grand Prix"
+    assert policy.decide("race:last", now, CALENDAR, data={"season": "2024", "round": "24"}).ttl == 300
+
+    published = encode_payload({"season": "2025", "round": "1"})
+    decision = policy.decide("race:last", now, CALENDAR, data=published)
+    assert decision.reason == "until results of Saudi Arabian Grand Prix"
+
+
+def test_race_result_ttl_depends_on_round_completion():
+    """Test qu'une manche terminée est gardée longtemps, une manche à venir jusqu'à ses résultats"""
+    policy = TTLPolicy(completed_ttl=30 * 86400)
+    now = _utc(2025, 3, 9, 18)
+    assert policy.decide("race:2025:1", now, CALENDAR).reason == "round complete"
+    assert policy.decide("race:2019:5", now, CALENDAR).ttl == 30 * 86400
+    decision = policy.decide("race:2025:2", now, CALENDAR)
+    assert (decision.ttl, decision.reason) == (7200, "round 2 not complete")
+    # Résultats de saison : figés pour une saison passée, suivent les courses sinon
+    assert policy.decide("season:2019:podiums", now, CALENDAR).reason == "past season"
+    assert policy.decide("season:2025:results", now, CALENDAR).reason == "Saudi Arabian Grand Prix in progress"
+    assert policy.decide("stats:2019:drivers", now, CALENDAR).reason == "past season"
+    assert policy.decide("stats:2025:drivers", now, CALENDAR).reason == "Saudi Arabian Grand Prix in progress"
+
+
+def test_lineups_and_fallbacks():
+    """Test des listes pilotes/écuries et des TTL par défaut sans calendrier"""
+    policy = TTLPolicy(min_ttl=60)
+    decision = policy.decide("drivers:current", _utc(2025, 3, 6, 12), CALENDAR)
+    assert decision.reason == "until Saudi Arabian Grand Prix weekend"
+    assert policy.decide("drivers:current", _utc(2025, 3, 8), CALENDAR).reason == "race weekend"
+    assert policy.decide("standings:drivers", _utc(2025, 4, 1), CALENDAR).reason == "season over"
+    no_calendar = policy.decide("race:last", _utc(2025, 3, 5), None)
+    assert (no_calendar.ttl, no_calendar.reason) == (1800, "no season calendar")
+    assert policy.decide("something:else", _utc(2025, 3, 5), CALENDAR).reason == "fixed"
+
+
+def test_decisions_are_recorded_per_key():
+    """Test de l'historique des décisions (la dernière par clé, la plus récente d'abord)"""
+    policy = TTLPolicy(history=2)
+    for key in ("race:last", "standings:drivers", "race:last", "schedule:current"):
+        policy.decide(key, _utc(2025, 3, 5), CALENDAR)
+    assert [d["key"] for d in policy.decisions()] == ["schedule:current", "race:last"]
+    assert policy.decide("race:last", _utc(2025, 3, 5), CALENDAR, record=False)
+    assert policy.last_decision("standings:drivers") is None
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fresh = CustomCache(persist=False)
+    monkeypatch.setattr(main, "custom_cache", fresh)
+    monkeypatch.setattr(main, "ttl_policy", TTLPolicy())
+    return fresh
+
+
+def test_get_cached_data_uses_the_policy(cache):
+    """Test que get_cached_data applique le TTL calculé depuis schedule:current"""
+    async def fetch():
+        return [{"position": "1"}]
+
+    async def scenario():
+        await cache.set("schedule:current", encode_payload(SCHEDULE + [
+            {"season": "2099", "round": "1", "raceName": "Future Grand Prix", "date": "2099-03-01"},
+        ]), ttl=3600)
+        await get_cached_data("standings:drivers", fetch)
+        await get_cached_data("race:last", fetch, ttl=42)
+
+    asyncio.run(scenario())
+    decision = main.ttl_policy.last_decision("standings:drivers")
+    assert decision.reason == "until results of Future Grand Prix"
+    assert decision.ttl == main.ttl_policy.max_ttl
+    assert main.ttl_policy.last_decision("race:last").reason == "set by caller"
+
+    response = TestClient(main.app).get("/cache/ttl", params={"key": "standings:drivers"})
+    data = response.json()
+    assert data["calendar"] is True
+    assert data["last"]["ttl"] == decision.ttl
+    assert data["preview"]["reason"] == decision.reason
+
+
+def test_negative_ttl_follows_the_calendar():
+    """Test du TTL d'une manche sans résultats : jusqu'à leur heure, puis sondage, sinon TTL fixe"""
+    policy = TTLPolicy(poll_ttl=300, negative_ttl=3600)
+    now = _utc(2025, 3, 5, 17)
+    decision = policy.decide_negative("race:2025:2", now, CALENDAR)
+    assert decision.ttl == 4 * 86400 + 3 * 3600
+    assert decision.reason == "no data: until results of Saudi Arabian Grand Prix"
+    assert policy.decide_negative("race:2025:1", now, CALENDAR).ttl == 300
+    assert policy.decide_negative("race:2025:99", now, CALENDAR).ttl == 3600
+    assert policy.decide_negative("race:last", now, None).ttl == 1800
@@ -0,0 +1,170 @@
+"""Per-request phase timings, sent as a `Server-Timing` header.
+
+`ServerTimingMiddleware` attaches a `RequestTimer` to the request's context;
+code on the request path wraps its phases in `with phase("upstream"):`.
+Outside a timed request (cache warmer, background refresh once the
+response has started) `phase()` only reads a context variable.
+
+Phases may overlap (`fetch` contains `upstream`, `parse` and `encode`) and
+a phase entered several times (parallel upstream calls) is summed, its
+count given in the description:
+
+    Server-Timing: cache;dur=0.1;desc="x2", upstream;dur=84.3;desc="x3", total;dur=86.0
+
+Sampled requests, and requests slower than a threshold, are also logged as
+one JSON line on the `timing` logger.
+"""
+
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import json_codec
+
+logger = logging.getLogger("timing")
+
+_current: ContextVar[Optional["RequestTimer"]] = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """Accumulated duration and count of each phase of one request."""
+
+    __slots__ = ("start", "phases", "closed")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}
+        # Fermé à l'envoi des headers : un refresh en arrière-plan ne compte plus
+        self.closed = False
+
+    def record(self, name: str, seconds: float):
+        if self.closed:
+            return
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def header(self, total: float) -> str:
+        parts = []
+        for name, (seconds, count) in self.phases.items():
+            desc = f';desc="x{count}"' if count > 1 else ""
+            parts.append(f"{name};dur={seconds * 1000:.1f}{desc}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, dict]:
+        return {name: {"ms": round(seconds * 1000, 3), "count": count}
+                for name, (seconds, count) in self.phases.items()}
+
+
+class phase:
+    """Context manager timing a phase of the current request."""
+
+    __slots__ = ("name", "timer", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.timer = _current.get()
+
+    def __enter__(self):
+        if self.timer is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.timer is not None:
+            self.timer.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def record(name: str, seconds: float):
+    """Add a duration measured elsewhere to a phase of the current request."""
+    timer = _current.get()
+    if timer is not None:
+        timer.record(name, seconds)
+
+
+class locked:
+    """`async with lock`, the wait for the lock being timed as a phase."""
+
+    __slots__ = ("lock", "name")
+
+    def __init__(self, lock, name: str = "lock"):
+        self.lock = lock
+        self.name = name
+
+    async def __aenter__(self):
+        with phase(self.name):
+            await self.lock.acquire()
+
+    async def __aexit__(self, *exc):
+        self.lock.release()
+        return False
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware timing requests, for the Server-Timing header and sampled logs.
+
+    header: add Server-Timing (and Timing-Allow-Origin) to responses.
+    sample_rate: share of requests logged (0 = none, 1 = all).
+    slow_ms: requests slower than this are always logged (0 = never).
+    """
+
+    def __init__(self, app, header: bool = True, sample_rate: float = 0.0, slow_ms: float = 0.0,
+                 allow_origin: str = "*"):
+        self.app = app
+        self.header = header
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.allow_origin = allow_origin.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not (self.header or sampled or self.slow_ms > 0):
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timer.header(timer.elapsed()).encode("latin-1")))
+                    headers.append((b"timing-allow-origin", self.allow_origin))
+                    message = {**message, "headers": headers}
+                timer.closed = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total_ms = timer.elapsed() * 1000
+            if sampled or (self.slow_ms > 0 and total_ms >= self.slow_ms):
+                route = getattr(scope.get("route"), "path", None)
+                logger.info(json_codec.dumps({
+                    "event": "request_timing",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route,
+                    "status": status,
+                    "total_ms": round(total_ms, 3),
+                    "sampled": sampled,
+                    "phases": timer.to_dict(),
+                }).decode())
@@ -0,0 +1,196 @@
+"""Calendar-driven cache TTLs.
+
+Instead of a fixed TTL per route, each key expires when its data can next
+change according to the season calendar:
+
+- race-dependent keys (standings, last race, career stats) live until the
+  results of the next race are due, and are polled every few minutes right
+  after a race until the new results show up
+- the results of a completed round never change: they are kept for weeks
+- drivers and constructors lists live until the next race weekend
+
+Every decision is kept (last one per key) so /cache/ttl can explain why a
+key expires when it does.
+"""
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from payloads import EncodedPayload
+from season_calendar import SeasonCalendar, race_start, results_available, weekend_start
+
+# TTL quand le calendrier n'est pas (encore) connu : les anciennes valeurs fixes
+DEFAULT_TTLS = {
+    "drivers:current": 86400,
+    "constructors:current": 86400,
+    "standings:drivers": 3600,
+    "standings:constructors": 3600,
+    "schedule:current": 86400,
+    "race:last": 1800,
+    "drivers:all:stats": 86400,
+    "driver:stats": 86400,
+    "race:result": 86400,
+    "season:stats": 86400,
+    "season:results": 86400,
+}
+DEFAULT_TTL = 3600
+
+RACE_DEPENDENT = {"standings:drivers", "standings:constructors", "race:last", "drivers:all:stats", "driver:stats"}
+LINEUPS = {"drivers:current", "constructors:current"}
+
+_DRIVER_STATS_KEY = re.compile(r"driver:[^:]+:stats")
+_RACE_KEY = re.compile(r"race:(\d+):(\d+)")
+_SEASON_STATS_KEY = re.compile(r"stats:(\d+):drivers")
+_SEASON_RESULTS_KEY = re.compile(r"season:(\d+):(?:results|podiums)")
+
+
+@dataclass(frozen=True, slots=True)
+class TTLDecision:
+    key: str
+    ttl: int
+    reason: str
+    decided_at: datetime
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "ttl": self.ttl,
+            "reason": self.reason,
+            "decided_at": self.decided_at.isoformat(),
+            "expires_at": (self.decided_at + timedelta(seconds=self.ttl)).isoformat(),
+        }
+
+
+def key_kind(key: str) -> str:
+    """Family of a cache key ("driver:stats" for driver:{id}:stats, ...)."""
+    if _DRIVER_STATS_KEY.fullmatch(key):
+        return "driver:stats"
+    if _RACE_KEY.fullmatch(key):
+        return "race:result"
+    if _SEASON_STATS_KEY.fullmatch(key):
+        return "season:stats"
+    if _SEASON_RESULTS_KEY.fullmatch(key):
+        return "season:results"
+    return key
+
+
+def _round_of(data: Any) -> Optional[tuple]:
+    if isinstance(data, EncodedPayload):
+        data = data.decode()
+    if isinstance(data, dict) and "season" in data and "round" in data:
+        return int(data["season"]), int(data["round"])
+    return None
+
+
+class TTLPolicy:
+    """Computes the TTL of a key from the season calendar."""
+
+    def __init__(self, min_ttl: int = 60, max_ttl: int = 7 * 86400, poll_ttl: int = 300,
+                 publish_grace: timedelta = timedelta(hours=6), completed_ttl: int = 30 * 86400,
+                 negative_ttl: int = 3600, history: int = 512):
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.poll_ttl = poll_ttl
+        self.publish_grace = publish_grace
+        self.completed_ttl = completed_ttl
+        self.negative_ttl = negative_ttl
+        self._history = history
+        self._decisions: "OrderedDict[str, TTLDecision]" = OrderedDict()
+
+    def _until(self, when: datetime, now: datetime) -> int:
+        seconds = int((when - now).total_seconds())
+        return max(self.min_ttl, min(seconds, self.max_ttl))
+
+    def decide(self, key: str, now: datetime, calendar: Optional[SeasonCalendar],
+               data: Any = None, record: bool = True) -> TTLDecision:
+        """TTL of key for data fetched at now (an aware UTC datetime)."""
+        ttl, reason = self._compute(key_kind(key), key, now, calendar, data)
+        decision = TTLDecision(key, ttl, reason, now)
+        if record:
+            self.record(decision)
+        return decision
+
+    def decide_negative(self, key: str, now: datetime, calendar: Optional[SeasonCalendar],
+                        record: bool = True) -> TTLDecision:
+        """TTL of a negative entry: key had no data upstream at now."""
+        ttl, reason = self._compute_negative(key_kind(key), key, now, calendar)
+        decision = TTLDecision(key, ttl, f"no data: {reason}", now)
+        if record:
+            self.record(decision)
+        return decision
+
+    def _compute_negative(self, kind: str, key: str, now: datetime, calendar: Optional[SeasonCalendar]):
+        if kind == "race:result" and calendar is not None:
+            season, round_ = map(int, _RACE_KEY.fullmatch(key).groups())
+            race = next((r for r in calendar.races
+                         if int(r.get("season", season)) == season and int(r["round"]) == round_), None)
+            if race is not None:
+                if results_available(race) > now:
+                    return self._until(results_available(race), now), f"until results of {race.get('raceName')}"
+                # Course passée mais pas encore publiée : on sonde
+                return self.poll_ttl, f"awaiting results of {race.get('raceName')}"
+        # Manche hors calendrier, saison inconnue... : ne reviendra pas de sitôt
+        ttl, _ = self._compute(kind, key, now, calendar, None)
+        return min(ttl, self.negative_ttl), "not in calendar" if kind == "race:result" else "fixed"
+
+    def _compute(self, kind: str, key: str, now: datetime, calendar: Optional[SeasonCalendar], data: Any):
+        if calendar is None or not calendar.races:
+            return DEFAULT_TTLS.get(kind, DEFAULT_TTL), "no season calendar"
+        upcoming = calendar.next_race(now)
+
+        if kind == "race:result":
+            season, round_ = map(int, _RACE_KEY.fullmatch(key).groups())
+            race = next((r for r in calendar.races
+                         if int(r.get("season", season)) == season and int(r["round"]) == round_), None)
+            if race is not None and results_available(race) > now:
+                return self._until(results_available(race), now), f"round {round_} not complete"
+            return self.completed_ttl, "round complete"
+
+        if kind in ("season:stats", "season:results"):
+            season = int((_SEASON_STATS_KEY.fullmatch(key) or _SEASON_RESULTS_KEY.fullmatch(key)).group(1))
+            if all(int(r.get("season", season)) != season for r in calendar.races):
+                return self.completed_ttl, "past season"
+            kind = "drivers:all:stats"  # saison en cours : suit les courses
+
+        if kind in LINEUPS:
+            if upcoming is None:
+                return self.max_ttl, "season over"
+            if weekend_start(upcoming) > now:
+                return self._until(weekend_start(upcoming), now), f"until {upcoming.get('raceName')} weekend"
+            return DEFAULT_TTLS[kind], "race weekend"
+
+        if kind in RACE_DEPENDENT:
+            last = calendar.last_race(now)
+            if last is not None and now < results_available(last) + self.publish_grace:
+                # race:last dit si la manche est publiée ; pour le reste on sonde jusqu'à la fin du délai
+                published = kind == "race:last" and _round_of(data) is not None and _round_of(data) == _round_of(last)
+                if not published:
+                    return self.poll_ttl, f"awaiting results of {last.get('raceName')}"
+            if upcoming is None:
+                return self.max_ttl, "season over"
+            if race_start(upcoming) <= now:
+                return self._until(results_available(upcoming), now), f"{upcoming.get('raceName')} in progress"
+            return self._until(results_available(upcoming), now), f"until results of {upcoming.get('raceName')}"
+
+        return DEFAULT_TTLS.get(kind, DEFAULT_TTL), "fixed"
+
+    # ── Debugging ────────────────────────────────────────────────────────────
+    def record(self, decision: TTLDecision):
+        self._decisions[decision.key] = decision
+        self._decisions.move_to_end(decision.key)
+        while len(self._decisions) > self._history:
+            self._decisions.popitem(last=False)
+
+    def last_decision(self, key: str) -> Optional[TTLDecision]:
+        return self._decisions.get(key)
+
+    def decisions(self) -> List[dict]:
+        """Last decision of every key, most recent first."""
+        return [d.to_dict() for d in reversed(self._decisions.values())]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._decisions), "min_ttl": self.min_ttl, "max_ttl": self.max_ttl,
+                "poll_ttl": self.poll_ttl, "negative_ttl": self.negative_ttl}
@@ -14,22 +14,28 @@ export const getDrivers = async () => {
   return Array.isArray(data) ? data : [];
 };
 
+// data = tableau côté mock, sinon on tente de normaliser
+const toDriverStandings = (data) =>
+  Array.isArray(data) ? data : data?.MRData?.StandingsTable?.StandingsLists?.[0]?.DriverStandings ?? [];
+
+const toConstructorStandings = (data) =>
+  Array.isArray(data) ? data : data?.MRData?.StandingsTable?.StandingsLists?.[0]?.ConstructorStandings ?? [];
+
+const toList = (data) => (Array.isArray(data) ? data : []);
+
 export const getDriverStandings = async () => {
   const { data } = await api.get("/standings/drivers");
-  // data = tableau côté mock, sinon on tente de normaliser
-  if (Array.isArray(data)) return data;
-  return data?.MRData?.StandingsTable?.StandingsLists?.[0]?.DriverStandings ?? [];
+  return toDriverStandings(data);
 };
 
 export const getConstructorStandings = async () => {
   const { data } = await api.get("/standings/constructors");
-  if (Array.isArray(data)) return data;
-  return data?.MRData?.StandingsTable?.StandingsLists?.[0]?.ConstructorStandings ?? [];
+  return toConstructorStandings(data);
 };
 
 export const getSchedule = async () => {
   const { data } = await api.get("/schedule/current");
-  return Array.isArray(data) ? data : [];
+  return toList(data);
 };
 
 export const getHealth = async () => {
@@ -49,6 +55,19 @@ export const getRaceResult = async (season, round) => {
   }
 };
 
+// Toutes les courses d'une saison avec leurs résultats (podium = top 3 seulement), en une requête
+export const getSeasonResults = async (season, { podium = false } = {}) => {
+  try {
+    const { data } = await api.get(`/race/${season}/results`, { params: podium ? { podium: true } : {} });
+    return Array.isArray(data) ? data : [];
+  } catch (error) {
+    if (error.response?.status === 404) {
+      return []; // Aucune course terminée
+    }
+    throw error;
+  }
+};
+
 export const getLastRace = async () => {
   try {
     const { data } = await api.get("/race/last");
@@ -63,3 +82,20 @@ export const getAllDriverStats = async () => {
   const { data } = await api.get("/drivers/stats");
   return Array.isArray(data) ? data : [];
 };
+
+// Plusieurs ressources en une seule requête : { "/health": { status, body }, ... }
+export const getBatch = async (paths) => {
+  const { data } = await api.post("/batch", { paths });
+  return Object.fromEntries((data?.results ?? []).map((r) => [r.path, r]));
+};
+
+// Tout ce qu'affiche l'accueil en un aller-retour ; une ressource en erreur n'empêche pas les autres
+export const getDashboard = async () => {
+  const results = await getBatch(["/standings/drivers", "/health", "/schedule/current"]);
+  const ok = (path) => (results[path]?.status === 200 ? results[path].body : null);
+  return {
+    driverStandings: toDriverStandings(ok("/standings/drivers")),
+    health: ok("/health"),
+    schedule: toList(ok("/schedule/current")),
+  };
+};
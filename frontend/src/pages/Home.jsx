@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { getDriverStandings, getHealth, getRaceResult, getSchedule } from "../api";
+import { getDashboard, getRaceResult } from "../api";
 import Loader from "../components/Loader";
 import ErrorBanner from "../components/ErrorBanner";
 import { useLanguage } from "../contexts/LanguageContext";
@@ -17,11 +17,7 @@ export default function Home() {
   useEffect(() => {
     (async () => {
       try {
-        const [s, h, schedule] = await Promise.all([
-          getDriverStandings(), 
-          getHealth(), 
-          getSchedule()
-        ]);
+        const { driverStandings: s, health: h, schedule } = await getDashboard();
         setTop3((s || []).slice(0, 3));
         setHealth(h);
         